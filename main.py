@@ -1,23 +1,63 @@
 import argparse
 import sys
 import os
+import time
+from pathlib import Path
 from dotenv import load_dotenv
-from src.utils.logger import log_experiment, ActionType, initialize_logger, finalize_logger
+from src.utils.logger import log_experiment, ActionType, initialize_logger, finalize_logger, get_current_logger
+from src.tools.telemetry import TelemetryTracker
 from src.orchestrator.graph import run_refactoring_swarm
+from src.orchestrator.batch import run_batch, load_manifest, format_results_table, merge_batch_logs, POOL_KINDS
 
 load_dotenv()
 
 def main():
     parser = argparse.ArgumentParser(description="The Refactoring Swarm - Automated Code Refactoring System")
-    parser.add_argument("--target_dir", type=str, required=True, help="Directory containing code to refactor")
+    parser.add_argument("--target_dir", type=str, nargs="+", help="Directory (or directories) containing code to refactor")
+    parser.add_argument("--manifest", type=str, help="File listing one target directory per line")
+    parser.add_argument("--workers", type=int, default=4, help="Number of targets processed concurrently (batch mode)")
+    parser.add_argument("--pool", choices=POOL_KINDS, default="thread", help="Worker pool kind (batch mode)")
+    parser.add_argument("--max_llm_calls", type=int, help="Maximum number of concurrent LLM calls, shared by every worker (batch mode)")
+    parser.add_argument("--log_shard", action="store_true", help="Log to logs/experiment_data.<session_id>.json (parallel runs)")
+    parser.add_argument("--trace", type=str, help="Write a Chrome trace-event timeline of the run (e.g. out.json)")
+    parser.add_argument("--metrics_port", type=int, help="Serve live Prometheus metrics on http://127.0.0.1:<port>/metrics")
     args = parser.parse_args()
 
-    if not os.path.exists(args.target_dir):
-        print(f"ERROR: Dossier {args.target_dir} introuvable.")
-        sys.exit(1)
+    targets = list(args.target_dir or [])
+    if args.manifest:
+        if not os.path.exists(args.manifest):
+            print(f"ERROR: Manifest {args.manifest} introuvable.")
+            sys.exit(1)
+        targets.extend(load_manifest(args.manifest))
+    if not targets:
+        parser.error("--target_dir ou --manifest est requis")
+
+    for target in targets:
+        if not os.path.exists(target):
+            print(f"ERROR: Dossier {target} introuvable.")
+            sys.exit(1)
+
+    if args.metrics_port is not None:
+        from src.tools.metrics_server import start_metrics_server
+        server = start_metrics_server(args.metrics_port)
+        print(f"Metrics: http://127.0.0.1:{server.server_address[1]}/metrics")
+
+    if len(targets) > 1:
+        run_batch_mode(targets, args)
+        return
+
+    args.target_dir = targets[0]
+    from src.tools.llm_tool import configure_llm_limiter, configure_llm_ttft
+    if args.max_llm_calls:
+        configure_llm_limiter(args.max_llm_calls)
+    # Time to first token is only shown on the --trace timeline
+    configure_llm_ttft(bool(args.trace))
 
     # Initialize logger (OBLIGATOIRE pour le protocole)
-    initialize_logger()
+    initialize_logger(shard=args.log_shard)
+    # Durées des agents, outils et appels LLM
+    tracker = TelemetryTracker()
+    tracker.initialize(Path("logs"), shard=args.log_shard)
 
     print(f"DEMARRAGE SUR : {args.target_dir}")
     log_experiment(
@@ -46,6 +86,14 @@ def main():
             status_icon = "PASSED" if test_result.get('tests_passed') else "FAILED"
             print(f"   Tests: {status_icon}")
             print(f"   Quality Score: {test_result.get('quality_score', 0):.2f}/10")
+
+        usage = final_state.get('token_usage', {}).get('total')
+        if usage:
+            print(f"   LLM: {usage['llm_calls']} appels, {usage['input_tokens']} tokens en entree "
+                  f"({usage['cache_read_tokens']} depuis le cache), {usage['output_tokens']} en sortie, "
+                  f"coût estimé ${usage['cost_usd']:.4f}")
+            for iteration, iteration_usage in sorted(final_state['token_usage']['by_iteration'].items()):
+                print(f"     Iteration {iteration}: {iteration_usage['input_tokens']} + {iteration_usage['output_tokens']} tokens")
         
         if final_state['status'] == 'complete':
             print("\nMISSION_COMPLETE")
@@ -66,10 +114,67 @@ def main():
         )
         print(f"ERREUR: {e}")
         finalize_logger()  # Sauvegarder même en cas d'erreur
+        tracker.finalize()
+        export_trace(tracker, args.trace)
         sys.exit(1)
     
     # Finalize logger (OBLIGATOIRE - sauvegarde sur disque)
     finalize_logger()
+    tracker.finalize()
+    export_trace(tracker, args.trace)
+
+def export_trace(tracker, trace_file, extra_journals=()):
+    """Writes the Chrome trace-event timeline when --trace is given"""
+    if not trace_file:
+        return
+    spans = tracker.export_chrome_trace(Path(trace_file), extra_journals)
+    print(f"Trace ({spans} spans): {trace_file}")
+
+def run_batch_mode(targets, args):
+    """Runs the swarm on several targets with a worker pool and prints the results table"""
+    # Session par défaut pour les entrées système; chaque cible a sa propre session
+    initialize_logger(shard=args.log_shard)
+    tracker = TelemetryTracker()
+    tracker.initialize(Path("logs"), shard=args.log_shard)
+
+    print(f"DEMARRAGE BATCH : {len(targets)} cibles, {args.workers} workers ({args.pool})")
+    log_experiment(
+        agent_name="System",
+        model_used="system",
+        action=ActionType.ANALYSIS,
+        details={
+            "input_prompt": f"Starting batch refactoring on {len(targets)} targets",
+            "output_response": "System initialized successfully",
+            "targets": targets
+        },
+        status="SUCCESS"
+    )
+
+    start = time.perf_counter()
+    rows = run_batch(
+        targets, workers=args.workers, pool=args.pool, max_llm_calls=args.max_llm_calls,
+        measure_ttft=bool(args.trace)
+    )
+    wall_time = time.perf_counter() - start
+
+    print(f"\nRESULTATS:")
+    print(format_results_table(rows, wall_time))
+
+    finalize_logger()
+    tracker.finalize()
+    # Process-pool workers write their own telemetry shard
+    export_trace(tracker, args.trace, sorted({row["telemetry_file"] for row in rows if row.get("telemetry_file")}))
+
+    merged = merge_batch_logs(rows, "logs/experiment_data.merged.json", [get_current_logger().log_file])
+    if merged:
+        print(f"\nLogs fusionnés ({merged['total_entries']} entrées): {merged['output_file']}")
+
+    if all(row["status"] == "complete" for row in rows):
+        print("\nMISSION_COMPLETE")
+    else:
+        print("\nMISSION_INCOMPLETE")
+    if any(row.get("error") for row in rows):
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
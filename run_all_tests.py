@@ -1,8 +1,16 @@
-"""Run the refactoring swarm on all test cases"""
-import os
-import subprocess
+"""Run the refactoring swarm on all test cases (in-process, concurrently)"""
+import argparse
 import json
+import sys
+import time
+from datetime import datetime
 from pathlib import Path
+from dotenv import load_dotenv
+from src.utils.logger import initialize_logger, finalize_logger, get_current_logger
+from src.tools.telemetry import TelemetryTracker
+from src.orchestrator.batch import run_batch, merge_batch_logs
+
+load_dotenv()
 
 test_cases = [
     "test_cases/case01_syntax",
@@ -11,34 +19,95 @@ test_cases = [
     "test_cases/case04_complex"
 ]
 
-results = {}
 
-for test_case in test_cases:
+def print_progress(done: int, total: int, row: dict):
+    """Streams one line per finished case"""
+    status = "✅" if row["status"] == "complete" else ("💥" if row["error"] else "⚠️ ")
+    print(
+        f"{status} [{done}/{total}] {row['target']}: {row['status']} "
+        f"- {row['iterations']} iter, {row['llm_calls']} LLM calls, "
+        f"tools {row['tool_time_s']:.1f}s, total {row['duration_s']:.1f}s"
+    )
+    if row["error"]:
+        print(f"   Errors: {row['error']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the refactoring swarm on all test cases")
+    parser.add_argument("cases", nargs="*", default=test_cases, help="Test case directories")
+    parser.add_argument("--workers", type=int, default=len(test_cases), help="Cases run concurrently")
+    parser.add_argument("--summary", type=Path, default=Path("logs/test_summary.json"), help="JSON summary output")
+    parser.add_argument("--merged_log", type=Path, default=Path("logs/experiment_data.merged.json"), help="Merged log of every case")
+    args = parser.parse_args()
+
     print(f"\n{'='*60}")
-    print(f"🧪 Testing: {test_case}")
+    print(f"🧪 Testing {len(args.cases)} cases ({args.workers} workers)")
     print(f"{'='*60}\n")
-    
-    # Run the refactoring swarm
-    result = subprocess.run(
-        ["python", "main.py", "--target_dir", test_case],
-        capture_output=True,
-        text=True
+
+    initialize_logger()
+    tracker = TelemetryTracker()
+    tracker.initialize(Path("logs"))
+    started_at = datetime.now().isoformat()
+    start = time.perf_counter()
+    rows = run_batch(
+        args.cases,
+        workers=args.workers,
+        on_result=lambda done, row: print_progress(done, len(args.cases), row)
     )
-    
-    print(result.stdout)
-    if result.stderr:
-        print("Errors:", result.stderr)
-    
-    # Store result
-    results[test_case] = {
-        "returncode": result.returncode,
-        "success": result.returncode == 0
+    wall_time = time.perf_counter() - start
+    finalize_logger()
+    tracker.finalize()
+    merged = merge_batch_logs(rows, args.merged_log, [get_current_logger().log_file])
+
+    results = {}
+    for row in rows:
+        results[row["target"]] = {
+            "success": row["error"] is None,
+            "status": row["status"],
+            "iterations": row["iterations"],
+            "tests_passed": row["tests_passed"],
+            "quality_score": row["quality_score"],
+            "llm_calls": row["llm_calls"],
+            "input_tokens": row["input_tokens"],
+            "output_tokens": row["output_tokens"],
+            "cache_read_tokens": row["cache_read_tokens"],
+            "total_tokens": row["input_tokens"] + row["output_tokens"],
+            "cost_usd": row["cost_usd"],
+            "tool_calls": row["tool_calls"],
+            "tool_time_s": row["tool_time_s"],
+            "wall_time_s": round(row["duration_s"], 3),
+            "log_file": row["log_file"],
+            "error": row["error"]
+        }
+
+    summary = {
+        "started_at": started_at,
+        "wall_time_s": round(wall_time, 3),
+        "workers": args.workers,
+        "total_tokens": sum(result["total_tokens"] for result in results.values()),
+        "cost_usd": round(sum(result["cost_usd"] for result in results.values()), 6),
+        "merged_log": merged["output_file"] if merged else None,
+        "cases": results
     }
+    args.summary.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.summary, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+
+    # Summary
+    print("\n" + "="*60)
+    print("📊 SUMMARY")
+    print("="*60)
+    for case, result in results.items():
+        status = "✅ PASSED" if result["success"] else "❌ FAILED"
+        print(f"{case}: {status} ({result['status']}, {result['wall_time_s']:.1f}s)")
+    print(f"\nTokens: {summary['total_tokens']} - estimated cost: ${summary['cost_usd']:.4f}")
+    print(f"\nWall time: {wall_time:.1f}s - summary written to {args.summary}")
+    if merged:
+        print(f"Merged log ({merged['total_entries']} entries): {merged['output_file']}")
+
+    if not all(result["success"] for result in results.values()):
+        sys.exit(1)
+
 
-# Summary
-print("\n" + "="*60)
-print("📊 SUMMARY")
-print("="*60)
-for case, result in results.items():
-    status = "✅ PASSED" if result["success"] else "❌ FAILED"
-    print(f"{case}: {status}")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark du validateur de télémétrie
+Responsable: Data Officer
+
+Génère un document de télémétrie synthétique puis compare la validation
+jsonschema de chaque événement (compiled=False) au schéma compilé
+(compiled=True). Les deux chemins doivent produire le même rapport.
+"""
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Ajouter le répertoire src au path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from tools.data_validator import DataValidator
+from utils.log_writer import write_json_document
+
+
+def generate_document(path: Path, events: int, invalid_every: int = 0):
+    """
+    Écrit un document de télémétrie de events événements
+
+    Args:
+        path: Fichier de sortie
+        events: Nombre d'événements
+        invalid_every: Un événement sur invalid_every a une itération négative (0: aucun)
+    """
+    start = datetime(2026, 1, 1)
+
+    def records():
+        for i in range(events):
+            yield {
+                "event_id": str(uuid.UUID(int=i + 1)),
+                "timestamp": (start + timedelta(milliseconds=i)).isoformat(),
+                "event_type": "tool_call",
+                "agent_name": "pylint",
+                "iteration": -1 if invalid_every and i % invalid_every == invalid_every - 1 else i // 1000,
+                "data": {"span": "subprocess", "file": f"module_{i % 50}.py"},
+                "duration_ms": 12.5,
+                "success": True,
+                "error_message": None
+            }
+
+    write_json_document(path, {
+        "metadata": {
+            "session_id": "benchmark",
+            "start_time": start.isoformat(),
+            "last_update": start.isoformat(),
+            "total_events": events,
+            "current_iteration": events // 1000
+        },
+        "metrics": {
+            "session_id": "benchmark",
+            "start_time": start.isoformat(),
+            "end_time": start.isoformat(),
+            "total_iterations": events // 1000,
+            "total_events": events,
+            "successful_events": events,
+            "failed_events": 0,
+            "success_rate": 1.0
+        }
+    }, "events", records())
+
+
+def time_validation(path: Path, compiled: bool, runs: int):
+    """Meilleur temps (secondes) sur runs validations, et le résultat"""
+    best, result = None, None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = DataValidator.validate_file(path, compiled=compiled)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    """Point d'entrée principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Compare la validation jsonschema et la validation par schéma compilé"
+    )
+    parser.add_argument("--events", type=int, default=100000, help="Nombre d'événements générés")
+    parser.add_argument("--runs", type=int, default=3, help="Répétitions (meilleur temps retenu)")
+    parser.add_argument(
+        "--invalid-every",
+        type=int,
+        default=0,
+        help="Rendre invalide un événement sur N (0: document valide)"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "telemetry_data.json"
+        generate_document(path, args.events, args.invalid_every)
+        size_mb = path.stat().st_size / 1e6
+        print(f"📄 {args.events} événements ({size_mb:.1f} Mo)\n")
+
+        generic_time, generic_result = time_validation(path, False, args.runs)
+        compiled_time, compiled_result = time_validation(path, True, args.runs)
+
+    print(f"{'Chemin':<12}{'Temps (s)':>12}{'Événements/s':>16}")
+    for name, elapsed in (("jsonschema", generic_time), ("compilé", compiled_time)):
+        print(f"{name:<12}{elapsed:>12.2f}{args.events / elapsed:>16,.0f}")
+    print(f"\n⚡ Accélération: x{generic_time / compiled_time:.1f}")
+
+    if generic_result != compiled_result:
+        print("❌ Les deux chemins ne produisent pas le même rapport")
+        print(f"   jsonschema: {generic_result}")
+        print(f"   compilé:    {compiled_result}")
+        sys.exit(1)
+    print(f"✅ Rapports identiques ({'valide' if compiled_result[0] else 'invalide'})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Ingestion des logs dans la base d'analyse multi-sessions (SQLite)
+Responsable: Data Officer
+
+Charge les documents du logger et de la télémétrie (fichiers, répertoires ou
+motifs glob) ; une session déjà chargée depuis un fichier inchangé est
+ignorée, une session modifiée est remplacée. Les documents fusionnés
+(*.merged.json) sont exclus : leurs sessions sont chargées depuis leurs
+propres fichiers. Les requêtes --trends,
+--percentiles et --regressions interrogent ensuite toutes les sessions.
+"""
+import json
+import sys
+from pathlib import Path
+
+# Ajouter le répertoire src au path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from tools.analytics_store import AnalyticsStore, DEFAULT_ANALYTICS_DB
+from tools.metrics_analyzer import MetricsAnalyzer
+from utils.log_merge import expand_shard_paths
+
+
+def main():
+    """Point d'entrée principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Charge les logs dans la base SQLite d'analyse multi-sessions"
+    )
+    parser.add_argument(
+        "paths",
+        nargs="*",
+        help="Documents du logger ou de la télémétrie (fichiers, répertoires ou motifs glob)"
+    )
+    parser.add_argument("--db", type=Path, default=DEFAULT_ANALYTICS_DB, help="Base SQLite")
+    parser.add_argument(
+        "--pattern",
+        default="*_data*.json",
+        help="Motif des fichiers dans les répertoires (experiment_data*, telemetry_data*)"
+    )
+    parser.add_argument(
+        "--trends",
+        choices=["day", "week", "month"],
+        help="Afficher l'évolution par agent sur la période"
+    )
+    parser.add_argument(
+        "--percentiles",
+        choices=["agent_name", "event_type", "model", "tool"],
+        help="Afficher les percentiles de durée par regroupement"
+    )
+    parser.add_argument(
+        "--regressions",
+        action="store_true",
+        help="Afficher les agents ralentis (5 dernières sessions contre les 20 précédentes)"
+    )
+    args = parser.parse_args()
+
+    if args.paths:
+        paths = [p for p in expand_shard_paths(args.paths, args.pattern) if not p.name.endswith(".merged.json")]
+        print(f"📥 Ingestion de {len(paths)} fichier(s) dans {args.db}...\n")
+        counts = {}
+        with AnalyticsStore(args.db) as store:
+            for path in paths:
+                try:
+                    status = store.ingest(path)
+                except (OSError, json.JSONDecodeError) as e:
+                    status = "error"
+                    print(f"  ❌ {path}: {e}")
+                counts[status] = counts.get(status, 0) + 1
+            total = store.connection.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        print("  " + ", ".join(f"{status}: {count}" for status, count in sorted(counts.items())))
+        print(f"✅ {total} session(s) dans la base\n")
+
+    if args.trends:
+        print(json.dumps(MetricsAnalyzer.session_trends(args.db, args.trends), indent=2, ensure_ascii=False))
+    if args.percentiles:
+        print(json.dumps(MetricsAnalyzer.session_percentiles(args.db, args.percentiles), indent=2, ensure_ascii=False))
+    if args.regressions:
+        regressions = MetricsAnalyzer.session_regressions(args.db)
+        if not regressions:
+            print("✅ Aucune régression de latence détectée")
+        for row in regressions:
+            print(
+                f"⚠️  {row['agent_name']}: p50 {row['baseline_p50_ms']:.1f} -> {row['recent_p50_ms']:.1f} ms "
+                f"(x{row['ratio']:.2f}, {row['recent_events']} mesures récentes)"
+            )
+
+
+if __name__ == "__main__":
+    main()
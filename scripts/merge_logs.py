@@ -0,0 +1,76 @@
+"""
+Script de fusion des shards de logs
+Responsable: Data Officer
+
+Fusionne les journaux produits par des processus ou sessions parallèles
+(experiment_data.<session_id>.jsonl, telemetry_data.<session_id>.jsonl) en
+un seul document, trié par timestamp.
+"""
+import sys
+from pathlib import Path
+
+# Ajouter le répertoire src au path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from utils.log_merge import MergeError, expand_shard_paths, merge_shards
+from tools.data_validator import DataValidator
+
+
+def main():
+    """Point d'entrée principal"""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Fusionne des shards de logs en un seul document JSON"
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="*",
+        default=["logs"],
+        help="Shards, répertoires ou motifs glob (défaut: logs/)"
+    )
+    parser.add_argument(
+        "--pattern",
+        default="experiment_data.*.jsonl",
+        help="Motif des shards dans les répertoires (ex: telemetry_data.*.jsonl)"
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=Path("logs/experiment_data.merged.json"),
+        help="Document fusionné"
+    )
+    parser.add_argument(
+        "--no-validate",
+        action="store_true",
+        help="Ne pas valider le document fusionné"
+    )
+
+    args = parser.parse_args()
+
+    paths = [p for p in expand_shard_paths(args.inputs, args.pattern) if p.resolve() != args.output.resolve()]
+    print(f"🔀 Fusion de {len(paths)} shard(s)...")
+
+    try:
+        result = merge_shards(paths, args.output)
+    except MergeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    print(f"   Sessions: {len(result['sessions'])}")
+    print(f"   Entrées: {result['total_entries']}")
+    print(f"💾 Document fusionné: {result['output_file']}")
+
+    # DataValidator reconnaît le format du document (logger ou télémétrie)
+    if not args.no_validate:
+        is_valid, errors = DataValidator.validate_file(args.output)
+        if not is_valid:
+            print("\n❌ VALIDATION ÉCHOUÉE")
+            for error in errors:
+                print(f"  - {error}")
+            sys.exit(1)
+        print("✅ Document fusionné valide")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,19 @@
 Script de validation de télémétrie
 Responsable: Data Officer
 """
+import glob
+import json
 import sys
+import time
 from pathlib import Path
 
 # Ajouter le répertoire src au path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from tools.data_validator import DataValidator
+from tools.data_validator import DataValidator, load_checkpoint
 from tools.metrics_analyzer import MetricsAnalyzer
+from tools.pandas_analyzer import PANDAS_AVAILABLE, PandasMetricsAnalyzer
+from utils.log_merge import MergeError, expand_shard_paths, merge_shards
 
 
 def main():
@@ -21,8 +26,8 @@ def main():
     )
     parser.add_argument(
         "log_file",
-        type=Path,
-        help="Chemin vers experiment_data.json"
+        nargs="+",
+        help="Chemin vers experiment_data.json, ou fichiers, répertoires et motifs glob à valider en lot"
     )
     parser.add_argument(
         "--report",
@@ -34,9 +39,87 @@ def main():
         type=Path,
         help="Exporter les métriques pour visualisation"
     )
+    parser.add_argument(
+        "--shards",
+        nargs="+",
+        help="Shards (fichiers, répertoires ou motifs) à fusionner dans log_file avant validation"
+    )
+    parser.add_argument(
+        "--shard-pattern",
+        default="telemetry_data.*.jsonl",
+        help="Motif des shards dans les répertoires passés à --shards"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Valider seulement les lignes ajoutées au journal JSONL depuis le dernier checkpoint"
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Avec --incremental: ignorer le checkpoint et revalider tout le journal"
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["auto", "python", "pandas"],
+        default="auto",
+        help="Moteur d'analyse des métriques (auto: pandas s'il est installé)"
+    )
+    parser.add_argument(
+        "--pattern",
+        default="telemetry_data*.json",
+        help="Motif des fichiers dans les répertoires à valider en lot"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Nombre de processus pour la validation en lot (défaut: nombre de cœurs)"
+    )
+    parser.add_argument(
+        "--summary",
+        type=Path,
+        help="Résumé JSON de la validation en lot (statut par fichier, débit)"
+    )
     
     args = parser.parse_args()
     
+    # Validation en lot : plusieurs fichiers, un répertoire ou un motif glob
+    single = args.log_file[0] if len(args.log_file) == 1 else None
+    if single is None or glob.has_magic(single) or Path(single).is_dir():
+        validate_batch(args)
+        return
+    args.log_file = Path(single)
+    
+    # Validation incrémentale du journal append-only (CI, longues exécutions)
+    if args.incremental:
+        journal = args.log_file if args.log_file.suffix == ".jsonl" else args.log_file.with_suffix(".jsonl")
+        print(f"🔍 Validation incrémentale de {journal}...\n")
+        is_valid, errors = DataValidator.validate_journal(journal, use_checkpoint=not args.full)
+        if not is_valid:
+            print("❌ VALIDATION ÉCHOUÉE")
+            for error in errors:
+                print(f"  - {error}")
+            sys.exit(1)
+        checkpoint = load_checkpoint(journal)
+        print(
+            f"✅ {checkpoint['checked_events']} nouvel(s) événement(s) validé(s), "
+            f"{checkpoint['state']['event_count']} au total"
+        )
+        return
+    
+    # Fusion des shards produits par des processus parallèles
+    if args.shards:
+        paths = [
+            p for p in expand_shard_paths(args.shards, args.shard_pattern)
+            if p.resolve() != args.log_file.resolve()
+        ]
+        print(f"🔀 Fusion de {len(paths)} shard(s) dans {args.log_file}...\n")
+        try:
+            merge_shards(paths, args.log_file)
+        except MergeError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+    
     # Validation
     print("🔍 Validation du fichier de télémétrie...\n")
     report = DataValidator.generate_report(args.log_file)
@@ -50,7 +133,8 @@ def main():
     
     # Analyse des métriques
     print("\n📊 Analyse des métriques...\n")
-    analyzer = MetricsAnalyzer(args.log_file)
+    use_pandas = args.backend == "pandas" or (args.backend == "auto" and PANDAS_AVAILABLE)
+    analyzer = (PandasMetricsAnalyzer if use_pandas else MetricsAnalyzer)(args.log_file)
     summary = analyzer.generate_summary_report()
     print(summary)
     
@@ -70,5 +154,34 @@ def main():
     print("\n✅ Validation et analyse terminées avec succès!")
 
 
+def validate_batch(args):
+    """Valide en parallèle tous les fichiers désignés par args.log_file"""
+    paths = expand_shard_paths(args.log_file, args.pattern)
+    if not paths:
+        print("❌ Aucun fichier à valider")
+        sys.exit(1)
+    
+    print(f"🔍 Validation de {len(paths)} fichier(s)...\n")
+    start = time.perf_counter()
+    results = DataValidator.validate_files(paths, workers=args.workers)
+    summary = DataValidator.batch_summary(results, time.perf_counter() - start)
+    
+    report = DataValidator.generate_batch_report(summary)
+    print(report)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            f.write(report)
+        print(f"\n💾 Rapport sauvegardé dans: {args.report}")
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+        print(f"💾 Résumé JSON sauvegardé dans: {args.summary}")
+    
+    if summary["failed_files"]:
+        print(f"\n❌ VALIDATION ÉCHOUÉE ({summary['failed_files']} fichier(s))")
+        sys.exit(1)
+    print("\n✅ Tous les fichiers sont valides")
+
+
 if __name__ == "__main__":
     main()
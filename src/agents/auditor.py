@@ -4,6 +4,8 @@ The Auditor Agent - Analyzes code and creates refactoring plan
 from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import HumanMessage, SystemMessage
 from src.tools.pylint_tool import run_pylint_directory
+from src.tools.llm_tool import add_usage, empty_usage, invoke_llm_with_usage
+from src.tools.telemetry import timed
 from src.utils.logger import log_experiment, ActionType
 import os
 
@@ -13,6 +15,7 @@ def load_system_prompt():
     with open(prompt_path, "r", encoding="utf-8") as f:
         return f.read()
 
+@timed(agent_name="Auditor")
 def run_auditor(target_dir: str) -> dict:
     """
     Analyzes all Python files in target directory
@@ -66,14 +69,15 @@ def run_auditor(target_dir: str) -> dict:
         HumanMessage(content=f"Analyze this code and create a refactoring plan:\n\n{analysis_summary}")
     ]
     
-    response = llm.invoke(messages)
+    response, usage = invoke_llm_with_usage(llm, messages, agent_name="Auditor")
     
     plan = {
         "status": "plan_created",
         "files_analyzed": pylint_result.get('total_files', 0),
         "average_score": pylint_result.get('average_score', 0),
         "plan": response.content,
-        "details": files_info
+        "details": files_info,
+        "token_usage": add_usage(empty_usage(), usage)
     }
     
     log_experiment(
@@ -84,7 +88,8 @@ def run_auditor(target_dir: str) -> dict:
             "input_prompt": analysis_summary,
             "output_response": response.content,
             "files_analyzed": plan['files_analyzed'],
-            "average_score": plan['average_score']
+            "average_score": plan['average_score'],
+            **usage
         },
         status="SUCCESS"
     )
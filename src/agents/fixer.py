@@ -5,6 +5,8 @@ from langchain_anthropic import ChatAnthropic
 from langchain_core.messages import HumanMessage, SystemMessage
 from src.tools.file_tools import read_file, write_file
 from src.tools.sandbox_guard import is_path_allowed
+from src.tools.llm_tool import add_usage, empty_usage, invoke_llm_with_usage
+from src.tools.telemetry import timed
 from src.utils.logger import log_experiment, ActionType
 import os
 
@@ -14,6 +16,7 @@ def load_system_prompt():
     with open(prompt_path, "r", encoding="utf-8") as f:
         return f.read()
 
+@timed(agent_name="Fixer")
 def run_fixer(plan: dict, target_dir: str, test_results: dict = None) -> dict:
     """
     Applies fixes to code based on the plan
@@ -35,6 +38,7 @@ def run_fixer(plan: dict, target_dir: str, test_results: dict = None) -> dict:
     system_prompt = load_system_prompt()
     
     files_fixed = []
+    token_usage = empty_usage()
     
     # Determine context
     if test_results and test_results.get("status") == "failed":
@@ -84,7 +88,8 @@ def run_fixer(plan: dict, target_dir: str, test_results: dict = None) -> dict:
                 HumanMessage(content=f"{context}\n\nFile: {filepath}\n\nCurrent code:\n{current_code}\n\nProvide the fixed code.")
             ]
             
-            response = llm.invoke(messages)
+            response, usage = invoke_llm_with_usage(llm, messages, agent_name="Fixer", file=filepath)
+            add_usage(token_usage, usage)
             fixed_code = response.content
             
             # Extract code from markdown if present
@@ -101,7 +106,8 @@ def run_fixer(plan: dict, target_dir: str, test_results: dict = None) -> dict:
                 details={
                     "input_prompt": current_code[:500],
                     "output_response": fixed_code[:500],
-                    "filepath": filepath
+                    "filepath": filepath,
+                    **usage
                 },
                 status="SUCCESS"
             )
@@ -122,7 +128,8 @@ def run_fixer(plan: dict, target_dir: str, test_results: dict = None) -> dict:
     result = {
         "status": "fixed",
         "files_fixed": len(files_fixed),
-        "files": files_fixed
+        "files": files_fixed,
+        "token_usage": token_usage
     }
     
     log_experiment(
@@ -132,7 +139,8 @@ def run_fixer(plan: dict, target_dir: str, test_results: dict = None) -> dict:
         details={
             "input_prompt": f"Completed fixing {len(files_fixed)} files",
             "output_response": f"Fixed {len(files_fixed)} files successfully",
-            "files_fixed": files_fixed
+            "files_fixed": files_fixed,
+            "token_usage": token_usage
         },
         status="SUCCESS"
     )
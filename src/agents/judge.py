@@ -3,9 +3,11 @@ The Judge Agent - Runs tests and validates the code
 """
 from src.tools.pytest_tool import run_pytest
 from src.tools.pylint_tool import run_pylint_directory
+from src.tools.telemetry import timed
 from src.utils.logger import log_experiment, ActionType
 import os
 
+@timed(agent_name="Judge")
 def run_judge(target_dir: str) -> dict:
     """
     Runs tests on the target directory
@@ -0,0 +1,232 @@
+"""
+Mode batch du Refactoring Swarm
+Exécute le workflow Auditor -> Fixer -> Judge sur plusieurs cibles avec un pool de workers
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
+from multiprocessing import Manager
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+
+POOL_KINDS = ("thread", "process")
+
+# Entrées gardées en mémoire par session de cible ; les plus anciennes ne sont que dans le journal
+SESSION_LOG_WINDOW = 1000
+
+
+def load_manifest(manifest_path: str) -> List[str]:
+    """
+    Lit un fichier manifeste : un répertoire cible par ligne
+    Les lignes vides et celles commençant par '#' sont ignorées
+    """
+    targets = []
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                targets.append(line)
+    return targets
+
+
+def _empty_row(target_dir: str) -> dict:
+    """Ligne de résultat d'une cible qui n'a pas produit d'état final"""
+    return {
+        "target": target_dir,
+        "status": "error",
+        "iterations": 0,
+        "tests_passed": False,
+        "quality_score": 0.0,
+        "duration_s": 0.0,
+        "llm_calls": 0,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "cache_read_tokens": 0,
+        "cost_usd": 0.0,
+        "tool_calls": 0,
+        "tool_time_s": 0.0,
+        "log_file": None,
+        "telemetry_file": None,
+        "error": None
+    }
+
+
+def _init_worker_process(log_dir: str, limiter, measure_ttft: bool = False):
+    """
+    Initialisation d'un worker du pool de processus : limiteur LLM partagé
+    par le pool (sémaphore du Manager de run_batch) et fragment de
+    télémétrie propre au processus
+    (log_dir/telemetry_data.<session_id>.jsonl, fusionnés par scripts/merge_logs.py)
+    """
+    from src.tools.llm_tool import configure_llm_ttft, use_llm_limiter
+    from src.tools.telemetry import TelemetryTracker
+
+    use_llm_limiter(limiter)
+    configure_llm_ttft(measure_ttft)
+    # Avec fork, le worker hérite du tracker et du session_id du parent : nouvelle session
+    tracker = TelemetryTracker()
+    tracker.detach()
+    tracker.initialize(Path(log_dir), shard=True)
+
+
+def _run_target(target_dir: str, log_dir: str) -> dict:
+    """
+    Exécute le swarm sur une cible et retourne sa ligne de résultat
+    Chaque cible a sa propre session de logger (log_dir/experiment_data.<session_id>.json)
+    """
+    from src.orchestrator.graph import run_refactoring_swarm
+    from src.tools.telemetry import TelemetryTracker
+    from src.utils.logger import create_session_logger
+    from src.utils.run_stats import collect_run_stats
+
+    logger = create_session_logger(Path(log_dir), max_in_memory=SESSION_LOG_WINDOW)
+
+    start = time.perf_counter()
+    row = _empty_row(target_dir)
+    row["log_file"] = str(logger.log_file)
+    try:
+        with collect_run_stats() as stats:
+            try:
+                final_state = run_refactoring_swarm(target_dir, logger=logger)
+            finally:
+                row.update(stats.to_dict())
+        test_result = final_state.get("test_result") or {}
+        row.update({
+            "status": final_state["status"],
+            "iterations": final_state.get("iteration", 0),
+            "tests_passed": bool(test_result.get("tests_passed")),
+            "quality_score": test_result.get("quality_score", 0.0)
+        })
+    except Exception as e:
+        row["error"] = str(e)
+    finally:
+        row["duration_s"] = time.perf_counter() - start
+        logger.finalize(verbose=False)
+        # Les workers du pool se terminent sans exécuter les handlers atexit
+        tracker = TelemetryTracker()
+        tracker.flush()
+        if tracker.log_file is not None:
+            row["telemetry_file"] = str(tracker.log_file.with_suffix(".jsonl"))
+    return row
+
+
+def run_batch(
+    targets: List[str],
+    workers: int = 4,
+    pool: str = "thread",
+    log_dir: Path = Path("logs"),
+    max_llm_calls: Optional[int] = None,
+    on_result: Optional[Callable[[int, dict], None]] = None,
+    measure_ttft: bool = False
+) -> List[dict]:
+    """
+    Exécute le swarm sur toutes les cibles en parallèle
+
+    Chaque cible écrit dans son propre fichier de session dans log_dir,
+    quel que soit le pool. Le limiteur LLM (max_llm_calls appels
+    simultanés) est partagé par tous les workers : sémaphore du processus
+    avec pool="thread", sémaphore d'un multiprocessing.Manager avec
+    pool="process". Avec pool="thread" le tracker de télémétrie est lui
+    aussi partagé ; avec pool="process" chaque worker écrit son propre
+    fragment de télémétrie.
+
+    on_result(nombre_terminées, ligne) est appelé à la fin de chaque cible ;
+    par défaut une ligne de progression est affichée. measure_ttft fait
+    streamer les appels LLM pour mesurer le délai du premier token (voir
+    configure_llm_ttft).
+
+    Retourne une ligne de résultat par cible, dans l'ordre des cibles
+    """
+    if pool not in POOL_KINDS:
+        raise ValueError(f"Type de pool inconnu: {pool} (attendu: {POOL_KINDS})")
+
+    from src.tools.llm_tool import DEFAULT_MAX_CONCURRENT_CALLS, configure_llm_limiter, configure_llm_ttft
+
+    manager = None
+    if pool == "thread":
+        if max_llm_calls:
+            configure_llm_limiter(max_llm_calls)
+        configure_llm_ttft(measure_ttft)
+        executor = ThreadPoolExecutor(max_workers=max(1, workers))
+    else:
+        # Un seul sémaphore pour tout le pool : la limite ne dépend pas du nombre de workers
+        manager = Manager()
+        limiter = manager.BoundedSemaphore(max_llm_calls or DEFAULT_MAX_CONCURRENT_CALLS)
+        executor = ProcessPoolExecutor(
+            max_workers=max(1, workers),
+            initializer=_init_worker_process,
+            initargs=(str(log_dir), limiter, measure_ttft)
+        )
+
+    rows = {}
+    with manager or nullcontext(), executor:
+        futures = {
+            executor.submit(_run_target, target, str(log_dir)): index
+            for index, target in enumerate(targets)
+        }
+
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                rows[index] = future.result()
+            except Exception as e:
+                # Plantage du worker (ex. processus tué par le système)
+                rows[index] = _empty_row(targets[index])
+                rows[index]["error"] = str(e)
+            row = rows[index]
+            if on_result:
+                on_result(len(rows), row)
+            else:
+                print(f"[{len(rows)}/{len(targets)}] {row['target']}: {row['status']} ({row['duration_s']:.1f}s)")
+
+    return [rows[i] for i in range(len(targets))]
+
+
+def merge_batch_logs(rows: List[dict], output_file: Path, extra_logs: Iterable[Path] = ()) -> Optional[dict]:
+    """
+    Fusionne les logs de session des cibles d'un batch en un document, trié par timestamp
+
+    extra_logs sont fusionnés aussi (ex. la session par défaut qui porte les entrées System).
+    Retourne le résumé de la fusion, ou None si aucune cible n'a produit de log
+    """
+    from src.utils.log_merge import merge_shards
+
+    paths = [Path(row["log_file"]) for row in rows if row.get("log_file")]
+    paths.extend(Path(path) for path in extra_logs if path)
+    paths = [path for path in paths if path.exists() or path.with_suffix(".jsonl").exists()]
+    if not paths:
+        return None
+    return merge_shards(paths, Path(output_file))
+
+
+def format_results_table(rows: List[dict], wall_time_s: float = None) -> str:
+    """Met en forme les résultats agrégés avec les durées par cible"""
+    width = max([len("Cible")] + [len(row["target"]) for row in rows])
+    header = (
+        f"{'Cible':<{width}}  {'Statut':<15} {'Itér':>4}  {'Tests':<6} {'Score':>6}  "
+        f"{'LLM':>4}  {'Tokens':>9}  {'Coût ($)':>8}  {'Outils (s)':>10}  {'Durée (s)':>9}"
+    )
+    lines = [header, "-" * len(header)]
+
+    for row in rows:
+        tests = "PASSED" if row["tests_passed"] else "FAILED"
+        lines.append(
+            f"{row['target']:<{width}}  {row['status']:<15} {row['iterations']:>4}  "
+            f"{tests:<6} {row['quality_score']:>6.2f}  {row.get('llm_calls', 0):>4}  "
+            f"{row.get('input_tokens', 0) + row.get('output_tokens', 0):>9}  "
+            f"{row.get('cost_usd', 0.0):>8.4f}  "
+            f"{row.get('tool_time_s', 0.0):>10.1f}  {row['duration_s']:>9.1f}"
+        )
+        if row.get("error"):
+            lines.append(f"{'':<{width}}  ERREUR: {row['error']}")
+
+    lines.append("-" * len(header))
+    completed = sum(1 for row in rows if row["status"] == "complete")
+    cpu_time = sum(row["duration_s"] for row in rows)
+    tokens = sum(row.get("input_tokens", 0) + row.get("output_tokens", 0) for row in rows)
+    cost = sum(row.get("cost_usd", 0.0) for row in rows)
+    summary = f"Terminées: {completed}/{len(rows)}  Tokens: {tokens}  Coût: ${cost:.4f}  Somme des durées: {cpu_time:.1f}s"
+    if wall_time_s is not None:
+        summary += f"  Durée totale: {wall_time_s:.1f}s"
+    lines.append(summary)
+    return "\n".join(lines)
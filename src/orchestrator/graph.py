@@ -3,11 +3,13 @@ LangGraph Orchestration for The Refactoring Swarm
 Implements the feedback loop: Auditor -> Fixer -> Judge
 """
 from langgraph.graph import StateGraph, END
-from typing import TypedDict, Literal
+from typing import TypedDict, Literal, Optional
 from src.agents.auditor import run_auditor
 from src.agents.fixer import run_fixer
 from src.agents.judge import run_judge
-from src.utils.logger import log_experiment, ActionType
+from src.tools.llm_tool import add_usage, empty_usage
+from src.tools.telemetry import timed_span
+from src.utils.logger import log_experiment, ActionType, ExperimentLogger, use_logger
 
 class RefactoringState(TypedDict):
     """State shared between agents"""
@@ -17,26 +19,52 @@ class RefactoringState(TypedDict):
     test_result: dict
     iteration: int
     status: str
+    token_usage: dict  # LLM calls, tokens and latency: total, by_node, by_iteration
+    logger: Optional[ExperimentLogger]  # Session logger (None = default session)
 
 MAX_ITERATIONS = 15  # Augmenté de 10 à 15 pour les cas complexes
 
+def _node_span(node: str, state: RefactoringState):
+    """Timing span of one graph node (parent of the agent, tool and LLM spans)"""
+    return timed_span(
+        f"node:{node}",
+        "Orchestrator",
+        kind="node",
+        data={"target_dir": state["target_dir"], "iteration": state.get("iteration", 0)}
+    )
+
+def _record_usage(state: RefactoringState, node: str, result: dict):
+    """Adds the LLM usage of an agent result to the run, node and iteration totals"""
+    usage = result.get("token_usage")
+    if not usage:
+        return
+    totals = state.setdefault("token_usage", {"total": empty_usage(), "by_node": {}, "by_iteration": {}})
+    add_usage(totals["total"], usage)
+    add_usage(totals["by_node"].setdefault(node, empty_usage()), usage)
+    add_usage(totals["by_iteration"].setdefault(state.get("iteration", 0), empty_usage()), usage)
+
 def auditor_node(state: RefactoringState) -> RefactoringState:
     """Run the auditor agent"""
-    plan = run_auditor(state["target_dir"])
+    with use_logger(state.get("logger")), _node_span("auditor", state):
+        plan = run_auditor(state["target_dir"])
     state["plan"] = plan
+    _record_usage(state, "auditor", plan)
     state["status"] = "audited"
     return state
 
 def fixer_node(state: RefactoringState) -> RefactoringState:
     """Run the fixer agent"""
-    fix_result = run_fixer(state["plan"], state["target_dir"], state.get("test_result"))
+    with use_logger(state.get("logger")), _node_span("fixer", state):
+        fix_result = run_fixer(state["plan"], state["target_dir"], state.get("test_result"))
     state["fix_result"] = fix_result
+    _record_usage(state, "fixer", fix_result)
     state["status"] = "fixed"
     return state
 
 def judge_node(state: RefactoringState) -> RefactoringState:
     """Run the judge agent"""
-    test_result = run_judge(state["target_dir"])
+    with use_logger(state.get("logger")), _node_span("judge", state):
+        test_result = run_judge(state["target_dir"])
     state["test_result"] = test_result
     state["iteration"] = state.get("iteration", 0) + 1
     
@@ -44,17 +72,18 @@ def judge_node(state: RefactoringState) -> RefactoringState:
         state["status"] = "complete"
     elif state["iteration"] >= MAX_ITERATIONS:
         state["status"] = "max_iterations"
-        log_experiment(
-            agent_name="Orchestrator",
-            model_used="langgraph",
-            action=ActionType.DEBUG,
-            details={
-                "input_prompt": f"Reached maximum iterations",
-                "output_response": f"Stopping at iteration {state['iteration']}",
-                "iteration": state["iteration"]
-            },
-            status="ERROR"
-        )
+        with use_logger(state.get("logger")):
+            log_experiment(
+                agent_name="Orchestrator",
+                model_used="langgraph",
+                action=ActionType.DEBUG,
+                details={
+                    "input_prompt": f"Reached maximum iterations",
+                    "output_response": f"Stopping at iteration {state['iteration']}",
+                    "iteration": state["iteration"]
+                },
+                status="ERROR"
+            )
     else:
         state["status"] = "retry"
     
@@ -90,11 +119,17 @@ def create_graph():
     
     return workflow.compile()
 
-def run_refactoring_swarm(target_dir: str) -> dict:
+def run_refactoring_swarm(target_dir: str, logger: Optional[ExperimentLogger] = None) -> dict:
     """
     Main orchestration function
+    When a session logger is given, every agent of the run logs into it
     Returns the final state after refactoring
     """
+    with use_logger(logger):
+        return _run_workflow(target_dir, logger)
+
+def _run_workflow(target_dir: str, logger: Optional[ExperimentLogger]) -> dict:
+    """Runs the graph with the session logger already active"""
     log_experiment(
         agent_name="Orchestrator",
         model_used="langgraph",
@@ -114,7 +149,9 @@ def run_refactoring_swarm(target_dir: str) -> dict:
         "fix_result": {},
         "test_result": {},
         "iteration": 0,
-        "status": "init"
+        "status": "init",
+        "token_usage": {"total": empty_usage(), "by_node": {}, "by_iteration": {}},
+        "logger": logger
     }
     
     # Create and run graph
@@ -129,7 +166,8 @@ def run_refactoring_swarm(target_dir: str) -> dict:
             "input_prompt": "Refactoring workflow completed",
             "output_response": f"Status: {final_state['status']}, Iterations: {final_state.get('iteration', 0)}",
             "iterations": final_state.get('iteration', 0),
-            "final_status": final_state['status']
+            "final_status": final_state['status'],
+            "token_usage": final_state.get('token_usage', {}).get('total')
         },
         status="SUCCESS"
     )
@@ -0,0 +1,412 @@
+"""
+Base d'analyse multi-sessions (SQLite)
+Responsable: Data Officer
+
+MetricsAnalyzer travaille sur un seul fichier. AnalyticsStore charge les
+documents du logger (experiment_data*.json) et de la télémétrie
+(telemetry_data*.json), ou leurs journaux JSONL, dans une base SQLite locale
+indexée (lecture en un passage par log_ingest.RecordStream) :
+
+- sessions : une ligne par session (fichier source, bornes, volume) ;
+- iterations : agrégats par itération (sessions de télémétrie) ;
+- events : événements de télémétrie et entrées du logger ;
+- tool_calls : appels d'outils terminés (durée, succès).
+
+L'ingestion est idempotente et incrémentale par session_id : un fichier
+déjà chargé et inchangé (taille, date de modification) est ignoré, une
+session modifiée est remplacée en une transaction. Une session déjà
+chargée depuis un autre fichier (telemetry_data.json et
+telemetry_data.<session_id>.json) n'est remplacée que par un fichier plus
+récent ; les documents fusionnés (merge_logs.py, merged_sessions) sont
+ignorés, leurs sessions étant chargées depuis leurs propres fichiers.
+"""
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from ..utils.histogram import LogHistogram
+    from ..utils.log_ingest import KIND_EVENTS, RecordStream, session_head
+except ImportError:
+    import sys
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from utils.histogram import LogHistogram
+    from utils.log_ingest import KIND_EVENTS, RecordStream, session_head
+
+# Base par défaut (à côté des logs)
+DEFAULT_ANALYTICS_DB = Path("logs") / "analytics.db"
+
+# Statuts d'ingestion d'un document qui n'est pas chargé (voir AnalyticsStore.ingest)
+_NOT_INGESTED = ("merged", "duplicate")
+
+# Lignes insérées par executemany
+_BATCH_SIZE = 5000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    source TEXT NOT NULL,
+    source_size INTEGER NOT NULL,
+    source_mtime_ns INTEGER NOT NULL,
+    start_time TEXT,
+    end_time TEXT,
+    total_events INTEGER NOT NULL,
+    ingested_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_source ON sessions(source);
+CREATE INDEX IF NOT EXISTS idx_sessions_start ON sessions(start_time);
+
+CREATE TABLE IF NOT EXISTS iterations (
+    session_id TEXT NOT NULL,
+    iteration INTEGER NOT NULL,
+    events_count INTEGER NOT NULL,
+    successful_events INTEGER NOT NULL,
+    failed_events INTEGER NOT NULL,
+    start_time TEXT,
+    end_time TEXT,
+    PRIMARY KEY (session_id, iteration)
+);
+
+CREATE TABLE IF NOT EXISTS events (
+    session_id TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    event_type TEXT NOT NULL,
+    agent_name TEXT NOT NULL,
+    model TEXT,
+    iteration INTEGER,
+    duration_ms REAL,
+    success INTEGER NOT NULL,
+    error_message TEXT,
+    PRIMARY KEY (session_id, event_id)
+);
+CREATE INDEX IF NOT EXISTS idx_events_agent_time ON events(agent_name, timestamp);
+CREATE INDEX IF NOT EXISTS idx_events_type_time ON events(event_type, timestamp);
+
+CREATE TABLE IF NOT EXISTS tool_calls (
+    session_id TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    tool TEXT NOT NULL,
+    span TEXT,
+    iteration INTEGER,
+    duration_ms REAL,
+    success INTEGER NOT NULL,
+    error_message TEXT,
+    PRIMARY KEY (session_id, event_id)
+);
+CREATE INDEX IF NOT EXISTS idx_tool_calls_tool_time ON tool_calls(tool, timestamp);
+"""
+
+_SESSION_TABLES = ("iterations", "events", "tool_calls", "sessions")
+
+# Regroupements acceptés par percentiles() : colonne -> table
+_PERCENTILE_GROUPS = {
+    "agent_name": "events",
+    "event_type": "events",
+    "model": "events",
+    "tool": "tool_calls",
+}
+
+# Format strftime de SQLite par période de trends()
+_PERIOD_FORMATS = {
+    "day": "%Y-%m-%d",
+    "week": "%Y-W%W",
+    "month": "%Y-%m",
+}
+
+
+def _record_rows(session_id: str, record: Dict[str, Any], kind: str) -> Tuple[tuple, Optional[tuple]]:
+    """
+    (ligne events, ligne tool_calls ou None) d'une entrée normalisée
+
+    Une entrée du logger n'a ni itération ni appel d'outil ; son modèle est model_used.
+    """
+    data = record.get("data") or {}
+    telemetry = kind == KIND_EVENTS
+    row = (
+        session_id, record.get("event_id"), record.get("timestamp", ""), record.get("event_type", ""),
+        record.get("agent_name", ""), record.get("model_used", data.get("model")),
+        record.get("iteration") if telemetry else None, record.get("duration_ms"),
+        1 if record.get("success", True) else 0, record.get("error_message")
+    )
+    tool_call = None
+    # Un appel d'outil tracé par timed_span émet un début et une fin : seule la fin est gardée
+    if telemetry and record.get("event_type") == "tool_call" and data.get("phase") != "start":
+        tool_call = (
+            session_id, record.get("event_id"), record.get("timestamp", ""), record.get("agent_name", ""),
+            data.get("span"), record.get("iteration"), record.get("duration_ms"),
+            1 if record.get("success", True) else 0, record.get("error_message")
+        )
+    return row, tool_call
+
+
+class AnalyticsStore:
+    """Base SQLite des sessions ingérées et requêtes transverses"""
+
+    def __init__(self, db_path: Path = DEFAULT_ANALYTICS_DB):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(str(self.db_path))
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript(_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self) -> "AnalyticsStore":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # --------------------------------------------------------------- ingestion
+
+    def ingest(self, path: Path) -> str:
+        """
+        Charge un document du logger ou de la télémétrie (ou son journal JSONL)
+
+        Returns:
+            "ingested" (nouvelle session), "updated" (session remplacée),
+            "skipped" (fichier inchangé depuis la dernière ingestion),
+            "duplicate" (session déjà chargée depuis un autre fichier, plus
+            récent ou du même âge), "merged" (document fusionné) ou
+            "unknown" (ni logger ni télémétrie)
+        """
+        path = Path(path)
+        source = str(path.resolve())
+        stat = path.stat()
+        unchanged = self.connection.execute(
+            "SELECT 1 FROM sessions WHERE source = ? AND source_size = ? AND source_mtime_ns = ?",
+            (source, stat.st_size, stat.st_mtime_ns)
+        ).fetchone()
+        if unchanged:
+            return "skipped"
+
+        stream = RecordStream(path)
+        session: Dict[str, Any] = {}
+        events: List[tuple] = []
+        tool_calls: List[tuple] = []
+        count = 0
+        first = last = None
+
+        with self.connection:
+            for record in stream:
+                if not session:
+                    session = self._begin_session(stream.head, stream.kind, path, stat.st_mtime_ns)
+                    if session["status"] in _NOT_INGESTED:
+                        return session["status"]
+                row, tool_call = _record_rows(session["session_id"], record, stream.kind)
+                events.append(row)
+                if tool_call is not None:
+                    tool_calls.append(tool_call)
+                count += 1
+                timestamp = row[2]
+                first = timestamp if first is None or timestamp < first else first
+                last = timestamp if last is None or timestamp > last else last
+                if len(events) >= _BATCH_SIZE:
+                    self._insert_rows(events, tool_calls)
+
+            if not session:
+                if stream.kind is None:
+                    return "unknown"
+                session = self._begin_session(stream.head, stream.kind, path, stat.st_mtime_ns)
+                if session["status"] in _NOT_INGESTED:
+                    return session["status"]
+            self._insert_rows(events, tool_calls)
+
+            head = stream.head
+            metadata = session_head(head)["metadata"]
+            end_time = head.get("metrics", {}).get("end_time") or metadata.get("last_update")
+            self.connection.execute(
+                "INSERT INTO sessions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    session["session_id"], session["kind"], source, stat.st_size, stat.st_mtime_ns,
+                    metadata.get("start_time") or first, end_time or last, count,
+                    datetime.now().isoformat()
+                )
+            )
+            if session["kind"] == "telemetry":
+                self.connection.execute(
+                    """
+                    INSERT INTO iterations
+                    SELECT session_id, iteration, COUNT(*), SUM(success), COUNT(*) - SUM(success),
+                           MIN(timestamp), MAX(timestamp)
+                    FROM events WHERE session_id = ? AND iteration IS NOT NULL
+                    GROUP BY iteration
+                    """,
+                    (session["session_id"],)
+                )
+        return session["status"]
+
+    def _begin_session(self, head: Dict[str, Any], key: str, path: Path, mtime_ns: int) -> Dict[str, Any]:
+        """
+        Identifie la session du document et supprime sa version précédente
+
+        Le statut vaut "merged" ou "duplicate" (voir ingest) quand le
+        document ne doit pas être chargé ; rien n'est alors supprimé.
+        """
+        kind = "telemetry" if key == KIND_EVENTS else "logger"
+        metadata = session_head(head)["metadata"]
+        if metadata.get("merged_sessions") is not None:
+            return {"status": "merged"}
+        session_id = metadata.get("session_id") or path.stem
+        existed = self.connection.execute(
+            "SELECT source, source_mtime_ns FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if existed and existed["source"] != str(path.resolve()) and mtime_ns <= existed["source_mtime_ns"]:
+            return {"status": "duplicate"}
+        for table in _SESSION_TABLES:
+            self.connection.execute(f"DELETE FROM {table} WHERE session_id = ?", (session_id,))
+        return {"session_id": session_id, "kind": kind, "status": "updated" if existed else "ingested"}
+
+    def _insert_rows(self, events: List[tuple], tool_calls: List[tuple]):
+        """Insère puis vide les lignes en attente"""
+        self.connection.executemany("INSERT OR IGNORE INTO events VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", events)
+        self.connection.executemany("INSERT OR IGNORE INTO tool_calls VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", tool_calls)
+        events.clear()
+        tool_calls.clear()
+
+    def ingest_many(self, paths: Iterable[Path]) -> Dict[str, str]:
+        """Charge plusieurs documents ; retourne le statut par fichier"""
+        return {str(path): self.ingest(path) for path in paths}
+
+    # ---------------------------------------------------------------- requêtes
+
+    def sessions(self) -> List[Dict[str, Any]]:
+        """Sessions ingérées, de la plus récente à la plus ancienne"""
+        rows = self.connection.execute("SELECT * FROM sessions ORDER BY start_time DESC")
+        return [dict(row) for row in rows]
+
+    def trends(
+        self,
+        period: str = "day",
+        agent_name: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Évolution par période et par agent : volume, taux de succès, durée moyenne
+
+        Args:
+            period: "day", "week" ou "month"
+            agent_name: Seulement cet agent
+            since / until: Bornes ISO sur le timestamp des événements
+        """
+        if period not in _PERIOD_FORMATS:
+            raise ValueError(f"Période inconnue: {period} (attendu: {', '.join(_PERIOD_FORMATS)})")
+        where, params = self._time_filter(since, until)
+        if agent_name is not None:
+            where.append("agent_name = ?")
+            params.append(agent_name)
+        rows = self.connection.execute(
+            f"""
+            SELECT strftime(?, timestamp) AS period, agent_name,
+                   COUNT(*) AS events, COUNT(DISTINCT session_id) AS sessions,
+                   AVG(success) AS success_rate, AVG(duration_ms) AS mean_duration_ms
+            FROM events {self._where(where)}
+            GROUP BY period, agent_name
+            ORDER BY period, agent_name
+            """,
+            [_PERIOD_FORMATS[period], *params]
+        )
+        return [dict(row) for row in rows]
+
+    def percentiles(
+        self,
+        group_by: str = "agent_name",
+        since: Optional[str] = None,
+        until: Optional[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Percentiles de durée (count, mean, p50, p95, p99, max en ms) toutes sessions confondues
+
+        Args:
+            group_by: "agent_name", "event_type", "model" ou "tool" (table tool_calls)
+            since / until: Bornes ISO sur le timestamp des événements
+        """
+        if group_by not in _PERCENTILE_GROUPS:
+            raise ValueError(f"Regroupement inconnu: {group_by} (attendu: {', '.join(_PERCENTILE_GROUPS)})")
+        where, params = self._time_filter(since, until)
+        where.append("duration_ms IS NOT NULL")
+        histograms: Dict[str, LogHistogram] = {}
+        rows = self.connection.execute(
+            f"SELECT {group_by}, duration_ms FROM {_PERCENTILE_GROUPS[group_by]} {self._where(where)}",
+            params
+        )
+        for name, duration in rows:
+            histograms.setdefault(name or "unknown", LogHistogram()).record(duration)
+        return {name: histogram.summary() for name, histogram in sorted(histograms.items())}
+
+    def regressions(
+        self,
+        recent_sessions: int = 5,
+        baseline_sessions: int = 20,
+        threshold: float = 1.25,
+        min_events: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Agents dont la latence médiane a augmenté : les recent_sessions
+        sessions les plus récentes sont comparées aux baseline_sessions précédentes
+
+        Args:
+            threshold: Rapport p50 récent / p50 de référence à partir duquel l'agent est signalé
+            min_events: Mesures minimales de chaque côté pour comparer
+
+        Returns:
+            Agents signalés, du plus fort ralentissement au plus faible
+        """
+        ordered = [row[0] for row in self.connection.execute(
+            "SELECT session_id FROM sessions ORDER BY start_time DESC LIMIT ?",
+            (recent_sessions + baseline_sessions,)
+        )]
+        windows = {
+            "recent": ordered[:recent_sessions],
+            "baseline": ordered[recent_sessions:]
+        }
+        histograms: Dict[str, Dict[str, LogHistogram]] = {"recent": {}, "baseline": {}}
+        for window, session_ids in windows.items():
+            for session_id in session_ids:
+                rows = self.connection.execute(
+                    "SELECT agent_name, duration_ms FROM events WHERE session_id = ? AND duration_ms IS NOT NULL",
+                    (session_id,)
+                )
+                for agent, duration in rows:
+                    histograms[window].setdefault(agent, LogHistogram()).record(duration)
+
+        flagged = []
+        for agent, recent in histograms["recent"].items():
+            baseline = histograms["baseline"].get(agent)
+            if baseline is None or recent.count < min_events or baseline.count < min_events:
+                continue
+            baseline_p50, recent_p50 = baseline.percentile(50), recent.percentile(50)
+            if not baseline_p50 or recent_p50 < baseline_p50 * threshold:
+                continue
+            flagged.append({
+                "agent_name": agent,
+                "baseline_p50_ms": baseline_p50,
+                "recent_p50_ms": recent_p50,
+                "baseline_p95_ms": baseline.percentile(95),
+                "recent_p95_ms": recent.percentile(95),
+                "ratio": recent_p50 / baseline_p50,
+                "baseline_events": baseline.count,
+                "recent_events": recent.count
+            })
+        return sorted(flagged, key=lambda row: row["ratio"], reverse=True)
+
+    @staticmethod
+    def _time_filter(since: Optional[str], until: Optional[str]) -> Tuple[List[str], List[Any]]:
+        where, params = [], []
+        if since is not None:
+            where.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("timestamp <= ?")
+            params.append(until)
+        return where, params
+
+    @staticmethod
+    def _where(conditions: List[str]) -> str:
+        return f"WHERE {' AND '.join(conditions)}" if conditions else ""
@@ -2,13 +2,38 @@
 Data Validator - Valide la conformité des données de télémétrie
 Responsable: Data Officer
 """
+import gzip
+import hashlib
+import itertools
 import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+try:
+    from .schema_compiler import compile_schema, schema_digest
+    from ..utils.blob_store import BlobStore, BLOB_REF_KEY, is_blob_ref
+    from ..utils.bloom import ScalableBloomFilter, DEFAULT_BLOOM_CAPACITY
+    from ..utils.json_stream import JsonDocumentReader
+    from ..utils.log_ingest import KIND_EVENTS, KIND_LOGS, normalize_record, session_head
+    from ..utils.log_writer import FOOTER_KEY, HEADER_KEY, iter_journal_records, load_segment_index, read_jsonl_header
+except ImportError:
+    import sys
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from tools.schema_compiler import compile_schema, schema_digest
+    from utils.blob_store import BlobStore, BLOB_REF_KEY, is_blob_ref
+    from utils.bloom import ScalableBloomFilter, DEFAULT_BLOOM_CAPACITY
+    from utils.json_stream import JsonDocumentReader
+    from utils.log_ingest import KIND_EVENTS, KIND_LOGS, normalize_record, session_head
+    from utils.log_writer import FOOTER_KEY, HEADER_KEY, iter_journal_records, load_segment_index, read_jsonl_header
 
 # Import avec fallback
 try:
     from jsonschema import validate, ValidationError, Draft7Validator
+    from jsonschema.exceptions import best_match
 except ImportError:
     print("⚠️  jsonschema non installé. Installez avec: pip install jsonschema")
     # Créer des classes mock pour éviter les erreurs
@@ -16,10 +41,170 @@ except ImportError:
         pass
     def validate(*args, **kwargs):
         pass
+    Draft7Validator = None
+    best_match = None
+
+
+# Format des checkpoints de validation incrémentale
+CHECKPOINT_VERSION = 1
+
+
+def checkpoint_path(journal_path: Path) -> Path:
+    """Checkpoint de validation d'un journal (telemetry_data.jsonl -> telemetry_data.checkpoint.json)"""
+    journal_path = Path(journal_path)
+    return journal_path.with_name(f"{journal_path.stem}.checkpoint.json")
+
+
+def load_checkpoint(journal_path: Path) -> Optional[Dict[str, Any]]:
+    """Dernier checkpoint de validation du journal (None si absent ou illisible)"""
+    path = checkpoint_path(journal_path)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            checkpoint = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    return checkpoint if checkpoint.get("version") == CHECKPOINT_VERSION else None
+
+
+def _save_checkpoint(journal_path: Path, checkpoint: Dict[str, Any]):
+    path = checkpoint_path(journal_path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+def _open_binary(path: Path):
+    return gzip.open(path, "rb") if path.suffix == ".gz" else open(path, "rb")
+
+
+def _validate_path(path: str) -> Dict[str, Any]:
+    """Valide un fichier (exécuté dans un processus du pool de validate_files)"""
+    file_path = Path(path)
+    start = time.perf_counter()
+    try:
+        is_valid, errors = DataValidator.validate_file(file_path)
+    except Exception as e:
+        is_valid, errors = False, [f"Erreur inattendue: {e}"]
+    return {
+        "file": str(file_path),
+        "valid": is_valid,
+        "errors": errors,
+        "bytes": file_path.stat().st_size if file_path.exists() else 0,
+        "seconds": time.perf_counter() - start
+    }
+
+
+class _StreamChecks:
+    """
+    Contrôles faits en un seul passage sur les entrées d'un document :
+    nombre d'événements, unicité des event_id (filtre de Bloom, doublons
+    suspects confirmés ensuite de façon exacte), ordre chronologique et
+    présence des blobs référencés.
+    """
+    
+    def __init__(self, blob_dir: Optional[Path] = None):
+        self.event_count = 0
+        self.successful_events = 0
+        self.suspects = set()
+        self.unordered = False
+        self.blob_errors: List[str] = []
+        self._ids: Optional[ScalableBloomFilter] = None
+        self._previous_timestamp = None
+        self._blob_dir = blob_dir
+        self._blob_store = None
+    
+    def reserve(self, head: Any):
+        """Dimensionne le filtre d'unicité d'après metadata.total_events"""
+        metadata = head.get("metadata") if isinstance(head, dict) else None
+        total = metadata.get("total_events") if isinstance(metadata, dict) else None
+        capacity = total if isinstance(total, int) and total > DEFAULT_BLOOM_CAPACITY else DEFAULT_BLOOM_CAPACITY
+        self._ids = ScalableBloomFilter(capacity)
+    
+    @staticmethod
+    def id_key(event_id: Any) -> str:
+        # Les identifiants (chaînes) sont pris tels quels, sans sérialisation
+        if isinstance(event_id, str):
+            return "s" + event_id
+        return "j" + json.dumps(event_id, sort_keys=True)
+    
+    def add_event(self, event: Any):
+        event = event if isinstance(event, dict) else {}
+        self.event_count += 1
+        self.successful_events += event.get("success") is True
+        
+        if self._ids is None:
+            self.reserve(None)
+        key = self.id_key(event.get("event_id"))
+        if self._ids.add(key.encode("utf-8")):
+            self.suspects.add(key)
+        
+        timestamp = event.get("timestamp")
+        if self.event_count > 1 and not self.unordered:
+            try:
+                self.unordered = self._previous_timestamp > timestamp
+            except TypeError:
+                self.unordered = True
+        self._previous_timestamp = timestamp
+        
+        self.check_blobs(event.get("event_id"), event.get("data"))
+    
+    def to_state(self) -> Dict[str, Any]:
+        """Compteurs et empreinte des identifiants (checkpoint de validation)"""
+        if self._ids is None:
+            self.reserve(None)
+        return {
+            "event_count": self.event_count,
+            "successful_events": self.successful_events,
+            "unordered": self.unordered,
+            "last_timestamp": self._previous_timestamp,
+            "ids": self._ids.to_dict()
+        }
+    
+    @classmethod
+    def from_state(cls, state: Dict[str, Any], blob_dir: Optional[Path] = None) -> "_StreamChecks":
+        checks = cls(blob_dir)
+        checks.event_count = state["event_count"]
+        checks.successful_events = state["successful_events"]
+        checks.unordered = state["unordered"]
+        checks._previous_timestamp = state["last_timestamp"]
+        checks._ids = ScalableBloomFilter.from_dict(state["ids"])
+        return checks
+    
+    def has_duplicates(self, events: Iterable[Any]) -> bool:
+        """Confirme les doublons suspects par un second passage sur les événements"""
+        if not self.suspects:
+            return False
+        seen = set()
+        for event in events:
+            key = self.id_key(event.get("event_id") if isinstance(event, dict) else None)
+            if key in self.suspects:
+                if key in seen:
+                    return True
+                seen.add(key)
+        return False
+    
+    def check_blobs(self, entry_id: Any, payload: Any):
+        if not isinstance(payload, dict) or self._blob_dir is None:
+            return
+        for field, value in payload.items():
+            if not is_blob_ref(value):
+                continue
+            if self._blob_store is None:
+                self._blob_store = BlobStore(self._blob_dir)
+            if not self._blob_store.exists(value[BLOB_REF_KEY]):
+                self.blob_errors.append(
+                    f"Blob introuvable pour {entry_id}.{field}: {value[BLOB_REF_KEY]}"
+                )
+
+
+def _normalized(kind: str, item: Any) -> Any:
+    """Entrée au format des événements pour _StreamChecks (une entrée qui n'est pas un objet reste telle quelle)"""
+    return normalize_record(item, kind) if isinstance(item, dict) else item
 
 
 class DataValidator:
-    """Validateur de données pour le fichier experiment_data.json"""
+    """Validateur des documents de télémétrie et du logger (experiment_data.json)"""
     
     # Schéma JSON attendu pour le fichier de télémétrie
     SCHEMA = {
@@ -81,13 +266,55 @@ class DataValidator:
         }
     }
     
+    # Schéma JSON attendu pour le document du logger
+    LOGS_SCHEMA = {
+        "type": "object",
+        "required": ["session_id", "start_time", "last_update", "total_logs", "logs"],
+        "properties": {
+            "session_id": {"type": "string"},
+            "start_time": {"type": "string"},
+            "last_update": {"type": "string"},
+            "total_logs": {"type": "integer", "minimum": 0},
+            "logs": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "required": [
+                        "log_id", "timestamp", "agent_name",
+                        "model_used", "action", "status", "details"
+                    ],
+                    "properties": {
+                        "log_id": {"type": "string"},
+                        "timestamp": {"type": "string"},
+                        "agent_name": {"type": "string"},
+                        "model_used": {"type": "string"},
+                        "action": {"type": "string"},
+                        "status": {"type": "string"},
+                        "details": {
+                            "type": "object",
+                            "required": ["input_prompt", "output_response"]
+                        }
+                    }
+                }
+            }
+        }
+    }
+    
     @classmethod
-    def validate_file(cls, file_path: Path) -> Tuple[bool, List[str]]:
+    def validate_file(cls, file_path: Path, compiled: bool = True) -> Tuple[bool, List[str]]:
         """
-        Valide un fichier experiment_data.json
+        Valide un document de télémétrie ou du logger
+        
+        Le document est lu en streaming (JsonDocumentReader) : chaque
+        entrée est validée contre le schéma et comptée au passage, la
+        mémoire ne dépend pas du nombre d'entrées. Le format est celui de la
+        liste parcourue : "events" (SCHEMA) ou "logs" (LOGS_SCHEMA).
         
         Args:
             file_path: Chemin vers le fichier à valider
+            compiled: Tester d'abord chaque instance avec le schéma compilé
+                (schema_compiler) ; jsonschema ne détaille que les instances
+                refusées. False: jsonschema sur chaque instance.
             
         Returns:
             Tuple (is_valid, errors_list)
@@ -98,28 +325,77 @@ class DataValidator:
         if not file_path.exists():
             return False, ["Le fichier experiment_data.json n'existe pas"]
         
-        # Charger le JSON
+        reader = JsonDocumentReader(file_path, (KIND_EVENTS, KIND_LOGS))
+        checks = _StreamChecks(file_path.parent / "blobs")
+        entry_validators = {}
+        kind = None
+        entry_error = None
+        
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            for key, index, item in reader:
+                if kind is None:
+                    kind = key
+                    checks.reserve(session_head(reader.head))
+                if key == kind:
+                    checks.add_event(_normalized(key, item))
+                if key not in entry_validators:
+                    entry_schema = cls._document_schema(key)["properties"][key]["items"]
+                    entry_validators[key] = (
+                        Draft7Validator(entry_schema) if Draft7Validator else None,
+                        compile_schema(entry_schema) if compiled else None
+                    )
+                entry_validator, is_valid_entry = entry_validators[key]
+                if entry_validator is not None and not (is_valid_entry and is_valid_entry(item)):
+                    for error in entry_validator.iter_errors(item):
+                        error.path.extendleft((index, key))
+                        entry_error = best_match([entry_error, error]) if entry_error else error
         except json.JSONDecodeError as e:
             return False, [f"Erreur de parsing JSON: {str(e)}"]
         except Exception as e:
             return False, [f"Erreur de lecture du fichier: {str(e)}"]
         
-        # Valider contre le schéma
-        try:
-            validate(instance=data, schema=cls.SCHEMA)
-        except ValidationError as e:
-            errors.append(f"Erreur de validation du schéma: {e.message}")
-            errors.append(f"Chemin: {' -> '.join(str(p) for p in e.path)}")
+        head = reader.head
+        if kind is None:
+            # Aucune entrée parcourue : document du logger s'il n'a que la liste "logs"
+            is_logs = isinstance(head, dict) and (
+                KIND_LOGS in reader.streamed or (KIND_LOGS in head and KIND_EVENTS not in head)
+            )
+            kind = KIND_LOGS if is_logs else KIND_EVENTS
+        schema = cls._document_schema(kind)
+        
+        # Valider contre le schéma (la tête, puis l'erreur retenue parmi les entrées)
+        if Draft7Validator is not None:
+            instance = head
+            if kind in reader.streamed:
+                instance = {**head, kind: []}
+            is_valid_document = compile_schema(schema) if compiled else None
+            head_errors = () if is_valid_document and is_valid_document(instance) else (
+                Draft7Validator(schema).iter_errors(instance)
+            )
+            e = best_match(itertools.chain(head_errors, [entry_error] if entry_error else []))
+            if e is not None:
+                errors.append(f"Erreur de validation du schéma: {e.message}")
+                errors.append(f"Chemin: {' -> '.join(str(p) for p in e.path)}")
         
         # Validations supplémentaires
-        additional_errors = cls._validate_business_rules(data)
-        errors.extend(additional_errors)
+        if kind in reader.streamed:
+            duplicates = checks.has_duplicates(_normalized(key, item) for key, _, item in reader if key == kind)
+            if kind == KIND_LOGS:
+                errors.extend(cls._logs_rule_errors(head, checks.event_count, duplicates, checks.unordered))
+            else:
+                errors.extend(cls._business_rule_errors(head, checks.event_count, duplicates, checks.unordered))
+        elif kind == KIND_EVENTS and isinstance(head, dict):
+            # "events" absent ou qui n'est pas une liste: contrôles sur la valeur décodée
+            errors.extend(cls._validate_business_rules(head))
+        errors.extend(checks.blob_errors)
         
         return len(errors) == 0, errors
     
+    @classmethod
+    def _document_schema(cls, kind: str) -> Dict[str, Any]:
+        """Schéma du document selon la nature de ses entrées (KIND_EVENTS ou KIND_LOGS)"""
+        return cls.LOGS_SCHEMA if kind == KIND_LOGS else cls.SCHEMA
+    
     @classmethod
     def _validate_business_rules(cls, data: Dict[str, Any]) -> List[str]:
         """
@@ -128,6 +404,32 @@ class DataValidator:
         Args:
             data: Données à valider
             
+        Returns:
+            Liste des erreurs trouvées
+        """
+        events = data.get("events", [])
+        checks = _StreamChecks()
+        for event in events:
+            checks.add_event(event)
+        return cls._business_rule_errors(data, len(events), checks.has_duplicates(events), checks.unordered)
+    
+    @classmethod
+    def _business_rule_errors(
+        cls,
+        data: Dict[str, Any],
+        event_count: int,
+        duplicates: bool,
+        unordered: bool
+    ) -> List[str]:
+        """
+        Règles métier à partir des compteurs d'un passage sur les événements
+        
+        Args:
+            data: Champs de tête du document (metadata, metrics)
+            event_count: Nombre réel d'événements
+            duplicates: Des event_id en double ont été trouvés
+            unordered: Un événement précède chronologiquement le précédent
+            
         Returns:
             Liste des erreurs trouvées
         """
@@ -135,22 +437,19 @@ class DataValidator:
         
         # Vérifier la cohérence des compteurs
         metadata = data.get("metadata", {})
-        events = data.get("events", [])
         
-        if metadata.get("total_events") != len(events):
+        if metadata.get("total_events") != event_count:
             errors.append(
                 f"Incohérence: metadata.total_events ({metadata.get('total_events')}) "
-                f"!= nombre réel d'événements ({len(events)})"
+                f"!= nombre réel d'événements ({event_count})"
             )
         
         # Vérifier que tous les événements ont des IDs uniques
-        event_ids = [e.get("event_id") for e in events]
-        if len(event_ids) != len(set(event_ids)):
+        if duplicates:
             errors.append("Des event_id en double ont été détectés")
         
         # Vérifier que les timestamps sont dans l'ordre chronologique
-        timestamps = [e.get("timestamp") for e in events]
-        if timestamps != sorted(timestamps):
+        if unordered:
             errors.append("Les événements ne sont pas triés chronologiquement")
         
         # Vérifier les métriques
@@ -167,6 +466,264 @@ class DataValidator:
         
         return errors
     
+    @classmethod
+    def _logs_rule_errors(
+        cls,
+        data: Dict[str, Any],
+        entry_count: int,
+        duplicates: bool,
+        unordered: bool
+    ) -> List[str]:
+        """
+        Règles métier d'un document du logger (voir _business_rule_errors)
+        
+        Args:
+            data: Champs de tête du document (session_id, total_logs...)
+            entry_count: Nombre réel d'entrées
+            duplicates: Des log_id en double ont été trouvés
+            unordered: Une entrée précède chronologiquement la précédente
+            
+        Returns:
+            Liste des erreurs trouvées
+        """
+        errors = []
+        
+        if data.get("total_logs") != entry_count:
+            errors.append(
+                f"Incohérence: total_logs ({data.get('total_logs')}) "
+                f"!= nombre réel d'entrées ({entry_count})"
+            )
+        if duplicates:
+            errors.append("Des log_id en double ont été détectés")
+        if unordered:
+            errors.append("Les entrées ne sont pas triées chronologiquement")
+        
+        return errors
+    
+    @classmethod
+    def validate_journal(
+        cls,
+        journal_path: Path,
+        use_checkpoint: bool = True,
+        compiled: bool = True
+    ) -> Tuple[bool, List[str]]:
+        """
+        Valide un journal de télémétrie JSONL (segments tournés puis journal actif)
+        
+        Après une validation réussie, un checkpoint est enregistré à côté du
+        journal (checkpoint_path) : position (segments validés, octet dans le
+        journal actif), empreinte de la dernière ligne lue, dernier timestamp,
+        compteurs et filtre de Bloom des event_id. La validation suivante
+        reprend à cette position et ne lit que les lignes ajoutées. Le
+        journal est relu en entier si le checkpoint ne correspond plus
+        (nouvelle session, journal tronqué, schéma modifié).
+        
+        Args:
+            journal_path: Journal actif (telemetry_data.jsonl)
+            use_checkpoint: Reprendre au dernier checkpoint (False: tout relire)
+            compiled: Voir validate_file
+            
+        Returns:
+            Tuple (is_valid, errors_list)
+        """
+        journal_path = Path(journal_path)
+        if not journal_path.exists():
+            return False, [f"Le journal {journal_path.name} n'existe pas"]
+        
+        events_schema = cls.SCHEMA["properties"]["events"]["items"]
+        digest = schema_digest(events_schema)
+        header = read_jsonl_header(journal_path)
+        segments = [journal_path.with_name(s["file"]) for s in load_segment_index(journal_path)["segments"]]
+        blob_dir = journal_path.parent / "blobs"
+        
+        checkpoint = load_checkpoint(journal_path) if use_checkpoint else None
+        resume = cls._resume_position(checkpoint, journal_path, segments, header, digest)
+        if resume is None:
+            checks, first_source, offset = _StreamChecks(blob_dir), 0, 0
+        else:
+            first_source, offset = resume
+            checks = _StreamChecks.from_state(checkpoint["state"], blob_dir)
+        resumed_count = checks.event_count
+        
+        events_validator = Draft7Validator(events_schema) if Draft7Validator else None
+        is_valid_event = compile_schema(events_schema) if compiled else None
+        event_error = None
+        errors = []
+        footer = None
+        sources = segments + [journal_path]
+        position, last_line = offset, checkpoint["last_line"] if resume else None
+        
+        try:
+            for number in range(first_source, len(sources)):
+                source = sources[number]
+                position = offset if number == first_source else 0
+                with _open_binary(source) as f:
+                    f.seek(position)
+                    for raw in f:
+                        if not raw.endswith(b"\n"):
+                            break  # Ligne en cours d'écriture: reprise au prochain passage
+                        line_start = position
+                        position += len(raw)
+                        last_line = hashlib.sha256(raw).hexdigest()
+                        if not raw.strip():
+                            continue
+                        try:
+                            record = json.loads(raw)
+                        except json.JSONDecodeError as e:
+                            errors.append(f"Erreur de parsing JSON ({source.name}, octet {line_start}): {e}")
+                            continue
+                        if isinstance(record, dict) and HEADER_KEY in record:
+                            continue
+                        if isinstance(record, dict) and FOOTER_KEY in record:
+                            footer = record[FOOTER_KEY]
+                            continue
+                        index = checks.event_count
+                        checks.add_event(record)
+                        if events_validator is not None and not (is_valid_event and is_valid_event(record)):
+                            for error in events_validator.iter_errors(record):
+                                error.path.extendleft((index, "events"))
+                                event_error = best_match([event_error, error]) if event_error else error
+        except Exception as e:
+            return False, [f"Erreur de lecture du fichier: {str(e)}"]
+        
+        if event_error is not None:
+            errors.append(f"Erreur de validation du schéma: {event_error.message}")
+            errors.append(f"Chemin: {' -> '.join(str(p) for p in event_error.path)}")
+        if checks.suspects and checks.has_duplicates(iter_journal_records(journal_path)):
+            errors.append("Des event_id en double ont été détectés")
+        if checks.unordered:
+            errors.append("Les événements ne sont pas triés chronologiquement")
+        if isinstance(footer, dict) and footer.get("total_events") != checks.event_count:
+            errors.append(
+                f"Incohérence: $footer.total_events ({footer.get('total_events')}) "
+                f"!= nombre réel d'événements ({checks.event_count})"
+            )
+        errors.extend(checks.blob_errors)
+        
+        if not errors:
+            _save_checkpoint(journal_path, {
+                "version": CHECKPOINT_VERSION,
+                "schema": digest,
+                "header": header,
+                "segments": len(segments),
+                "offset": position,
+                "last_line": last_line,
+                "validated_at": datetime.now().isoformat(),
+                "checked_events": checks.event_count - resumed_count,
+                "state": checks.to_state()
+            })
+        
+        return len(errors) == 0, errors
+    
+    @classmethod
+    def _resume_position(
+        cls,
+        checkpoint: Optional[Dict[str, Any]],
+        journal_path: Path,
+        segments: List[Path],
+        header: Optional[Dict[str, Any]],
+        digest: str
+    ) -> Optional[Tuple[int, int]]:
+        """
+        Source (index dans segments + [journal actif]) et octet où reprendre,
+        ou None si le checkpoint ne s'applique pas au journal actuel
+        
+        Le journal actif validé est soit toujours le journal actif, soit
+        devenu le segment n° checkpoint["segments"] après une rotation.
+        """
+        if not checkpoint or checkpoint.get("schema") != digest or checkpoint.get("header") != header:
+            return None
+        validated_segments = checkpoint["segments"]
+        if validated_segments > len(segments):
+            return None
+        source = (segments + [journal_path])[validated_segments]
+        offset = checkpoint["offset"]
+        
+        # La dernière ligne validée doit se trouver juste avant offset
+        try:
+            with _open_binary(source) as f:
+                window = max(0, offset - (1 << 20))
+                f.seek(window)
+                before = f.read(offset - window)
+        except OSError:
+            return None
+        if len(before) != offset - window:
+            return None
+        if checkpoint["last_line"] is not None:
+            start = before.rfind(b"\n", 0, len(before) - 1) + 1
+            if hashlib.sha256(before[start:]).hexdigest() != checkpoint["last_line"]:
+                return None
+        return validated_segments, offset
+    
+    @classmethod
+    def validate_files(cls, paths: Iterable[Path], workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Valide plusieurs fichiers en parallèle (un processus par cœur par défaut)
+        
+        Args:
+            paths: Fichiers à valider
+            workers: Nombre de processus (1: dans le processus courant)
+            
+        Returns:
+            Un résultat par fichier ({file, valid, errors, bytes, seconds}),
+            fichiers invalides d'abord puis par nom
+        """
+        paths = [str(p) for p in paths]
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(paths) <= 1:
+            results = [_validate_path(p) for p in paths]
+        else:
+            with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as executor:
+                results = list(executor.map(_validate_path, paths, chunksize=max(1, len(paths) // (workers * 8))))
+        return sorted(results, key=lambda r: (r["valid"], r["file"]))
+    
+    @classmethod
+    def batch_summary(cls, results: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+        """Résumé JSON d'une validation par lot (résultats de validate_files)"""
+        total_bytes = sum(r["bytes"] for r in results)
+        failed = [r for r in results if not r["valid"]]
+        return {
+            "files": len(results),
+            "valid_files": len(results) - len(failed),
+            "failed_files": len(failed),
+            "bytes": total_bytes,
+            "elapsed_seconds": elapsed,
+            "files_per_second": len(results) / elapsed if elapsed else None,
+            "megabytes_per_second": total_bytes / 1e6 / elapsed if elapsed else None,
+            "results": results
+        }
+    
+    @classmethod
+    def generate_batch_report(cls, summary: Dict[str, Any]) -> str:
+        """
+        Rapport d'une validation par lot : fichiers en échec (avec leurs
+        erreurs) d'abord, puis fichiers valides et débit
+        
+        Args:
+            summary: Résultat de batch_summary
+        """
+        report = ["=" * 60]
+        report.append("RAPPORT DE VALIDATION PAR LOT")
+        report.append("=" * 60)
+        report.append(f"Fichiers: {summary['files']}")
+        report.append(f"Valides: {summary['valid_files']}")
+        report.append(f"En échec: {summary['failed_files']}")
+        if summary["files_per_second"] is not None:
+            report.append(
+                f"Débit: {summary['files_per_second']:.1f} fichiers/s, "
+                f"{summary['megabytes_per_second']:.1f} Mo/s ({summary['elapsed_seconds']:.2f} s)"
+            )
+        report.append("")
+        
+        for result in summary["results"]:
+            status = "✓" if result["valid"] else "✗"
+            report.append(f"{status} {result['file']} ({result['seconds'] * 1000:.0f} ms)")
+            for i, error in enumerate(result["errors"], 1):
+                report.append(f"    {i}. {error}")
+        
+        report.append("=" * 60)
+        return "\n".join(report)
+    
     @classmethod
     def generate_report(cls, file_path: Path) -> str:
         """
@@ -0,0 +1,244 @@
+"""
+Index léger d'un document de télémétrie
+Responsable: Data Officer
+
+Pour répondre à un rapport, MetricsAnalyzer n'a besoin que de quelques
+champs (agent, type, itération, succès, durée, timestamp) de chaque
+événement, et du contenu complet d'une minorité d'entre eux (échecs,
+métriques de qualité). L'index garde ces colonnes et la position en octets
+de chaque événement : un rapport lit les colonnes, puis relit seulement les
+événements retenus (seek + json.loads). Un document du logger est indexé
+de la même façon, ses entrées ramenées au format des événements
+(normalize_record).
+
+L'index est construit en un seul passage du document (JsonDocumentReader)
+et enregistré à côté du log (telemetry_data.index.json). Il est reconstruit
+dès que la taille ou la date de modification du log change.
+"""
+import base64
+import json
+import math
+import os
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+try:
+    from .event_store import _MISSING, StringTable, timestamp_to_us, us_to_timestamp
+    from ..utils.json_stream import JsonDocumentReader
+    from ..utils.log_ingest import KIND_EVENTS, KIND_LOGS, normalize_record
+except ImportError:
+    import sys
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from tools.event_store import _MISSING, StringTable, timestamp_to_us, us_to_timestamp
+    from utils.json_stream import JsonDocumentReader
+    from utils.log_ingest import KIND_EVENTS, KIND_LOGS, normalize_record
+
+INDEX_VERSION = 2
+
+# Champs servis directement par les colonnes de l'index
+INDEX_FIELDS = ("event_type", "agent_name", "iteration", "success", "duration_ms", "timestamp")
+
+# Colonnes sérialisées (nom -> code de type array)
+_ARRAY_COLUMNS = {
+    "offsets": "q",
+    "lengths": "I",
+    "event_type": "I",
+    "agent": "I",
+    "iteration": "i",
+    "duration_ms": "d",
+    "timestamp_us": "q",
+}
+
+
+def index_path(log_file: Path) -> Path:
+    """Index d'un log (telemetry_data.json -> telemetry_data.index.json)"""
+    log_file = Path(log_file)
+    return log_file.with_name(f"{log_file.stem}.index.json")
+
+
+def _source_signature(log_file: Path) -> Dict[str, int]:
+    stat = Path(log_file).stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+class EventIndex:
+    """Colonnes légères et positions en octets des événements d'un document"""
+
+    def __init__(self, log_file: Path):
+        self.log_file = Path(log_file)
+        self.head: Dict[str, Any] = {}
+        self.kind = KIND_EVENTS
+        self.strings = StringTable()
+        for name, typecode in _ARRAY_COLUMNS.items():
+            setattr(self, name, array(typecode))
+        self.success = bytearray()
+        self.raw_timestamps: Dict[int, str] = {}
+        self.signature: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    # ------------------------------------------------------------ construction
+
+    @classmethod
+    def build(cls, log_file: Path) -> "EventIndex":
+        """Construit l'index en un passage du document"""
+        index = cls(log_file)
+        index.signature = _source_signature(log_file)
+        reader = JsonDocumentReader(log_file, (KIND_EVENTS, KIND_LOGS), offsets=True)
+        for key, position, item in reader:
+            index.kind = key
+            event = normalize_record(item, key)
+            start, end = reader.span
+            index.offsets.append(start)
+            index.lengths.append(end - start)
+            index.event_type.append(index.strings.code(event.get("event_type", "")))
+            index.agent.append(index.strings.code(event.get("agent_name", "")))
+            iteration = event.get("iteration", 0)
+            index.iteration.append(_MISSING if iteration is None else iteration)
+            duration = event.get("duration_ms")
+            index.duration_ms.append(math.nan if duration is None else duration)
+            index.success.append(1 if event.get("success", True) else 0)
+            timestamp = event.get("timestamp", "")
+            micros = timestamp_to_us(timestamp)
+            if micros is None:
+                index.raw_timestamps[position] = timestamp
+                micros = -1
+            index.timestamp_us.append(micros)
+        index.head = reader.head
+        return index
+
+    @classmethod
+    def load(cls, log_file: Path) -> Optional["EventIndex"]:
+        """Index enregistré du log (None si absent, illisible ou périmé)"""
+        try:
+            with open(index_path(log_file), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            signature = _source_signature(log_file)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if data.get("version") != INDEX_VERSION or data.get("source") != signature:
+            return None
+
+        index = cls(log_file)
+        index.signature = signature
+        index.head = data["head"]
+        index.kind = data["kind"]
+        for value in data["strings"]:
+            index.strings.code(value)
+        for name, typecode in _ARRAY_COLUMNS.items():
+            column = array(typecode)
+            column.frombytes(base64.b64decode(data["columns"][name]))
+            setattr(index, name, column)
+        index.success = bytearray(base64.b64decode(data["columns"]["success"]))
+        index.raw_timestamps = {int(position): value for position, value in data["raw_timestamps"].items()}
+        return index
+
+    @classmethod
+    def open(cls, log_file: Path) -> "EventIndex":
+        """Index enregistré s'il est à jour, sinon construit et enregistré"""
+        index = cls.load(log_file)
+        if index is None:
+            index = cls.build(log_file)
+            try:
+                index.save()
+            except OSError:
+                pass  # Répertoire en lecture seule : l'index sert pour cette analyse seulement
+        return index
+
+    def save(self):
+        """Enregistre l'index à côté du log (remplacement atomique)"""
+        columns = {
+            name: base64.b64encode(getattr(self, name).tobytes()).decode("ascii")
+            for name in _ARRAY_COLUMNS
+        }
+        columns["success"] = base64.b64encode(bytes(self.success)).decode("ascii")
+        path = index_path(self.log_file)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": INDEX_VERSION,
+                "source": self.signature,
+                "head": self.head,
+                "kind": self.kind,
+                "strings": self.strings.values,
+                "raw_timestamps": self.raw_timestamps,
+                "columns": columns
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    # ----------------------------------------------------------------- lecture
+
+    def positions(
+        self,
+        event_type: Optional[str] = None,
+        failed: bool = False,
+        timed: bool = False
+    ) -> Iterable[int]:
+        """
+        Événements retenus par les colonnes de l'index
+
+        Args:
+            event_type: Seulement ce type d'événement
+            failed: Seulement les échecs
+            timed: Seulement les événements ayant une durée
+        """
+        selected: Iterable[int] = range(len(self))
+        if event_type is not None:
+            if event_type not in self.strings.values:
+                return []
+            code = self.strings.code(event_type)
+            selected = [i for i in selected if self.event_type[i] == code]
+        if failed:
+            selected = [i for i in selected if not self.success[i]]
+        if timed:
+            selected = [i for i in selected if not math.isnan(self.duration_ms[i])]
+        return selected
+
+    def value(self, position: int, field: str) -> Any:
+        """Valeur d'un champ de INDEX_FIELDS pour l'événement n° position"""
+        if field == "event_type":
+            return self.strings[self.event_type[position]]
+        if field == "agent_name":
+            return self.strings[self.agent[position]]
+        if field == "iteration":
+            iteration = self.iteration[position]
+            return None if iteration == _MISSING else iteration
+        if field == "success":
+            return bool(self.success[position])
+        if field == "duration_ms":
+            duration = self.duration_ms[position]
+            return None if math.isnan(duration) else duration
+        if field == "timestamp":
+            raw = self.raw_timestamps.get(position)
+            return raw if raw is not None else us_to_timestamp(self.timestamp_us[position])
+        raise KeyError(field)
+
+    def select(self, fields: Iterable[str], positions: Optional[Iterable[int]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Événements réduits aux champs demandés
+
+        Les champs hors INDEX_FIELDS (data, error_message...) sont lus dans le
+        log, pour les seuls événements de positions.
+        """
+        fields = list(fields)
+        indexed = [field for field in fields if field in INDEX_FIELDS]
+        stored: List[str] = [field for field in fields if field not in INDEX_FIELDS]
+        if positions is None:
+            positions = range(len(self))
+
+        if not stored:
+            for position in positions:
+                yield {field: self.value(position, field) for field in indexed}
+            return
+
+        with open(self.log_file, "rb") as f:
+            for position in positions:
+                f.seek(self.offsets[position])
+                event = normalize_record(json.loads(f.read(self.lengths[position])), self.kind)
+                record = {field: self.value(position, field) for field in indexed}
+                for field in stored:
+                    # Mêmes valeurs par défaut que l'EventStore (data vide, pas d'erreur)
+                    record[field] = event.get(field) or {} if field == "data" else event.get(field)
+                yield record
@@ -0,0 +1,238 @@
+"""
+Stockage columnaire des événements de télémétrie
+Responsable: Data Officer
+
+Un événement en dict (ou en dataclass avec son dict data) coûte plusieurs
+centaines d'octets avant toute charge utile : clés répétées, UUID et
+timestamp en chaînes, noms d'agent et de type dupliqués. EventStore range
+chaque champ dans sa propre colonne :
+
+- seq, iteration : array d'entiers ;
+- timestamp : microsecondes depuis l'époque (array('q')) ;
+- event_id : 16 octets par UUID dans un bytearray ;
+- event_type, agent_name : codes d'une table de chaînes internées ;
+- duration_ms : array('d') (NaN pour None), success : bytearray ;
+- error_message : dictionnaire creux (seulement les échecs) ;
+- data : dict d'origine, clés et valeurs usuelles (model, span...) internées.
+
+L'itération restitue chaque événement au format JSON du schéma (dict).
+"""
+import math
+import sys
+import uuid
+from array import array
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+# Origine des timestamps numériques (heure locale naïve, comme datetime.now())
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+# Valeurs de data répétées d'un événement à l'autre, internées à l'ajout
+INTERNED_DATA_FIELDS = ("model", "span", "phase", "thread")
+
+# Marqueur de colonne pour « valeur absente » (seq, iteration, timestamp, event_id)
+_MISSING = -1
+
+
+class StringTable:
+    """Table de chaînes internées : chaque valeur distincte n'est stockée qu'une fois"""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def code(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(sys.intern(value))
+        return code
+
+    def __getitem__(self, code: int) -> str:
+        return self.values[code]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+def timestamp_to_us(timestamp: str) -> Optional[int]:
+    """Timestamp ISO naïf -> microsecondes (None si non convertible sans perte)"""
+    try:
+        moment = datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is not None:
+        return None
+    micros = (moment - _EPOCH) // _MICROSECOND
+    # Écritures non canoniques (".000000", espace comme séparateur) gardées telles quelles
+    return micros if us_to_timestamp(micros) == timestamp else None
+
+
+def us_to_timestamp(value: int) -> str:
+    """Microsecondes -> timestamp ISO (inverse exact de timestamp_to_us)"""
+    return (_EPOCH + timedelta(microseconds=value)).isoformat()
+
+
+def _compact_data(data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if not data:
+        return {}
+    compact = {}
+    for key, value in data.items():
+        if key in INTERNED_DATA_FIELDS and isinstance(value, str):
+            value = sys.intern(value)
+        compact[sys.intern(key)] = value
+    return compact
+
+
+class EventStore:
+    """
+    Événements de télémétrie en colonnes (struct-of-arrays)
+
+    Avec max_events, les plus anciens événements sont supprimés par blocs
+    (1/8 de la capacité) quand la capacité est dépassée.
+    """
+
+    def __init__(self, max_events: Optional[int] = None):
+        self.max_events = max_events
+        self.strings = StringTable()
+        self.clear()
+
+    def clear(self):
+        self.seq = array("q")
+        self.timestamp_us = array("q")
+        self.event_ids = bytearray()
+        self.event_type = array("I")
+        self.agent = array("I")
+        self.iteration = array("i")
+        self.duration_ms = array("d")
+        self.success = bytearray()
+        self.data: List[Dict[str, Any]] = []
+        # Valeurs hors format compact (timestamp avec fuseau, identifiant non UUID)
+        # et messages d'erreur, indexés par position absolue
+        self._raw_timestamps: Dict[int, str] = {}
+        self._raw_ids: Dict[int, str] = {}
+        self._errors: Dict[int, str] = {}
+        self._offset = 0  # Nombre d'événements supprimés en tête
+
+    def __len__(self) -> int:
+        return len(self.seq)
+
+    def append(self, event: Any):
+        """Ajoute un Event (ou tout objet ayant les mêmes attributs)"""
+        self._append(
+            event.event_id, event.timestamp, event.event_type, event.agent_name, event.iteration,
+            event.data, event.duration_ms, event.success, event.error_message, getattr(event, "seq", None)
+        )
+
+    def append_record(self, record: Dict[str, Any]):
+        """Ajoute un événement au format JSON (journal, document de télémétrie)"""
+        self._append(
+            record.get("event_id", ""), record.get("timestamp", ""), record.get("event_type", ""),
+            record.get("agent_name", ""), record.get("iteration", 0), record.get("data"),
+            record.get("duration_ms"), record.get("success", True), record.get("error_message"),
+            record.get("seq")
+        )
+
+    def extend_records(self, records: Iterable[Dict[str, Any]]) -> "EventStore":
+        for record in records:
+            self.append_record(record)
+        return self
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]], max_events: Optional[int] = None) -> "EventStore":
+        return cls(max_events).extend_records(records)
+
+    def _append(self, event_id, timestamp, event_type, agent_name, iteration, data,
+                duration_ms, success, error_message, seq):
+        position = self._offset + len(self.seq)
+
+        self.seq.append(_MISSING if seq is None else seq)
+        micros = timestamp_to_us(timestamp)
+        if micros is None:
+            self._raw_timestamps[position] = timestamp
+            micros = _MISSING
+        self.timestamp_us.append(micros)
+        # Forme compacte pour les seuls UUID canoniques (relus à l'identique)
+        try:
+            compact = uuid.UUID(event_id)
+        except (TypeError, ValueError, AttributeError):
+            compact = None
+        if compact is not None and str(compact) == event_id:
+            self.event_ids += compact.bytes
+        else:
+            self._raw_ids[position] = event_id
+            self.event_ids += bytes(16)
+
+        self.event_type.append(self.strings.code(event_type))
+        self.agent.append(self.strings.code(agent_name))
+        self.iteration.append(_MISSING if iteration is None else iteration)
+        self.duration_ms.append(math.nan if duration_ms is None else duration_ms)
+        self.success.append(1 if success else 0)
+        if error_message is not None:
+            self._errors[position] = error_message
+        self.data.append(_compact_data(data))
+
+        if self.max_events is not None and len(self.seq) > self.max_events:
+            self._trim(len(self.seq) - self.max_events + max(1, self.max_events // 8))
+
+    def _trim(self, count: int):
+        """Supprime les count plus anciens événements"""
+        count = min(count, len(self.seq))
+        for column in (self.seq, self.timestamp_us, self.event_type, self.agent,
+                       self.iteration, self.duration_ms, self.success, self.data):
+            del column[:count]
+        del self.event_ids[:16 * count]
+        self._offset += count
+        for sparse in (self._raw_timestamps, self._raw_ids, self._errors):
+            for position in [p for p in sparse if p < self._offset]:
+                del sparse[position]
+
+    def timestamp(self, index: int) -> str:
+        """Timestamp (chaîne d'origine) de l'événement n° index"""
+        if index < 0:
+            index += len(self.seq)
+        raw = self._raw_timestamps.get(self._offset + index)
+        return raw if raw is not None else us_to_timestamp(self.timestamp_us[index])
+
+    def raw_timestamps(self) -> Dict[int, str]:
+        """Timestamps hors format compact par index (événements conservés seulement)"""
+        return {position - self._offset: value for position, value in self._raw_timestamps.items()}
+
+    def error_messages(self) -> Dict[int, str]:
+        """Messages d'erreur par index (événements conservés seulement)"""
+        return {position - self._offset: message for position, message in self._errors.items()}
+
+    def record(self, index: int) -> Dict[str, Any]:
+        """Événement n° index (0: le plus ancien conservé) au format JSON du schéma"""
+        if index < 0:
+            index += len(self.seq)
+        position = self._offset + index
+        duration = self.duration_ms[index]
+        seq = self.seq[index]
+        iteration = self.iteration[index]
+        event_id = self._raw_ids.get(position)
+        if event_id is None:
+            event_id = str(uuid.UUID(bytes=bytes(self.event_ids[16 * index:16 * index + 16])))
+        return {
+            "event_id": event_id,
+            "timestamp": self.timestamp(index),
+            "event_type": self.strings[self.event_type[index]],
+            "agent_name": self.strings[self.agent[index]],
+            "iteration": None if iteration == _MISSING else iteration,
+            "data": dict(self.data[index]),
+            "duration_ms": None if math.isnan(duration) else duration,
+            "success": bool(self.success[index]),
+            "error_message": self._errors.get(position),
+            "seq": None if seq == _MISSING else seq
+        }
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for index in range(len(self.seq)):
+            yield self.record(index)
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        return self.record(index)
+
+    def __bool__(self) -> bool:
+        return len(self.seq) > 0
@@ -0,0 +1,188 @@
+"""
+Appels LLM partagés par les agents
+Limiteur de concurrence commun à toutes les cibles traitées dans le processus
+(ou dans tous les processus d'un pool, voir use_llm_limiter)
+Chaque appel relève sa consommation (response.usage_metadata) : tokens
+d'entrée, de sortie, lus depuis le cache, coût estimé et latence.
+"""
+import threading
+import time
+from typing import Optional, Tuple
+from src.tools.telemetry import TelemetryTracker, timed_span
+from src.utils.run_stats import record_llm_call, record_llm_usage
+
+# Champs de consommation d'un appel (détails des logs, événement llm_call, totaux)
+USAGE_FIELDS = ("input_tokens", "output_tokens", "cache_read_tokens", "total_tokens", "cost_usd", "latency_ms")
+
+# Tarifs par modèle, en USD par million de tokens : (entrée, sortie, lecture du cache)
+MODEL_PRICES = {
+    "claude-sonnet-4-20250514": (3.00, 15.00, 0.30),
+}
+
+DEFAULT_MAX_CONCURRENT_CALLS = 4
+
+_limiter = threading.BoundedSemaphore(DEFAULT_MAX_CONCURRENT_CALLS)
+
+# Mesure du délai du premier token (llm.stream() au lieu de llm.invoke()), activée par --trace
+_measure_ttft = False
+
+# Compteurs exposés par get_llm_stats() (endpoint de métriques)
+_stats_lock = threading.Lock()
+_stats = {"waiting": 0, "in_flight": 0, "calls_total": 0, "errors_total": 0}
+
+
+def _bump(**deltas):
+    with _stats_lock:
+        for key, delta in deltas.items():
+            _stats[key] += delta
+
+
+def get_llm_stats() -> dict:
+    """Appels LLM en attente du limiteur, en cours, terminés et en erreur"""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def configure_llm_limiter(max_concurrent_calls: int):
+    """Fixe le nombre maximal d'appels LLM simultanés (à appeler avant les agents)"""
+    global _limiter
+    if max_concurrent_calls < 1:
+        raise ValueError("max_concurrent_calls doit être >= 1")
+    _limiter = threading.BoundedSemaphore(max_concurrent_calls)
+
+
+def use_llm_limiter(limiter):
+    """
+    Installe un limiteur fourni par l'appelant (acquire/release, gestionnaire
+    de contexte), par ex. le sémaphore d'un multiprocessing.Manager partagé
+    par tous les workers d'un pool de processus
+    """
+    global _limiter
+    _limiter = limiter
+
+
+def llm_cost(model: Optional[str], input_tokens: int, output_tokens: int, cache_read_tokens: int = 0) -> float:
+    """
+    Coût estimé d'un appel en USD (tarifs MODEL_PRICES)
+
+    input_tokens comprend les tokens lus depuis le cache, facturés au tarif
+    de lecture du cache. 0.0 pour un modèle absent de MODEL_PRICES.
+    """
+    prices = MODEL_PRICES.get(model)
+    if prices is None:
+        return 0.0
+    input_price, output_price, cache_price = prices
+    return (
+        (input_tokens - cache_read_tokens) * input_price
+        + output_tokens * output_price
+        + cache_read_tokens * cache_price
+    ) / 1_000_000
+
+
+def llm_usage(response, latency_ms: Optional[float] = None, model: Optional[str] = None) -> dict:
+    """
+    Consommation d'une réponse LLM (champs USAGE_FIELDS)
+
+    Lue dans response.usage_metadata (input_tokens, output_tokens,
+    input_token_details.cache_read) ; 0 quand le modèle ne la fournit pas.
+    cost_usd est estimé d'après le modèle appelé (llm_cost).
+    """
+    metadata = getattr(response, "usage_metadata", None) or {}
+    details = metadata.get("input_token_details") or {}
+    input_tokens = metadata.get("input_tokens") or 0
+    output_tokens = metadata.get("output_tokens") or 0
+    cache_read_tokens = details.get("cache_read") or 0
+    return {
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+        "cache_read_tokens": cache_read_tokens,
+        "total_tokens": metadata.get("total_tokens") or input_tokens + output_tokens,
+        "cost_usd": llm_cost(model, input_tokens, output_tokens, cache_read_tokens),
+        "latency_ms": latency_ms
+    }
+
+
+def empty_usage() -> dict:
+    """Totaux de consommation à zéro (appels et champs USAGE_FIELDS)"""
+    return {"llm_calls": 0, **dict.fromkeys(USAGE_FIELDS, 0)}
+
+
+def add_usage(total: dict, usage: dict) -> dict:
+    """Ajoute à total un appel (llm_usage) ou d'autres totaux (empty_usage) ; retourne total"""
+    total["llm_calls"] += usage.get("llm_calls", 1)
+    for field in USAGE_FIELDS:
+        total[field] += usage.get(field) or 0
+    return total
+
+
+def configure_llm_ttft(enabled: bool):
+    """
+    Active la mesure du délai du premier token (ttft_ms, timeline --trace)
+
+    Les appels passent alors par llm.stream() ; par défaut llm.invoke().
+    """
+    global _measure_ttft
+    _measure_ttft = enabled
+
+
+def invoke_llm(llm, messages, agent_name: str = "llm", file: Optional[str] = None):
+    """Invoque le LLM (voir invoke_llm_with_usage) et retourne la réponse"""
+    return invoke_llm_with_usage(llm, messages, agent_name, file)[0]
+
+
+def invoke_llm_with_usage(llm, messages, agent_name: str = "llm", file: Optional[str] = None) -> Tuple[object, dict]:
+    """
+    Invoque le LLM en respectant le limiteur partagé
+
+    L'appel est tracé en span "llm" : queue_ms (attente du limiteur) et,
+    quand la mesure est activée (configure_llm_ttft), que la télémétrie est
+    active et que le modèle sait streamer, ttft_ms (délai du premier token).
+    La réponse est alors reconstituée à partir des fragments et a le même
+    contenu qu'avec llm.invoke().
+
+    La consommation (llm_usage, latence hors attente du limiteur) est
+    ajoutée à l'événement de fin du span, avec le fichier traité, et
+    comptée dans l'exécution courante (run_stats).
+
+    Args:
+        file: Fichier auquel l'appel est attribué (rapports de coût par fichier)
+
+    Returns:
+        (réponse, consommation)
+    """
+    model = getattr(llm, "model", None) or getattr(llm, "model_name", None)
+    data = {"model": model} if file is None else {"model": model, "file": file}
+    with timed_span("invoke_llm", agent_name, kind="llm", data=data) as span:
+        queued = time.perf_counter_ns()
+        _bump(waiting=1)
+        with _limiter:
+            started = time.perf_counter_ns()
+            span["queue_ms"] = (started - queued) / 1_000_000
+            _bump(waiting=-1, in_flight=1)
+            record_llm_call()
+            try:
+                response = _call_llm(llm, messages, span, started)
+            except Exception:
+                _bump(errors_total=1)
+                raise
+            finally:
+                _bump(in_flight=-1, calls_total=1)
+        usage = llm_usage(response, (time.perf_counter_ns() - started) / 1_000_000, model)
+        span.update(usage)
+        record_llm_usage(usage)
+        return response, usage
+
+
+def _call_llm(llm, messages, span: dict, started: int):
+    """llm.invoke(), ou llm.stream() quand la télémétrie mesure le premier token"""
+    if not (_measure_ttft and TelemetryTracker().is_active() and hasattr(llm, "stream")):
+        return llm.invoke(messages)
+
+    response = None
+    for chunk in llm.stream(messages):
+        if response is None:
+            span["ttft_ms"] = (time.perf_counter_ns() - started) / 1_000_000
+            response = chunk
+        else:
+            response = response + chunk
+    return response if response is not None else llm.invoke(messages)
@@ -4,31 +4,203 @@ Responsable: Data Officer
 """
 import json
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, Iterable, List, Any, Optional, Union
 from datetime import datetime
 from collections import defaultdict
 
+try:
+    from .analytics_store import AnalyticsStore, DEFAULT_ANALYTICS_DB
+    from .event_index import EventIndex
+    from .event_store import EventStore
+    from ..utils.blob_store import BlobStore
+    from ..utils.histogram import LogHistogram, latency_key, merge_histogram_groups
+    from ..utils.log_ingest import KIND_EVENTS, RecordStream, session_head
+    from ..utils.rollups import load_rollups
+except ImportError:
+    import sys
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from tools.analytics_store import AnalyticsStore, DEFAULT_ANALYTICS_DB
+    from tools.event_index import EventIndex
+    from tools.event_store import EventStore
+    from utils.blob_store import BlobStore
+    from utils.histogram import LogHistogram, latency_key, merge_histogram_groups
+    from utils.log_ingest import KIND_EVENTS, RecordStream, session_head
+    from utils.rollups import load_rollups
+
+# Consommation d'un appel LLM (mêmes champs que llm_tool.USAGE_FIELDS)
+USAGE_FIELDS = ("input_tokens", "output_tokens", "cache_read_tokens", "total_tokens", "cost_usd", "latency_ms")
+
 
 class MetricsAnalyzer:
     """Analyseur de métriques pour les données de télémétrie"""
     
-    def __init__(self, log_file: Path):
+    def __init__(
+        self,
+        log_file: Path,
+        start: Optional[Union[str, datetime]] = None,
+        end: Optional[Union[str, datetime]] = None
+    ):
         """
         Initialise l'analyseur
         
         Args:
-            log_file: Chemin vers experiment_data.json
+            log_file: Document de télémétrie ou du logger (telemetry_data.json,
+                experiment_data.json), journal JSONL ou segment .gz
+            start: Début de la plage analysée (timestamp ISO ou datetime)
+            end: Fin de la plage analysée (incluse)
+        
+        Avec start / end, les événements sont lus dans le journal JSONL
+        (log_file.jsonl et ses segments tournés) : seuls les segments dont
+        la plage de temps recoupe la requête sont ouverts.
+        
+        Sans plage, le document n'est pas chargé et les rapports lisent, dans
+        l'ordre :
+        - les agrégats écrits avec le log (telemetry_data.rollups.json, s'il
+          correspond au log actuel), qui donnent le résumé et les
+          performances par agent et par itération sans lire d'événement ;
+        - pour les autres rapports, ou sans agrégats, l'index du document
+          (EventIndex, enregistré à côté du log), qui ne relit que les
+          événements dont le rapport a besoin.
+        
+        self.data charge le document complet au premier accès ; les
+        événements y sont gardés en colonnes (EventStore) et l'itération
+        restitue des dicts au format du schéma. Les entrées du logger sont
+        lues au format des événements (log_ingest.normalize_record).
         """
         self.log_file = log_file
-        self.data = self._load_data()
+        self.start = start.isoformat() if isinstance(start, datetime) else start
+        self.end = end.isoformat() if isinstance(end, datetime) else end
+        self._data = None
+        self._index = None
+        self._rollups = None
+        self._blob_store = None
+        if not (self.start or self.end) and not self.log_file.exists():
+            raise FileNotFoundError(f"Le fichier {self.log_file} n'existe pas")
+    
+    @property
+    def data(self) -> Dict[str, Any]:
+        """Document complet (chargé au premier accès)"""
+        if self._data is None:
+            self._data = self._load_data()
+        return self._data
+    
+    def _event_index(self) -> Optional[EventIndex]:
+        """Index du document, si les rapports peuvent s'en servir (pas de plage, document non chargé)"""
+        if self._data is not None or self.start or self.end or self.log_file.suffix != ".json":
+            return None
+        if self._index is None:
+            self._index = EventIndex.open(self.log_file)
+        return self._index
+    
+    def _sidecar(self) -> Optional[Dict[str, Any]]:
+        """Agrégats écrits avec le log ({"head", "rollups"}), s'ils correspondent au log actuel"""
+        if self.start or self.end or self.log_file.suffix != ".json":
+            return None
+        if self._rollups is None:
+            self._rollups = load_rollups(self.log_file) or {}
+        return self._rollups or None
+    
+    def _head(self) -> Dict[str, Any]:
+        """Champs du document hors événements (metadata, metrics)"""
+        sidecar = self._sidecar()
+        if sidecar is not None:
+            return session_head(sidecar["head"])
+        index = self._event_index()
+        return session_head(index.head) if index is not None else self.data
+    
+    def _events(
+        self,
+        fields: Iterable[str],
+        event_type: Optional[str] = None,
+        failed: bool = False,
+        timed: bool = False
+    ) -> Iterable[Dict[str, Any]]:
+        """
+        Événements parcourus par un rapport
+        
+        Avec l'index, seuls les champs fields des événements retenus
+        (event_type, failed, timed) sont matérialisés ; sinon tous les
+        événements chargés sont retournés et le rapport applique ses filtres.
+        """
+        index = self._event_index()
+        if index is None:
+            return self.data.get("events", [])
+        return index.select(fields, index.positions(event_type, failed, timed))
     
     def _load_data(self) -> Dict[str, Any]:
-        """Charge les données depuis le fichier"""
-        if not self.log_file.exists():
+        """Charge les données en un passage du fichier (RecordStream)"""
+        source = self.log_file
+        journal = self.log_file.with_suffix(".jsonl")
+        if (self.start or self.end) and self.log_file.suffix == ".json" and journal.exists():
+            # Plage demandée: seuls les segments du journal qui la recoupent sont ouverts
+            source = journal
+        elif not self.log_file.exists():
             raise FileNotFoundError(f"Le fichier {self.log_file} n'existe pas")
         
-        with open(self.log_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        stream = RecordStream(source, self.start, self.end)
+        events = EventStore.from_records(stream)
+        return {**session_head(stream.head, len(events)), "events": events}
+    
+    def resolve_payload(self, value: Any) -> Any:
+        """
+        Retourne le contenu d'un champ externalisé dans le blob store
+        ({"$blob": ...}), ou la valeur telle quelle. Le blob n'est lu qu'à la demande.
+        
+        Args:
+            value: Valeur d'un champ de data / details
+        """
+        if self._blob_store is None:
+            self._blob_store = BlobStore(self.log_file.parent / "blobs")
+        return self._blob_store.resolve(value)
+    
+    # Analyses multi-sessions : requêtes sur la base SQLite alimentée par
+    # scripts/ingest_analytics.py (voir AnalyticsStore)
+    
+    @classmethod
+    def session_trends(
+        cls,
+        db_path: Path = DEFAULT_ANALYTICS_DB,
+        period: str = "day",
+        agent_name: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Évolution par période ("day", "week", "month") et par agent sur
+        toutes les sessions ingérées : volume, taux de succès, durée moyenne
+        """
+        with AnalyticsStore(db_path) as store:
+            return store.trends(period, agent_name, since, until)
+    
+    @classmethod
+    def session_percentiles(
+        cls,
+        db_path: Path = DEFAULT_ANALYTICS_DB,
+        group_by: str = "agent_name",
+        since: Optional[str] = None,
+        until: Optional[str] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Percentiles de durée toutes sessions confondues, par agent, type
+        d'événement, modèle ou outil (group_by)
+        """
+        with AnalyticsStore(db_path) as store:
+            return store.percentiles(group_by, since, until)
+    
+    @classmethod
+    def session_regressions(
+        cls,
+        db_path: Path = DEFAULT_ANALYTICS_DB,
+        recent_sessions: int = 5,
+        baseline_sessions: int = 20,
+        threshold: float = 1.25
+    ) -> List[Dict[str, Any]]:
+        """
+        Agents ralentis : latence médiane des recent_sessions dernières
+        sessions comparée à celle des baseline_sessions précédentes
+        """
+        with AnalyticsStore(db_path) as store:
+            return store.regressions(recent_sessions, baseline_sessions, threshold)
     
     def get_agent_performance(self) -> Dict[str, Any]:
         """
@@ -37,6 +209,10 @@ class MetricsAnalyzer:
         Returns:
             Statistiques par agent
         """
+        sidecar = self._sidecar()
+        if sidecar is not None:
+            return sidecar["rollups"].agent_performance()
+        
         agent_stats = defaultdict(lambda: {
             "total_actions": 0,
             "successful_actions": 0,
@@ -46,7 +222,7 @@ class MetricsAnalyzer:
             "event_types": defaultdict(int)
         })
         
-        for event in self.data.get("events", []):
+        for event in self._events(("agent_name", "success", "duration_ms", "event_type")):
             agent = event["agent_name"]
             agent_stats[agent]["total_actions"] += 1
             
@@ -55,7 +231,7 @@ class MetricsAnalyzer:
             else:
                 agent_stats[agent]["failed_actions"] += 1
             
-            if event.get("duration_ms"):
+            if event.get("duration_ms") is not None:
                 agent_stats[agent]["total_duration_ms"] += event["duration_ms"]
             
             agent_stats[agent]["event_types"][event["event_type"]] += 1
@@ -68,6 +244,79 @@ class MetricsAnalyzer:
         
         return dict(agent_stats)
     
+    def get_latency_histograms(self) -> Dict[str, Dict[str, LogHistogram]]:
+        """
+        Histogrammes de latence par catégorie (agents, tools, models, nodes)
+        Repris du bloc metrics.latency_histograms s'il est présent (sans
+        filtre de plage), sinon reconstruits à partir des durées des événements.
+        """
+        persisted = self._head().get("metrics", {}).get("latency_histograms")
+        if persisted is not None and not (self.start or self.end):
+            return merge_histogram_groups([persisted])
+        
+        histograms: Dict[str, Dict[str, LogHistogram]] = {}
+        for event in self._events(("duration_ms", "event_type", "agent_name", "data"), timed=True):
+            key = latency_key(event)
+            if key is None:
+                continue
+            category, name = key
+            histograms.setdefault(category, {}).setdefault(name, LogHistogram()).record(event["duration_ms"])
+        return histograms
+    
+    def get_latency_percentiles(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """
+        Percentiles de latence (count, mean, p50, p95, p99, max en ms)
+        
+        Returns:
+            {catégorie: {nom: résumé}}
+        """
+        return {
+            category: {name: histogram.summary() for name, histogram in histograms.items()}
+            for category, histograms in self.get_latency_histograms().items()
+        }
+    
+    def get_token_usage(self, group_by: str = "agent") -> Dict[str, Dict[str, Any]]:
+        """
+        Consommation LLM (appels, tokens, latence) par agent ou par fichier
+        
+        Lue dans les événements llm_call de fin d'appel (télémétrie) ou dans
+        les détails des entrées du logger qui portent input_tokens.
+        
+        Args:
+            group_by: "agent", ou "file" (fichier traité par l'appel, "unknown"
+                pour un appel qui ne porte pas sur un fichier)
+            
+        Returns:
+            {agent ou fichier: {llm_calls, input_tokens, output_tokens,
+            cache_read_tokens, total_tokens, cost_usd, latency_ms,
+            average_latency_ms}},
+            par tokens consommés décroissants
+        """
+        if group_by not in ("agent", "file"):
+            raise ValueError(f"Regroupement inconnu: {group_by} (agent ou file)")
+        index = self._event_index()
+        event_type = "llm_call" if index is not None and index.kind == KIND_EVENTS else None
+        
+        usage: Dict[str, Dict[str, Any]] = {}
+        for event in self._events(("agent_name", "data"), event_type=event_type):
+            data = event.get("data") or {}
+            if data.get("input_tokens") is None:
+                continue
+            if group_by == "agent":
+                key = event["agent_name"]
+            else:
+                key = data.get("file") or data.get("filepath") or "unknown"
+            totals = usage.get(key)
+            if totals is None:
+                totals = usage[key] = {"llm_calls": 0, **dict.fromkeys(USAGE_FIELDS, 0)}
+            totals["llm_calls"] += 1
+            for field in USAGE_FIELDS:
+                totals[field] += data.get(field) or 0
+        
+        for totals in usage.values():
+            totals["average_latency_ms"] = totals["latency_ms"] / totals["llm_calls"]
+        return dict(sorted(usage.items(), key=lambda item: item[1]["total_tokens"], reverse=True))
+    
     def get_iteration_analysis(self) -> List[Dict[str, Any]]:
         """
         Analyse les performances par itération
@@ -75,17 +324,21 @@ class MetricsAnalyzer:
         Returns:
             Liste des statistiques par itération
         """
+        sidecar = self._sidecar()
+        if sidecar is not None:
+            return sidecar["rollups"].iteration_analysis()
+        
         iterations = defaultdict(lambda: {
             "iteration": 0,
             "events_count": 0,
             "successful_events": 0,
             "failed_events": 0,
-            "agents_involved": set(),
+            "agents_involved": {},
             "start_time": None,
             "end_time": None
         })
         
-        for event in self.data.get("events", []):
+        for event in self._events(("iteration", "success", "agent_name", "timestamp")):
             iter_num = event["iteration"]
             iterations[iter_num]["iteration"] = iter_num
             iterations[iter_num]["events_count"] += 1
@@ -95,7 +348,7 @@ class MetricsAnalyzer:
             else:
                 iterations[iter_num]["failed_events"] += 1
             
-            iterations[iter_num]["agents_involved"].add(event["agent_name"])
+            iterations[iter_num]["agents_involved"][event["agent_name"]] = None
             
             # Tracker les timestamps
             timestamp = event["timestamp"]
@@ -103,7 +356,7 @@ class MetricsAnalyzer:
                 iterations[iter_num]["start_time"] = timestamp
             iterations[iter_num]["end_time"] = timestamp
         
-        # Convertir les sets en listes pour la sérialisation JSON
+        # Agents par ordre d'apparition (comme les agrégats annexes), en listes pour la sérialisation JSON
         result = []
         for iter_data in sorted(iterations.values(), key=lambda x: x["iteration"]):
             iter_data["agents_involved"] = list(iter_data["agents_involved"])
@@ -124,7 +377,8 @@ class MetricsAnalyzer:
         """
         quality_metrics = []
         
-        for event in self.data.get("events", []):
+        fields = ("event_type", "timestamp", "iteration", "data")
+        for event in self._events(fields, event_type="quality_metric"):
             if event["event_type"] == "quality_metric":
                 quality_metrics.append({
                     "timestamp": event["timestamp"],
@@ -146,7 +400,8 @@ class MetricsAnalyzer:
         errors_by_type = defaultdict(int)
         total_errors = 0
         
-        for event in self.data.get("events", []):
+        fields = ("success", "error_message", "agent_name", "timestamp", "iteration", "event_type")
+        for event in self._events(fields, failed=True):
             if not event["success"] and event.get("error_message"):
                 total_errors += 1
                 errors_by_agent[event["agent_name"]].append({
@@ -177,7 +432,7 @@ class MetricsAnalyzer:
         lines.append("")
         
         # Métadonnées
-        metadata = self.data.get("metadata", {})
+        metadata = self._head().get("metadata", {})
         lines.append("MÉTADONNÉES DE SESSION")
         lines.append("-" * 80)
         lines.append(f"Session ID: {metadata.get('session_id')}")
@@ -188,7 +443,7 @@ class MetricsAnalyzer:
         lines.append("")
         
         # Métriques globales
-        metrics = self.data.get("metrics", {})
+        metrics = self._head().get("metrics", {})
         lines.append("MÉTRIQUES GLOBALES")
         lines.append("-" * 80)
         lines.append(f"Événements réussis: {metrics.get('successful_events')}")
@@ -207,6 +462,38 @@ class MetricsAnalyzer:
             lines.append(f"  - Durée moyenne: {stats.get('average_duration_ms', 0):.2f} ms")
         lines.append("")
         
+        # Latences (queue de distribution)
+        latency = self.get_latency_percentiles()
+        if latency:
+            lines.append("LATENCES (ms)")
+            lines.append("-" * 80)
+            for category, summaries in sorted(latency.items()):
+                lines.append(f"\n{category}:")
+                for name, summary in sorted(summaries.items()):
+                    lines.append(
+                        f"  - {name}: n={summary['count']} p50={summary['p50']:.1f} "
+                        f"p95={summary['p95']:.1f} p99={summary['p99']:.1f} max={summary['max']:.1f}"
+                    )
+            lines.append("")
+        
+        # Consommation LLM (tokens par agent, fichiers les plus coûteux)
+        usage_by_agent = self.get_token_usage("agent")
+        if usage_by_agent:
+            lines.append("CONSOMMATION LLM (tokens)")
+            lines.append("-" * 80)
+            for agent, usage in usage_by_agent.items():
+                lines.append(
+                    f"  - {agent}: {usage['llm_calls']} appels, entrée={usage['input_tokens']} "
+                    f"(cache={usage['cache_read_tokens']}) sortie={usage['output_tokens']} "
+                    f"coût=${usage['cost_usd']:.4f} "
+                    f"latence moyenne={usage['average_latency_ms']:.0f} ms"
+                )
+            usage_by_file = self.get_token_usage("file")
+            lines.append("\nFichiers les plus coûteux:")
+            for file, usage in list(usage_by_file.items())[:10]:
+                lines.append(f"  - {file}: {usage['total_tokens']} tokens, ${usage['cost_usd']:.4f} ({usage['llm_calls']} appels)")
+            lines.append("")
+        
         # Analyse des itérations
         iterations = self.get_iteration_analysis()
         lines.append("ANALYSE PAR ITÉRATION")
@@ -218,14 +505,18 @@ class MetricsAnalyzer:
             lines.append(f"  - Agents impliqués: {', '.join(iter_data['agents_involved'])}")
         lines.append("")
         
-        # Analyse des erreurs
-        error_analysis = self.get_error_analysis()
+        # Analyse des erreurs (comptes seuls : repris des agrégats s'ils sont à jour)
+        sidecar = self._sidecar()
+        if sidecar is not None:
+            errors_by_type = sidecar["rollups"].errors_by_type
+        else:
+            errors_by_type = self.get_error_analysis()["errors_by_type"]
         lines.append("ANALYSE DES ERREURS")
         lines.append("-" * 80)
-        lines.append(f"Erreurs totales: {error_analysis['total_errors']}")
-        if error_analysis['errors_by_type']:
+        lines.append(f"Erreurs totales: {sum(errors_by_type.values())}")
+        if errors_by_type:
             lines.append("\nErreurs par type:")
-            for error_type, count in error_analysis['errors_by_type'].items():
+            for error_type, count in errors_by_type.items():
                 lines.append(f"  - {error_type}: {count}")
         lines.append("")
         
@@ -244,7 +535,12 @@ class MetricsAnalyzer:
             "agent_performance": self.get_agent_performance(),
             "iteration_analysis": self.get_iteration_analysis(),
             "quality_evolution": self.get_quality_evolution(),
-            "error_analysis": self.get_error_analysis()
+            "error_analysis": self.get_error_analysis(),
+            "latency_percentiles": self.get_latency_percentiles(),
+            "token_usage": {
+                "by_agent": self.get_token_usage("agent"),
+                "by_file": self.get_token_usage("file")
+            }
         }
         
         with open(output_file, 'w', encoding='utf-8') as f:
@@ -0,0 +1,146 @@
+"""
+Endpoint de métriques au format d'exposition Prometheus (text/plain 0.0.4)
+Servi sur localhost par main.py --metrics_port, pour suivre une exécution
+ou un batch en direct : itérations, appels LLM en cours, durées des outils,
+taux de dédup du blob store, profondeur des files d'écriture.
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+
+from src.tools.llm_tool import get_llm_stats
+from src.tools.telemetry import TelemetryTracker
+from src.utils.logger import get_live_loggers
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Quantiles publiés pour chaque histogramme de latence
+EXPOSED_QUANTILES = (("0.5", 50), ("0.95", 95), ("0.99", 99))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class _Exposition:
+    """Accumule les familles de métriques (HELP, TYPE puis échantillons)"""
+
+    def __init__(self):
+        self.lines: List[str] = []
+
+    def family(self, name: str, kind: str, help_text: str, samples: List[Tuple[Dict[str, str], float]]):
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            self.lines.append(f"{name}{_labels(labels)} {value}")
+
+    def summary(self, name: str, help_text: str, latency: Dict[str, Dict[str, Dict[str, float]]]):
+        """Résumés de LogHistogram.summary() (count, mean, p50, p95, p99)"""
+        self.lines.append(f"# HELP {name} {help_text}")
+        self.lines.append(f"# TYPE {name} summary")
+        for category, summaries in sorted(latency.items()):
+            for key, summary in sorted(summaries.items()):
+                labels = {"category": category, "name": key}
+                for quantile, q in EXPOSED_QUANTILES:
+                    value = summary.get(f"p{q}")
+                    self.lines.append(f"{name}{_labels({**labels, 'quantile': quantile})} {value if value is not None else 'NaN'}")
+                self.lines.append(f"{name}_sum{_labels(labels)} {(summary['mean'] or 0.0) * summary['count']}")
+                self.lines.append(f"{name}_count{_labels(labels)} {summary['count']}")
+
+    def render(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+
+def render_metrics() -> str:
+    """Instantané des compteurs et jauges du tracker, du logger et des appels LLM"""
+    out = _Exposition()
+
+    tracker = TelemetryTracker()
+    metrics = tracker.get_metrics()
+    judge = metrics["latency"].get("nodes", {}).get("node:judge", {})
+    out.family("swarm_iterations_total", "counter", "Judge passes completed (one per feedback-loop iteration)",
+               [({}, judge.get("count", 0))])
+    out.family("swarm_current_iteration", "gauge", "Iteration number reported by the telemetry tracker",
+               [({}, metrics["current_iteration"])])
+    out.family("swarm_telemetry_events_total", "counter", "Telemetry events by type",
+               [({"event_type": event_type}, count) for event_type, count in sorted(metrics["event_types"].items())])
+    out.family("swarm_telemetry_events_failed_total", "counter", "Telemetry events marked as failed",
+               [({}, metrics["total_events"] - metrics["successful_events"])])
+
+    llm = get_llm_stats()
+    out.family("swarm_llm_calls_in_flight", "gauge", "LLM calls currently running", [({}, llm["in_flight"])])
+    out.family("swarm_llm_calls_waiting", "gauge", "LLM calls waiting for the concurrency limiter", [({}, llm["waiting"])])
+    out.family("swarm_llm_calls_total", "counter", "LLM calls completed", [({}, llm["calls_total"])])
+    out.family("swarm_llm_call_errors_total", "counter", "LLM calls that raised", [({}, llm["errors_total"])])
+
+    out.summary(
+        "swarm_span_duration_ms",
+        "Span durations in milliseconds (agents, tools, models, graph nodes)",
+        metrics["latency"]
+    )
+
+    loggers = get_live_loggers()
+    log_totals: Dict[str, int] = {}
+    blob_stores = blob_hits = 0
+    for logger in loggers:
+        stats = logger.get_stats()
+        log_totals["SUCCESS"] = log_totals.get("SUCCESS", 0) + stats.get("success_count", 0)
+        log_totals["FAILURE"] = log_totals.get("FAILURE", 0) + stats.get("failure_count", 0)
+        if logger.blob_store is not None:
+            blob_stores += logger.blob_store.stores
+            blob_hits += logger.blob_store.dedup_hits
+    out.family("swarm_log_sessions", "gauge", "Logger sessions alive in this process", [({}, len(loggers))])
+    out.family("swarm_log_entries_total", "counter", "Experiment log entries by status",
+               [({"status": status}, count) for status, count in sorted(log_totals.items())])
+    out.family("swarm_blob_writes_total", "counter", "Payloads written to the blob store", [({}, blob_stores)])
+    out.family("swarm_blob_dedup_hits_total", "counter", "Payloads already present in the blob store", [({}, blob_hits)])
+    lookups = blob_stores + blob_hits
+    out.family("swarm_blob_dedup_hit_ratio", "gauge", "Share of externalized payloads deduplicated",
+               [({}, blob_hits / lookups if lookups else 0.0)])
+
+    out.family("swarm_writer_queue_depth", "gauge", "Entries waiting for the background journal writer", [
+        ({"journal": "telemetry"}, tracker.queue_depth()),
+        ({"journal": "logs"}, sum(logger.queue_depth() for logger in loggers)),
+    ])
+    return out.render()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = render_metrics().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Pas de ligne de log par requête de scraping
+        pass
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Démarre l'endpoint /metrics dans un thread démon
+
+    Args:
+        port: Port d'écoute (0: port libre choisi par le système)
+        host: Interface d'écoute (localhost par défaut)
+
+    Returns:
+        Le serveur (server.server_address donne le port effectif ; shutdown() l'arrête)
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True)
+    thread.start()
+    return server
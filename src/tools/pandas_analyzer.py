@@ -0,0 +1,230 @@
+"""
+Analyseur de métriques vectorisé (pandas)
+Responsable: Data Officer
+
+MetricsAnalyzer parcourt les événements en Python une fois par rapport
+(agents, itérations, qualité, erreurs). PandasMetricsAnalyzer charge les
+colonnes de l'EventStore une seule fois dans un DataFrame typé (agent et
+type d'événement catégoriels, timestamps datetime64) et calcule chaque
+rapport par groupby / agrégation. Les rapports ont exactement la même forme
+que ceux de MetricsAnalyzer ; seules les lignes restituées (erreurs,
+métriques de qualité) repassent par des dicts Python.
+"""
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+try:
+    from .metrics_analyzer import MetricsAnalyzer
+except ImportError:
+    import sys
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from tools.metrics_analyzer import MetricsAnalyzer
+
+# pandas est optionnel : sans lui, MetricsAnalyzer reste disponible
+try:
+    import numpy as np
+    import pandas as pd
+except ImportError:
+    np = None
+    pd = None
+
+PANDAS_AVAILABLE = pd is not None
+
+
+def _naive_datetime(timestamp: str) -> Optional[datetime]:
+    """Timestamp hors format compact -> datetime naïf local (None si invalide)"""
+    try:
+        moment = datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is not None:
+        moment = moment.astimezone().replace(tzinfo=None)
+    return moment
+
+
+def events_to_frame(events: Any) -> "pd.DataFrame":
+    """
+    DataFrame des événements d'un EventStore, construit depuis ses colonnes
+    (sans passer par un dict par événement)
+
+    Colonnes : timestamp (datetime64), event_type et agent_name
+    (catégoriels), iteration (None si absente), duration_ms (NaN si absente), success,
+    error_message, data. L'index est la position de l'événement dans le store.
+    """
+    if pd is None:
+        raise ImportError("pandas non installé. Installez avec: pip install pandas")
+
+    count = len(events)
+    categories = pd.Index(events.strings.values, dtype=object)
+
+    timestamps = np.asarray(events.timestamp_us, dtype="int64").astype("datetime64[us]")
+    for index, value in events.raw_timestamps().items():
+        moment = _naive_datetime(value)
+        timestamps[index] = np.datetime64(moment, "us") if moment else np.datetime64("NaT")
+
+    errors = np.full(count, None, dtype=object)
+    for index, message in events.error_messages().items():
+        errors[index] = message
+
+    data = np.empty(count, dtype=object)
+    data[:] = events.data
+
+    # Itération absente (-1 dans le store): None, exclue des regroupements
+    iterations = np.asarray(events.iteration, dtype="int64")
+    missing = iterations == -1
+    if missing.any():
+        iterations = iterations.astype(object)
+        iterations[missing] = None
+
+    return pd.DataFrame({
+        "timestamp": timestamps,
+        "event_type": pd.Categorical.from_codes(np.asarray(events.event_type, dtype="int64"), categories),
+        "agent_name": pd.Categorical.from_codes(np.asarray(events.agent, dtype="int64"), categories),
+        "iteration": iterations,
+        "duration_ms": np.asarray(events.duration_ms, dtype="float64"),
+        "success": np.frombuffer(bytes(events.success), dtype=np.uint8).astype(bool),
+        "error_message": errors,
+        "data": data
+    })
+
+
+class PandasMetricsAnalyzer(MetricsAnalyzer):
+    """MetricsAnalyzer dont les rapports sont calculés sur un DataFrame"""
+
+    def __init__(self, log_file: Path, start=None, end=None):
+        if pd is None:
+            raise ImportError("pandas non installé. Installez avec: pip install pandas")
+        super().__init__(log_file, start, end)
+        self._frame = None
+
+    def _event_index(self):
+        # Les rapports passent par le DataFrame, construit depuis le document complet
+        return None
+
+    @property
+    def frame(self) -> "pd.DataFrame":
+        """DataFrame des événements (construit au premier rapport)"""
+        if self._frame is None:
+            self._frame = events_to_frame(self.data["events"])
+        return self._frame
+
+    def get_agent_performance(self) -> Dict[str, Any]:
+        """
+        Analyse les performances de chaque agent
+
+        Returns:
+            Statistiques par agent (même forme que MetricsAnalyzer)
+        """
+        df = self.frame
+        stats = df.groupby("agent_name", observed=True, sort=False).agg(
+            total_actions=("success", "size"),
+            successful_actions=("success", "sum"),
+            total_duration_ms=("duration_ms", "sum")
+        )
+        types = df.groupby(["agent_name", "event_type"], observed=True, sort=False).size()
+
+        event_types: Dict[str, Dict[str, int]] = {}
+        for (agent, event_type), count in types.items():
+            event_types.setdefault(agent, {})[event_type] = int(count)
+
+        result = {}
+        for agent, row in stats.iterrows():
+            total, successful = int(row.total_actions), int(row.successful_actions)
+            total_duration = float(row.total_duration_ms)
+            result[agent] = {
+                "total_actions": total,
+                "successful_actions": successful,
+                "failed_actions": total - successful,
+                "average_duration_ms": total_duration / total,
+                "total_duration_ms": total_duration,
+                "event_types": event_types[agent],
+                "success_rate": successful / total
+            }
+        return result
+
+    def get_iteration_analysis(self) -> List[Dict[str, Any]]:
+        """
+        Analyse les performances par itération
+
+        Returns:
+            Liste des statistiques par itération
+        """
+        df = self.frame
+        if df.empty:
+            return []
+        events = self.data["events"]
+        positions = pd.Series(df.index, index=df.index)
+        stats = positions.groupby(df["iteration"]).agg(["size", "first", "last"])
+        successes = df["success"].groupby(df["iteration"]).sum()
+
+        agents: Dict[int, List[str]] = {}
+        pairs = df[["iteration", "agent_name"]].drop_duplicates()
+        for iteration, agent in zip(pairs["iteration"].tolist(), pairs["agent_name"].tolist()):
+            agents.setdefault(iteration, []).append(agent)
+
+        result = []
+        for iteration, row in stats.iterrows():
+            count, successful = int(row["size"]), int(successes[iteration])
+            result.append({
+                "iteration": int(iteration),
+                "events_count": count,
+                "successful_events": successful,
+                "failed_events": count - successful,
+                "agents_involved": agents[iteration],
+                "start_time": events.timestamp(int(row["first"])),
+                "end_time": events.timestamp(int(row["last"])),
+                "success_rate": successful / count
+            })
+        return result
+
+    def get_quality_evolution(self) -> List[Dict[str, Any]]:
+        """
+        Trace l'évolution de la qualité du code
+
+        Returns:
+            Liste des métriques de qualité chronologiques
+        """
+        df = self.frame
+        events = self.data["events"]
+        rows = df[df["event_type"] == "quality_metric"]
+        return [
+            {
+                "timestamp": events.timestamp(index),
+                "iteration": iteration,
+                "score": data.get("score", 0),
+                "file": data.get("file", "unknown")
+            }
+            for index, iteration, data in zip(rows.index.tolist(), rows["iteration"].tolist(), rows["data"])
+        ]
+
+    def get_error_analysis(self) -> Dict[str, Any]:
+        """
+        Analyse les erreurs rencontrées
+
+        Returns:
+            Statistiques sur les erreurs
+        """
+        df = self.frame
+        events = self.data["events"]
+        messages = df["error_message"]
+        rows = df[~df["success"] & messages.notna() & (messages != "")]
+
+        errors_by_agent: Dict[str, List[Dict[str, Any]]] = {}
+        for index, agent, iteration, message, event_type in zip(
+            rows.index.tolist(), rows["agent_name"].tolist(), rows["iteration"].tolist(),
+            rows["error_message"].tolist(), rows["event_type"].tolist()
+        ):
+            errors_by_agent.setdefault(agent, []).append({
+                "timestamp": events.timestamp(index),
+                "iteration": iteration,
+                "error_message": message,
+                "event_type": event_type
+            })
+        errors_by_type = rows.groupby("event_type", observed=True, sort=False).size()
+
+        return {
+            "total_errors": len(rows),
+            "errors_by_agent": errors_by_agent,
+            "errors_by_type": {event_type: int(count) for event_type, count in errors_by_type.items()}
+        }
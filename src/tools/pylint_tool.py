@@ -1,9 +1,14 @@
 import subprocess
 import json
+import time
 from src.tools.sandbox_guard import is_path_allowed
+from src.tools.subprocess_tool import run_traced
+from src.tools.telemetry import timed
+from src.utils.run_stats import record_tool_time
 from pathlib import Path
 import re
 
+@timed(agent_name="pylint", kind="tool")
 def run_pylint(file_path: str) -> dict:
     """Exécute pylint sur un fichier avec sortie JSON ET score"""
     if not is_path_allowed(file_path):
@@ -12,14 +17,10 @@ def run_pylint(file_path: str) -> dict:
     if not path.exists():
         return {"success": False, "error": "File not found", "score": 0.0, "messages": []}
 
+    start = time.perf_counter()
     try:
         # First run: Get JSON messages
-        result_json = subprocess.run(
-            ["pylint", str(path), "--output-format=json"],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
+        result_json = run_traced(["pylint", str(path), "--output-format=json"], timeout=30, tool_name="pylint")
         
         messages = []
         if result_json.stdout:
@@ -29,12 +30,7 @@ def run_pylint(file_path: str) -> dict:
                 pass
 
         # Second run: Get the score (text format)
-        result_score = subprocess.run(
-            ["pylint", str(path)],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
+        result_score = run_traced(["pylint", str(path)], timeout=30, tool_name="pylint")
         
         # Extract score from text output
         score = 0.0
@@ -51,6 +47,8 @@ def run_pylint(file_path: str) -> dict:
         return {"success": False, "error": "Timeout", "score": 0.0, "messages": []}
     except Exception as e:
         return {"success": False, "error": str(e), "score": 0.0, "messages": []}
+    finally:
+        record_tool_time(time.perf_counter() - start)
 
 def run_pylint_directory(directory: str) -> dict:
     """Exécute pylint sur tous les fichiers Python d'un dossier"""
@@ -1,7 +1,12 @@
 import subprocess
+import time
 from pathlib import Path
 from src.tools.sandbox_guard import is_path_allowed
+from src.tools.subprocess_tool import run_traced
+from src.tools.telemetry import timed
+from src.utils.run_stats import record_tool_time
 
+@timed(agent_name="pytest", kind="tool")
 def run_pytest(test_dir: str) -> dict:
     """Exécute les tests avec Pytest et retourne les résultats"""
     if not is_path_allowed(test_dir):
@@ -10,13 +15,9 @@ def run_pytest(test_dir: str) -> dict:
     if not path.exists():
         return {"success": False, "error": "Test folder not found", "passed": 0, "failed": 0}
 
+    start = time.perf_counter()
     try:
-        result = subprocess.run(
-            ["pytest", str(path), "-v", "--tb=short"],
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
+        result = run_traced(["pytest", str(path), "-v", "--tb=short"], timeout=60, tool_name="pytest")
 
         passed = 0
         failed = 0
@@ -54,3 +55,5 @@ def run_pytest(test_dir: str) -> dict:
         return {"success": False, "error": "Timeout", "passed": 0, "failed": 0}
     except Exception as e:
         return {"success": False, "error": str(e), "passed": 0, "failed": 0}
+    finally:
+        record_tool_time(time.perf_counter() - start)
@@ -0,0 +1,142 @@
+"""
+Compilation d'un schéma JSON en fonction de validation Python
+Responsable: Data Officer
+
+jsonschema interprète le schéma à chaque instance (création d'un validateur
+par propriété, résolution des mots-clés...). Pour les centaines de milliers
+d'événements d'un fichier fusionné, le schéma est traduit une fois en code
+Python en ligne droite (isinstance, tests de clés, bornes) qui répond
+seulement « valide ou non ». jsonschema n'est appelé que sur les instances
+refusées, pour produire le message d'erreur détaillé.
+
+Mots-clés pris en charge : type, required, properties, items (schéma
+unique), minimum, maximum, et les annotations sans effet (title,
+description...). Un schéma utilisant un autre mot-clé n'est pas compilé
+(compile_schema retourne None) et la validation reste générique.
+"""
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+# Mots-clés sans effet sur la validation
+_ANNOTATIONS = {"$schema", "$id", "title", "description", "default", "examples", "$comment"}
+
+_SUPPORTED = {"type", "required", "properties", "items", "minimum", "maximum"} | _ANNOTATIONS
+
+# Test de type (sémantique de jsonschema, Draft 7) ; {v} est la variable testée
+_TYPE_TESTS = {
+    "string": "isinstance({v}, str)",
+    "integer": "((isinstance({v}, int) and not isinstance({v}, bool)) or (isinstance({v}, float) and {v}.is_integer()))",
+    "number": "(isinstance({v}, (int, float)) and not isinstance({v}, bool))",
+    "boolean": "isinstance({v}, bool)",
+    "object": "isinstance({v}, dict)",
+    "array": "isinstance({v}, list)",
+    "null": "{v} is None",
+}
+
+_NUMBER_TEST = _TYPE_TESTS["number"]
+
+# Fonctions compilées, par empreinte du schéma (une entrée par version du schéma)
+_compiled: Dict[str, Optional[Callable[[Any], bool]]] = {}
+_compiled_lock = threading.Lock()
+
+
+class UnsupportedSchema(ValueError):
+    """Le schéma utilise un mot-clé que le compilateur ne traduit pas"""
+
+
+def schema_digest(schema: Dict[str, Any]) -> str:
+    """Empreinte (sha256) de la forme canonique du schéma"""
+    return hashlib.sha256(json.dumps(schema, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class _Generator:
+    def __init__(self):
+        self._names = 0
+
+    def name(self) -> str:
+        self._names += 1
+        return f"v{self._names}"
+
+    def check(self, schema: Dict[str, Any], var: str, depth: int) -> List[str]:
+        """Lignes testant schema sur la variable var (return False au premier échec)"""
+        if not isinstance(schema, dict):
+            raise UnsupportedSchema(f"schéma non objet: {schema!r}")
+        unsupported = set(schema) - _SUPPORTED
+        if unsupported:
+            raise UnsupportedSchema(f"mots-clés non pris en charge: {sorted(unsupported)}")
+
+        indent = "    " * depth
+        lines = []
+
+        if "type" in schema:
+            types = schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+            if any(t not in _TYPE_TESTS for t in types):
+                raise UnsupportedSchema(f"type non pris en charge: {schema['type']!r}")
+            test = " or ".join(_TYPE_TESTS[t].format(v=var) for t in types)
+            lines += [f"{indent}if not ({test}):", f"{indent}    return False"]
+
+        for keyword, operator in (("minimum", "<"), ("maximum", ">")):
+            if keyword in schema:
+                lines += [
+                    f"{indent}if {_NUMBER_TEST.format(v=var)} and {var} {operator} {schema[keyword]!r}:",
+                    f"{indent}    return False"
+                ]
+
+        body = []
+        if schema.get("required"):
+            missing = " or ".join(f"{key!r} not in {var}" for key in schema["required"])
+            body += [f"{indent}    if {missing}:", f"{indent}        return False"]
+        for key, subschema in schema.get("properties", {}).items():
+            child = self.name()
+            inner = self.check(subschema, child, depth + 2)
+            if inner:
+                body += [f"{indent}    if {key!r} in {var}:", f"{indent}        {child} = {var}[{key!r}]", *inner]
+        if body:
+            lines += [f"{indent}if isinstance({var}, dict):", *body]
+
+        if "items" in schema:
+            if not isinstance(schema["items"], dict):
+                raise UnsupportedSchema("items sous forme de liste non pris en charge")
+            item = self.name()
+            inner = self.check(schema["items"], item, depth + 2)
+            if inner:
+                lines += [f"{indent}if isinstance({var}, list):", f"{indent}    for {item} in {var}:", *inner]
+
+        return lines
+
+
+def generate_source(schema: Dict[str, Any], function_name: str = "is_valid") -> str:
+    """
+    Code Python de la fonction de validation de schema
+
+    Raises:
+        UnsupportedSchema: Mot-clé non traduit
+    """
+    lines = [f"def {function_name}(v0):", *_Generator().check(schema, "v0", 1), "    return True"]
+    return "\n".join(lines) + "\n"
+
+
+def compile_schema(schema: Dict[str, Any]) -> Optional[Callable[[Any], bool]]:
+    """
+    Fonction instance -> bool équivalente à la validation jsonschema de schema
+    Compilée une fois par version du schéma (empreinte) puis mise en cache.
+
+    Returns:
+        La fonction, ou None si le schéma utilise un mot-clé non pris en charge
+    """
+    digest = schema_digest(schema)
+    if digest in _compiled:
+        return _compiled[digest]
+    with _compiled_lock:
+        if digest not in _compiled:
+            try:
+                source = generate_source(schema)
+            except UnsupportedSchema:
+                _compiled[digest] = None
+            else:
+                namespace: Dict[str, Any] = {}
+                exec(compile(source, f"<schema {digest[:12]}>", "exec"), namespace)
+                _compiled[digest] = namespace["is_valid"]
+        return _compiled[digest]
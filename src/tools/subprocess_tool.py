@@ -0,0 +1,34 @@
+"""
+Exécution des outils externes (pylint, pytest) tracée en span
+Chaque sous-processus apparaît dans la télémétrie avec son pid, sa commande,
+son code de retour et sa durée murale.
+"""
+import subprocess
+from typing import List
+from src.tools.telemetry import timed_span
+
+
+def run_traced(cmd: List[str], timeout: float, tool_name: str) -> subprocess.CompletedProcess:
+    """
+    Équivalent de subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+
+    Args:
+        cmd: Commande et arguments
+        timeout: Délai maximal (secondes) ; le processus est tué au-delà
+        tool_name: Outil auquel la durée est attribuée (ex: "pylint")
+
+    Raises:
+        subprocess.TimeoutExpired: Délai dépassé (processus tué)
+    """
+    with timed_span("subprocess", tool_name, kind="tool", data={"command": " ".join(cmd)}) as span:
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True) as process:
+            span["child_pid"] = process.pid
+            try:
+                stdout, stderr = process.communicate(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.communicate()
+                span["returncode"] = process.returncode
+                raise
+            span["returncode"] = process.returncode
+        return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
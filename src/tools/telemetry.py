@@ -2,23 +2,41 @@
 Telemetry Tracker - Surcouche compatible avec le logger imposé
 Responsable: Data Officer
 """
-import json
+import functools
+import heapq
+import itertools
+import os
+import time
 import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, Iterable, List, Optional, Any
 from dataclasses import dataclass, asdict
 import threading
 
 # Import corrigé pour éviter les erreurs d'import relatif
 try:
+    from .event_store import EventStore
+    from .trace_export import write_chrome_trace
     from ..utils.logger import log_experiment, ActionType as OfficialActionType
+    from ..utils.rollups import Rollups, save_rollups
+    from ..utils.log_writer import (
+        JsonlLogWriter, BackgroundLogWriter, iter_journal_records, write_json_document, DEFAULT_SEGMENT_BYTES
+    )
 except ImportError:
     # Fallback pour exécution directe
     import sys
     sys.path.insert(0, str(Path(__file__).parent.parent))
+    from tools.event_store import EventStore
+    from tools.trace_export import write_chrome_trace
     from utils.logger import log_experiment, ActionType as OfficialActionType
+    from utils.rollups import Rollups, save_rollups
+    from utils.log_writer import (
+        JsonlLogWriter, BackgroundLogWriter, iter_journal_records, write_json_document, DEFAULT_SEGMENT_BYTES
+    )
 
 
 class EventType(Enum):
@@ -33,6 +51,9 @@ class EventType(Enum):
     ERROR = "error"
     QUALITY_METRIC = "quality_metric"
     TOOL_CALL = "tool_call"
+    LLM_CALL = "llm_call"
+    NODE_START = "node_start"
+    NODE_END = "node_end"
 
 
 # Mapping vers les types imposés
@@ -43,9 +64,9 @@ EVENT_TO_ACTION_MAPPING = {
 }
 
 
-@dataclass
+@dataclass(slots=True)
 class Event:
-    """Structure d'un événement tracé"""
+    """Structure d'un événement tracé (converti en colonnes par EventStore)"""
     event_id: str
     timestamp: str
     event_type: str
@@ -55,16 +76,43 @@ class Event:
     duration_ms: Optional[float] = None
     success: bool = True
     error_message: Optional[str] = None
+    seq: Optional[int] = None  # Ordre global des événements (toutes threads)
+
+
+# Nombre d'événements gardés en mémoire (les autres ne sont que dans le journal)
+DEFAULT_MAX_EVENTS_IN_MEMORY = 1_000_000
+
+# Période de fusion des tampons par thread (secondes)
+DEFAULT_COLLECT_INTERVAL = 0.05
+
+# Attente maximale d'un numéro de séquence manquant lors d'un flush (secondes)
+SEQUENCE_GAP_TIMEOUT = 0.1
 
 
 class TelemetryTracker:
     """
     Tracker compatible avec le logger imposé
     Convertit automatiquement vers log_experiment() quand nécessaire
+    
+    Seuls les derniers événements restent en mémoire (self.events, en
+    colonnes : voir EventStore) ; les
+    agrégats (self.rollups : par agent, type d'événement et itération) et
+    les histogrammes de latence (p50/p95/p99/max par agent, outil, modèle
+    et nœud) sont tenus à jour à l'insertion, en mémoire constante, et
+    écrits à côté du log (telemetry_data.rollups.json).
+    
+    track_event() ne prend qu'un verrou minimal, le temps de tirer ensemble
+    le numéro de séquence global et le timestamp (l'ordre des numéros est
+    ainsi l'ordre chronologique), puis ajoute l'événement au tampon de son
+    thread. Un thread collecteur fusionne les tampons toutes les
+    collect_interval secondes et valide les événements dans l'ordre des
+    numéros, jusqu'au premier numéro manquant (un événement encore en cours
+    d'ajout). Les lectures (events, get_metrics, flush, finalize) fusionnent
+    d'abord les tampons.
     """
     
     _instance = None
-    _lock = threading.Lock()
+    _lock = threading.RLock()
     
     def __new__(cls):
         if cls._instance is None:
@@ -75,18 +123,169 @@ class TelemetryTracker:
     
     def __init__(self):
         if not hasattr(self, '_initialized'):
-            self.events: List[Event] = []
+            self._events = EventStore(DEFAULT_MAX_EVENTS_IN_MEMORY)
+            self._reset_counters()
+            self._sequence_lock = threading.Lock()
+            self._reset_sequence()
+            self._local = threading.local()
+            self._buffers: List[tuple] = []
+            self._collector: Optional[threading.Thread] = None
+            self.collect_interval = DEFAULT_COLLECT_INTERVAL
             self.session_id = str(uuid.uuid4())
             self.start_time = datetime.now().isoformat()
             self.current_iteration = 0
             self.log_file: Optional[Path] = None
+            self._writer: Optional[BackgroundLogWriter] = None
             self._initialized = True
     
-    def initialize(self, log_dir: Path):
-        """Initialise le répertoire de logs"""
-        self.log_file = log_dir / "telemetry_data.json"
+    @property
+    def events(self) -> EventStore:
+        """Derniers événements validés (après fusion des tampons par thread), en colonnes"""
+        self._drain()
+        return self._events
+    
+    def _reset_sequence(self):
+        with self._sequence_lock:
+            self._sequence = itertools.count()
+        self._next_seq = 0
+        self._pending: List[tuple] = []  # Tas (seq, Event) en attente du numéro manquant
+    
+    def _local_buffer(self) -> list:
+        """Tampon d'événements du thread courant (enregistré au premier appel)"""
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = self._local.buffer = []
+            with self._lock:
+                self._buffers.append((threading.current_thread(), buffer))
+        return buffer
+    
+    def _ensure_collector(self):
+        collector = self._collector
+        if collector is not None and collector.is_alive():
+            return
+        with self._lock:
+            if self._collector is None or not self._collector.is_alive():
+                self._collector = threading.Thread(
+                    target=self._collect_loop, name="telemetry-collector", daemon=True
+                )
+                self._collector.start()
+    
+    def _collect_loop(self):
+        while True:
+            time.sleep(self.collect_interval)
+            try:
+                self._drain()
+            except Exception as e:
+                print(f"⚠️  Erreur de fusion des tampons de télémétrie: {e}")
+    
+    def _collect_buffers(self):
+        """Déplace le contenu des tampons par thread dans le tas des événements en attente"""
+        kept = []
+        for thread, buffer in self._buffers:
+            count = len(buffer)
+            if count:
+                # Les ajouts concurrents vont en fin de liste, après les count premiers
+                batch = buffer[:count]
+                del buffer[:count]
+                for event in batch:
+                    heapq.heappush(self._pending, (event.seq, event))
+            if count or thread.is_alive():
+                kept.append((thread, buffer))
+        self._buffers = kept
+    
+    def _commit(self, event: Event):
+        self._events.append(event)
+        self._count(event)
+        if self._writer is not None:
+            self._writer.append(asdict(event))
+    
+    def _drain(self, force: bool = False):
+        """
+        Valide les événements des tampons dans l'ordre des numéros de séquence
+        
+        Args:
+            force: Ne pas s'arrêter durablement à un numéro manquant (flush,
+                finalisation) : après SEQUENCE_GAP_TIMEOUT, tout est validé
+        """
+        if force:
+            self._await_sequence_gaps()
+        self._commit_ready(force)
+    
+    def _await_sequence_gaps(self):
+        """
+        Attend, au plus SEQUENCE_GAP_TIMEOUT, que les numéros manquants
+        arrivent dans les tampons. L'attente se fait hors verrou : log_event,
+        get_metrics (serveur de métriques) ne sont pas bloqués pendant ce temps.
+        """
+        deadline = time.monotonic() + SEQUENCE_GAP_TIMEOUT
+        while True:
+            with self._lock:
+                self._commit_ready()
+                if not self._pending:
+                    return
+            if time.monotonic() >= deadline:
+                return
+            time.sleep(0.001)
+    
+    def _commit_ready(self, force: bool = False):
+        """
+        Valide les événements dont le numéro suit le dernier validé (tous
+        avec force, sans attendre les numéros manquants)
+        """
+        with self._lock:
+            self._collect_buffers()
+            # <= : un événement en retard sur une validation forcée passe aussitôt
+            while self._pending and (force or self._pending[0][0] <= self._next_seq):
+                seq, event = heapq.heappop(self._pending)
+                self._commit(event)
+                self._next_seq = max(self._next_seq, seq + 1)
+    
+    def _reset_counters(self):
+        self.rollups = Rollups()
+        self.histograms = self.rollups.histograms
+    
+    def _count(self, event: Event):
+        """Met à jour les agrégats et les histogrammes (appelé sous verrou)"""
+        self.rollups.add(
+            event.event_type, event.agent_name, event.success, event.duration_ms,
+            event.iteration, event.timestamp, event.error_message, event.data
+        )
+    
+    def initialize(
+        self,
+        log_dir: Path,
+        shard: bool = False,
+        max_segment_bytes: Optional[int] = DEFAULT_SEGMENT_BYTES,
+        max_segment_age: Optional[float] = None
+    ):
+        """
+        Initialise le répertoire de logs
+        Les événements sont ajoutés au journal telemetry_data.jsonl ;
+        telemetry_data.json est reconstruit à la finalisation.
+        
+        Args:
+            log_dir: Répertoire des logs
+            shard: Écrire dans telemetry_data.<session_id>.json (un fichier
+                par processus, fusionnés ensuite avec scripts/merge_logs.py)
+            max_segment_bytes: Taille du journal actif avant rotation en
+                segment compressé (None: jamais)
+            max_segment_age: Durée (secondes) avant rotation (None: jamais)
+        """
+        file_name = f"telemetry_data.{self.session_id}.json" if shard else "telemetry_data.json"
+        self.log_file = log_dir / file_name
         log_dir.mkdir(parents=True, exist_ok=True)
-        self._save_to_disk()
+        self._await_sequence_gaps()
+        with self._lock:
+            self._commit_ready(force=True)
+            if self._writer is not None:
+                self._writer.close()
+            self._writer = BackgroundLogWriter(
+                JsonlLogWriter(self.log_file.with_suffix(".jsonl"), max_segment_bytes, max_segment_age)
+            )
+            self._writer.open({"session_id": self.session_id, "start_time": self.start_time})
+            if self._events:
+                self._writer.append_many(iter(self._events))
+            self._save_to_disk()
     
     def track_event(
         self,
@@ -100,34 +299,36 @@ class TelemetryTracker:
     ) -> str:
         """
         Enregistre un événement ET log vers le système imposé si applicable
+        Le numéro de séquence et le timestamp sont tirés ensemble (verrou
+        minimal) ; l'événement est déposé dans le tampon du thread courant.
         """
-        with self._lock:
-            event = Event(
-                event_id=str(uuid.uuid4()),
-                timestamp=datetime.now().isoformat(),
-                event_type=event_type.value,
-                agent_name=agent_name,
-                iteration=self.current_iteration,
-                data=data,
-                duration_ms=duration_ms,
-                success=success,
-                error_message=error_message
+        with self._sequence_lock:
+            seq = next(self._sequence)
+            timestamp = datetime.now().isoformat()
+        event = Event(
+            event_id=str(uuid.uuid4()),
+            timestamp=timestamp,
+            event_type=event_type.value,
+            agent_name=agent_name,
+            iteration=self.current_iteration,
+            data=data,
+            duration_ms=duration_ms,
+            success=success,
+            error_message=error_message,
+            seq=seq
+        )
+        self._local_buffer().append(event)
+        self._ensure_collector()
+        
+        # INTÉGRATION: Si l'événement correspond à une action LLM, logger officiellement
+        if event_type in EVENT_TO_ACTION_MAPPING:
+            self._log_to_official_system(
+                event=event,
+                action_type=EVENT_TO_ACTION_MAPPING[event_type],
+                model_used=model_used
             )
-            
-            self.events.append(event)
-            
-            # INTÉGRATION: Si l'événement correspond à une action LLM, logger officiellement
-            if event_type in EVENT_TO_ACTION_MAPPING:
-                self._log_to_official_system(
-                    event=event,
-                    action_type=EVENT_TO_ACTION_MAPPING[event_type],
-                    model_used=model_used
-                )
-            
-            if len(self.events) % 5 == 0:
-                self._save_to_disk()
-            
-            return event.event_id
+        
+        return event.event_id
     
     def _log_to_official_system(
         self,
@@ -185,43 +386,245 @@ class TelemetryTracker:
             success=success
         )
     
+    def is_active(self) -> bool:
+        """Indique si le tracker écrit sur disque (initialize() appelé)"""
+        return self._writer is not None
+    
+    def queue_depth(self) -> int:
+        """Nombre d'événements en attente d'écriture dans le journal"""
+        writer = self._writer
+        return writer.queue_depth() if writer is not None else 0
+    
+    def flush(self):
+        """Fusionne les tampons et attend l'écriture des événements dans le journal"""
+        self._drain(force=True)
+        if self._writer is not None:
+            self._writer.flush()
+    
     def get_metrics(self) -> Dict[str, Any]:
-        """Calcule les métriques globales"""
-        total_events = len(self.events)
-        successful_events = sum(1 for e in self.events if e.success)
-        
+        """
+        Calcule les métriques globales
+        latency: résumé (count, mean, p50, p95, p99, max en ms) de chaque
+        histogramme, par catégorie (agents, tools, models, nodes)
+        """
+        with self._lock:
+            self._drain()
+            return {
+                "session_id": self.session_id,
+                "total_events": self.rollups.total,
+                "successful_events": self.rollups.successful,
+                "current_iteration": self.current_iteration,
+                "event_types": self.rollups.event_type_counts(),
+                "latency": {
+                    category: {name: histogram.summary() for name, histogram in histograms.items()}
+                    for category, histograms in self.histograms.items()
+                }
+            }
+    
+    def _metrics_block(self, end_time: str) -> Dict[str, Any]:
+        """Bloc "metrics" du fichier de télémétrie (schéma de DataValidator)"""
+        total, successful = self.rollups.total, self.rollups.successful
         return {
             "session_id": self.session_id,
-            "total_events": total_events,
-            "successful_events": successful_events,
-            "current_iteration": self.current_iteration
+            "start_time": self.start_time,
+            "end_time": end_time,
+            "total_iterations": self.current_iteration,
+            "total_events": total,
+            "successful_events": successful,
+            "failed_events": total - successful,
+            "success_rate": successful / total if total else 0,
+            "agents_statistics": self.rollups.agent_counts(),
+            "event_types_distribution": self.rollups.event_type_counts(),
+            "latency_histograms": {
+                category: {name: histogram.to_dict() for name, histogram in histograms.items()}
+                for category, histograms in self.histograms.items()
+            }
         }
     
     def _save_to_disk(self):
-        """Sauvegarde les données (télémétrie étendue)"""
+        """Reconstruit telemetry_data.json (télémétrie étendue) à partir du journal"""
         if not self.log_file:
             return
         
-        data = {
+        # Appelé sous verrou : les numéros manquants ont été attendus avant
+        self._commit_ready(force=True)
+        last_update = datetime.now().isoformat()
+        head = {
             "metadata": {
                 "session_id": self.session_id,
                 "start_time": self.start_time,
-                "last_update": datetime.now().isoformat(),
+                "last_update": last_update,
+                "total_events": self.rollups.total,
+                "current_iteration": self.current_iteration
             },
-            "events": [asdict(event) for event in self.events]
+            "metrics": self._metrics_block(last_update)
         }
-        
-        with open(self.log_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        self._writer.flush()
+        write_json_document(self.log_file, head, "events", iter_journal_records(self._writer.path))
+        save_rollups(self.log_file, head, self.rollups)
     
     def finalize(self):
         """Finalise et sauvegarde"""
-        self._save_to_disk()
+        self._await_sequence_gaps()
+        with self._lock:
+            self._save_to_disk()
+            if self._writer is not None:
+                self._writer.write_footer({
+                    "last_update": datetime.now().isoformat(),
+                    "total_events": self.rollups.total
+                })
+    
+    def export_chrome_trace(self, output_file: Path, extra_journals: Iterable[Path] = ()) -> int:
+        """
+        Exporte les spans de la session au format Chrome trace-event
+        
+        Args:
+            output_file: Fichier de trace (ex: trace.json)
+            extra_journals: Journaux de télémétrie d'autres processus
+                (shards des workers) à inclure dans la même timeline
+        
+        Returns:
+            Nombre de spans exportés
+        """
+        def events():
+            self.flush()
+            if self._writer is not None:
+                yield from iter_journal_records(self._writer.path)
+            else:
+                yield from self._events
+            for journal in extra_journals:
+                if Path(journal) != getattr(self._writer, "path", None):
+                    yield from iter_journal_records(Path(journal))
+        
+        return write_chrome_trace(events(), output_file)
+    
+    def detach(self):
+        """
+        Abandonne la session héritée du processus parent (worker créé par fork)
+        
+        Le journal du parent n'est ni vidé, ni tronqué, ni rouvert : les
+        tampons, événements et compteurs hérités sont oubliés, les verrous
+        recréés (ils ont pu être copiés pris par un autre thread) et une
+        nouvelle session commence. À appeler avant initialize() dans le
+        processus enfant.
+        """
+        type(self)._lock = threading.RLock()
+        self._sequence_lock = threading.Lock()
+        self._local = threading.local()
+        self._buffers = []
+        self._collector = None
+        self._writer = None
+        self.log_file = None
+        self._events.clear()
+        self._reset_counters()
+        self._reset_sequence()
+        self.session_id = str(uuid.uuid4())
+        self.start_time = datetime.now().isoformat()
+        self.current_iteration = 0
     
     def reset(self):
         """Réinitialise (pour tests)"""
+        self._await_sequence_gaps()
         with self._lock:
-            self.events.clear()
+            self._commit_ready(force=True)
+            self._events.clear()
+            self._reset_counters()
+            self._reset_sequence()
             self.session_id = str(uuid.uuid4())
             self.start_time = datetime.now().isoformat()
             self.current_iteration = 0
+            if self._writer is not None:
+                self._writer.open({"session_id": self.session_id, "start_time": self.start_time})
+
+
+# Span en cours dans le contexte d'exécution (relation parent/enfant)
+_current_span: ContextVar[Optional[str]] = ContextVar("telemetry_current_span", default=None)
+
+# Événements de début / fin émis pour chaque nature de span
+SPAN_EVENT_TYPES = {
+    "agent": (EventType.AGENT_START, EventType.AGENT_END),
+    "tool": (EventType.TOOL_CALL, EventType.TOOL_CALL),
+    "llm": (EventType.LLM_CALL, EventType.LLM_CALL),
+    "node": (EventType.NODE_START, EventType.NODE_END),
+}
+
+
+@contextmanager
+def timed_span(name: str, agent_name: str, kind: str = "agent", data: Optional[Dict[str, Any]] = None):
+    """
+    Mesure la durée d'un bloc (time.perf_counter_ns) et émet deux événements
+    
+    L'événement de début (data.phase = "start") et l'événement de fin
+    (data.phase = "end", duration_ms renseigné) portent le même span_id ;
+    parent_span_id est le span englobant dans le contexte courant. pid, tid
+    et start_us (horloge murale, microsecondes) situent le span sur une
+    timeline (voir trace_export). Une exception marque l'événement de fin
+    en échec puis est propagée.
+    Sans tracker initialisé, seule la relation parent/enfant est tenue.
+    
+    Args:
+        name: Nom du span (ex: "run_auditor")
+        agent_name: Agent ou outil auquel la durée est attribuée
+        kind: "agent", "tool", "llm" ou "node" (choix des EventType)
+        data: Champs ajoutés aux deux événements
+    
+    Yields:
+        Dictionnaire de champs à ajouter à l'événement de fin
+    """
+    start_type, end_type = SPAN_EVENT_TYPES[kind]
+    tracker = TelemetryTracker()
+    active = tracker.is_active()
+    span_id = uuid.uuid4().hex[:16]
+    base = {
+        "span": name,
+        "span_id": span_id,
+        "parent_span_id": _current_span.get(),
+        "pid": os.getpid(),
+        "tid": threading.get_ident(),
+        "thread": threading.current_thread().name,
+        "start_us": time.time_ns() // 1000,
+        **(data or {})
+    }
+    extra: Dict[str, Any] = {}
+    
+    if active:
+        tracker.track_event(start_type, agent_name, {**base, "phase": "start"})
+    token = _current_span.set(span_id)
+    error: Optional[BaseException] = None
+    start = time.perf_counter_ns()
+    try:
+        yield extra
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        duration_ms = (time.perf_counter_ns() - start) / 1_000_000
+        _current_span.reset(token)
+        if active:
+            tracker.track_event(
+                end_type,
+                agent_name,
+                {**base, **extra, "phase": "end"},
+                duration_ms=duration_ms,
+                success=error is None,
+                error_message=str(error) if error is not None else None
+            )
+
+
+def timed(name: Optional[str] = None, agent_name: str = "system", kind: str = "agent") -> Callable:
+    """
+    Décorateur: exécute la fonction dans un timed_span
+    
+    Exemple:
+        @timed(agent_name="Auditor")
+        def run_auditor(target_dir): ...
+    """
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__name__
+        
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed_span(span_name, agent_name, kind):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,126 @@
+"""
+Export de la télémétrie au format Chrome trace-event
+Responsable: Data Officer
+
+Chaque span de timed_span() (événement de fin, data.phase = "end") devient
+un événement complet ("ph": "X") sur la piste de son processus et de son
+thread. Le fichier s'ouvre dans chrome://tracing ou https://ui.perfetto.dev.
+Les spans qui se chevauchent (agents concurrents) sont sur des threads
+distincts et restent lisibles.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+# Catégorie de trace par type d'événement de fin
+TRACE_CATEGORIES = {
+    "agent_end": "agent",
+    "tool_call": "tool",
+    "llm_call": "llm",
+    "node_end": "node",
+}
+
+# Champs de span déjà portés par l'événement de trace lui-même
+_SPAN_FIELDS = {"span", "span_id", "pid", "tid", "thread", "start_us", "phase"}
+
+
+def span_to_trace_events(event: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Convertit un événement de fin de span en événements de trace
+
+    Un appel LLM donne en plus un span "queue" (attente du limiteur) et un
+    instant "first_token" quand queue_ms / ttft_ms sont renseignés.
+
+    Args:
+        event: Événement de télémétrie (format Event)
+
+    Returns:
+        Événements de trace (liste vide si l'événement n'est pas une fin de span)
+    """
+    data = event.get("data") or {}
+    if data.get("phase") != "end" or event.get("duration_ms") is None or "start_us" not in data:
+        return []
+
+    pid = data.get("pid", 0)
+    tid = data.get("tid", 0)
+    start_us = data["start_us"]
+    category = TRACE_CATEGORIES.get(event.get("event_type"), "span")
+    args = {key: value for key, value in data.items() if key not in _SPAN_FIELDS}
+    args["agent"] = event.get("agent_name")
+    args["iteration"] = event.get("iteration")
+    if not event.get("success", True):
+        args["error"] = event.get("error_message")
+
+    trace_events = [{
+        "name": data.get("span", event.get("event_type")),
+        "cat": category,
+        "ph": "X",
+        "ts": start_us,
+        "dur": event["duration_ms"] * 1000,
+        "pid": pid,
+        "tid": tid,
+        "args": args
+    }]
+
+    queue_ms = data.get("queue_ms")
+    if queue_ms:
+        trace_events.append({
+            "name": "queue", "cat": category, "ph": "X",
+            "ts": start_us, "dur": queue_ms * 1000, "pid": pid, "tid": tid, "args": {}
+        })
+    ttft_ms = data.get("ttft_ms")
+    if ttft_ms is not None:
+        trace_events.append({
+            "name": "first_token", "cat": category, "ph": "i", "s": "t",
+            "ts": start_us + ((queue_ms or 0) + ttft_ms) * 1000, "pid": pid, "tid": tid, "args": {}
+        })
+    return trace_events
+
+
+def write_chrome_trace(events: Iterable[Dict[str, Any]], output_file: Path) -> int:
+    """
+    Écrit une trace Chrome ({"traceEvents": [...]}) à partir d'événements de télémétrie
+
+    Args:
+        events: Événements de télémétrie (journal, document ou tracker)
+        output_file: Fichier de sortie
+
+    Returns:
+        Nombre de spans exportés
+    """
+    output_file = Path(output_file)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+
+    spans = 0
+    threads = {}
+    tmp_path = output_file.with_name(output_file.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write('{"displayTimeUnit": "ms", "traceEvents": [\n')
+        first = True
+        for event in events:
+            trace_events = span_to_trace_events(event)
+            if not trace_events:
+                continue
+            spans += 1
+            data = event["data"]
+            threads.setdefault((data.get("pid", 0), data.get("tid", 0)), data.get("thread"))
+            for trace_event in trace_events:
+                f.write(("" if first else ",\n") + json.dumps(trace_event, ensure_ascii=False))
+                first = False
+
+        # Noms des pistes (processus / threads)
+        for pid in sorted({pid for pid, _ in threads}):
+            f.write(("" if first else ",\n") + json.dumps({
+                "name": "process_name", "ph": "M", "pid": pid, "tid": 0,
+                "args": {"name": f"refactoring-swarm ({pid})"}
+            }))
+            first = False
+        for (pid, tid), name in sorted(threads.items(), key=lambda item: item[0]):
+            if name:
+                f.write(",\n" + json.dumps({
+                    "name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}
+                }, ensure_ascii=False))
+        f.write("\n]}\n")
+    os.replace(tmp_path, output_file)
+    return spans
@@ -4,7 +4,11 @@ from .logger import (
     ActionType,
     initialize_logger,
     finalize_logger,
-    get_logger_stats
+    get_logger_stats,
+    ExperimentLogger,
+    create_session_logger,
+    use_logger,
+    get_current_logger
 )
 
 __all__ = [
@@ -12,5 +16,9 @@ __all__ = [
     'ActionType',
     'initialize_logger',
     'finalize_logger',
-    'get_logger_stats'
+    'get_logger_stats',
+    'ExperimentLogger',
+    'create_session_logger',
+    'use_logger',
+    'get_current_logger'
 ]
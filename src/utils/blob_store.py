@@ -0,0 +1,112 @@
+"""
+Blob Store - Stockage dédupliqué des gros contenus de logs
+Les prompts, réponses et sorties de tests volumineux sont stockés une seule
+fois, compressés, sous leur hash SHA-256. L'entrée de log ne contient plus
+qu'une référence {"$blob": "<sha256>", "size": <octets>}.
+"""
+import hashlib
+import os
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+BLOB_REF_KEY = "$blob"
+
+# Champs de details susceptibles d'être externalisés
+BLOB_FIELDS = ("input_prompt", "output_response", "test_output")
+
+# Taille (en octets UTF-8) à partir de laquelle un contenu est externalisé
+DEFAULT_BLOB_MIN_SIZE = 4096
+
+
+def is_blob_ref(value: Any) -> bool:
+    """Indique si une valeur est une référence vers le blob store"""
+    return isinstance(value, dict) and BLOB_REF_KEY in value
+
+
+class BlobStore:
+    """Blobs compressés (zlib) adressés par leur hash, sous root/ab/cdef....z"""
+
+    def __init__(self, root: Path, min_size: int = DEFAULT_BLOB_MIN_SIZE):
+        self.root = Path(root)
+        self.min_size = min_size
+        self._known: set = set()
+        self._lock = threading.Lock()
+        self.stores = 0       # Blobs réellement écrits
+        self.dedup_hits = 0   # Contenus déjà présents
+
+    def _path(self, digest: str) -> Path:
+        return self.root / digest[:2] / f"{digest[2:]}.z"
+
+    def put(self, text: str) -> Dict[str, Any]:
+        """
+        Stocke un contenu (s'il n'existe pas déjà) et retourne sa référence
+
+        Args:
+            text: Contenu à stocker
+
+        Returns:
+            Référence {"$blob": digest, "size": taille en octets}
+        """
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        ref = {BLOB_REF_KEY: digest, "size": len(data)}
+
+        with self._lock:
+            if digest in self._known:
+                self.dedup_hits += 1
+                return ref
+
+        path = self._path(digest)
+        if path.exists():
+            with self._lock:
+                self._known.add(digest)
+                self.dedup_hits += 1
+            return ref
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(zlib.compress(data))
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._known.add(digest)
+            self.stores += 1
+        return ref
+
+    def get(self, digest: str) -> str:
+        """Retourne le contenu d'un blob"""
+        with open(self._path(digest), "rb") as f:
+            return zlib.decompress(f.read()).decode("utf-8")
+
+    def exists(self, digest: str) -> bool:
+        """Vérifie la présence d'un blob sans le lire"""
+        return digest in self._known or self._path(digest).exists()
+
+    def resolve(self, value: Any) -> Any:
+        """Retourne le contenu d'une référence, ou la valeur telle quelle"""
+        if is_blob_ref(value):
+            return self.get(value[BLOB_REF_KEY])
+        return value
+
+    def externalize(self, details: Dict[str, Any], fields: Iterable[str] = BLOB_FIELDS) -> Dict[str, Any]:
+        """
+        Remplace les contenus volumineux de details par des références
+
+        Args:
+            details: Détails d'une entrée de log (non modifiés)
+            fields: Champs à externaliser
+
+        Returns:
+            Copie de details (ou details lui-même si rien n'est externalisé)
+        """
+        result: Optional[Dict[str, Any]] = None
+        for field in fields:
+            value = details.get(field)
+            if isinstance(value, str) and len(value.encode("utf-8")) >= self.min_size:
+                if result is None:
+                    result = dict(details)
+                result[field] = self.put(value)
+        return details if result is None else result
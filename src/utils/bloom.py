@@ -0,0 +1,111 @@
+"""
+Filtre de Bloom extensible pour les tests d'unicité en un seul passage
+Un faux positif est possible (jamais un faux négatif) : l'appelant confirme
+les doublons signalés de façon exacte.
+"""
+import base64
+import hashlib
+import math
+from typing import Any, Dict, List
+
+# Capacité du premier filtre ; chaque filtre ajouté est deux fois plus grand
+DEFAULT_BLOOM_CAPACITY = 1 << 16
+
+# Taux de faux positifs visé (par filtre, resserré à chaque extension)
+DEFAULT_ERROR_RATE = 1e-4
+
+
+class BloomFilter:
+    """Filtre de Bloom de capacité fixe (double hachage sur blake2b)"""
+
+    def __init__(self, capacity: int, error_rate: float = DEFAULT_ERROR_RATE):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: bytes):
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        # Double hachage renforcé (terme cubique) : positions indépendantes même pour un petit filtre
+        return [(first + i * second + (i * i * i - i) // 6) % self.size for i in range(self.hashes)]
+
+    def add(self, key: bytes) -> bool:
+        """Ajoute key ; retourne True si key était (peut-être) déjà présente"""
+        present = True
+        bits = self.bits
+        for position in self._positions(key):
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not bits[byte] & mask:
+                present = False
+                bits[byte] |= mask
+        if not present:
+            self.count += 1
+        return present
+
+    def __contains__(self, key: bytes) -> bool:
+        bits = self.bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(key))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Forme sérialisable (JSON) : paramètres et bits en base64"""
+        return {
+            "capacity": self.capacity,
+            "error_rate": self.error_rate,
+            "count": self.count,
+            "bits": base64.b64encode(bytes(self.bits)).decode("ascii")
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BloomFilter":
+        bloom = cls(data["capacity"], data["error_rate"])
+        bits = base64.b64decode(data["bits"])
+        if len(bits) != len(bloom.bits):
+            raise ValueError("Taille de filtre de Bloom incohérente")
+        bloom.bits = bytearray(bits)
+        bloom.count = data["count"]
+        return bloom
+
+
+class ScalableBloomFilter:
+    """
+    Suite de filtres de Bloom : quand le filtre courant atteint sa capacité,
+    un filtre deux fois plus grand (et plus strict) est ajouté. La mémoire
+    reste proportionnelle au nombre de clés (~2,5 octets par clé à 1e-4),
+    sans connaître ce nombre à l'avance.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_BLOOM_CAPACITY, error_rate: float = DEFAULT_ERROR_RATE):
+        self.error_rate = error_rate
+        self.filters: List[BloomFilter] = [BloomFilter(capacity, error_rate / 2)]
+
+    def add(self, key: bytes) -> bool:
+        """Ajoute key ; retourne True si key était (peut-être) déjà présente"""
+        if any(key in bloom for bloom in self.filters[:-1]):
+            return True
+        current = self.filters[-1]
+        if current.count >= current.capacity:
+            if key in current:
+                return True
+            current = BloomFilter(current.capacity * 2, self.error_rate / 2 ** (len(self.filters) + 1))
+            self.filters.append(current)
+        return current.add(key)
+
+    def __contains__(self, key: bytes) -> bool:
+        return any(key in bloom for bloom in self.filters)
+
+    def __len__(self) -> int:
+        return sum(bloom.count for bloom in self.filters)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"error_rate": self.error_rate, "filters": [bloom.to_dict() for bloom in self.filters]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ScalableBloomFilter":
+        scalable = cls.__new__(cls)
+        scalable.error_rate = data["error_rate"]
+        scalable.filters = [BloomFilter.from_dict(bloom) for bloom in data["filters"]]
+        return scalable
@@ -0,0 +1,157 @@
+"""
+Histogrammes de latence à buckets logarithmiques
+Responsable: Data Officer
+
+Chaque durée est rangée dans le bucket ceil(log(v) / log(gamma)) : l'erreur
+relative d'un percentile est bornée par (gamma - 1) et le nombre de buckets
+ne dépend que de l'étendue des durées (quelques centaines entre 1 µs et
+1 h), pas du nombre de mesures. Deux histogrammes de même gamma se
+fusionnent en additionnant leurs buckets (sessions, processus, shards).
+"""
+import math
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Erreur relative maximale d'un percentile: 2 %
+DEFAULT_GAMMA = 1.02
+
+# Percentiles exposés par summary()
+SUMMARY_PERCENTILES = (50, 95, 99)
+
+
+class LogHistogram:
+    """Histogramme de durées (ms) en mémoire constante, fusionnable"""
+
+    def __init__(self, gamma: float = DEFAULT_GAMMA):
+        if gamma <= 1:
+            raise ValueError("gamma doit être > 1")
+        self.gamma = gamma
+        self._log_gamma = math.log(gamma)
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0   # Durées <= 0
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def record(self, value: float):
+        """Ajoute une mesure"""
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        if value <= 0:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def merge(self, other: "LogHistogram") -> "LogHistogram":
+        """Ajoute les mesures d'un autre histogramme (même gamma) et retourne self"""
+        if other.gamma != self.gamma:
+            raise ValueError(f"gamma incompatibles: {self.gamma} != {other.gamma}")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        if other.max is not None:
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Retourne le q-ième percentile (0-100), None si l'histogramme est vide
+        La valeur est le milieu (géométrique) du bucket, bornée par min / max.
+        """
+        if self.count == 0:
+            return None
+        rank = max(1, math.ceil(q / 100 * self.count))
+        if rank <= self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                value = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, Any]:
+        """count, mean, p50, p95, p99, max (ms)"""
+        result: Dict[str, Any] = {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None
+        }
+        for q in SUMMARY_PERCENTILES:
+            result[f"p{q}"] = self.percentile(q)
+        result["max"] = self.max
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Forme sérialisable (JSON) de l'histogramme"""
+        return {
+            "gamma": self.gamma,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+            "zero_count": self.zero_count,
+            "buckets": {str(index): count for index, count in sorted(self.buckets.items())}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LogHistogram":
+        """Reconstruit un histogramme sérialisé par to_dict()"""
+        histogram = cls(data.get("gamma", DEFAULT_GAMMA))
+        histogram.count = data.get("count", 0)
+        histogram.total = data.get("total", 0.0)
+        histogram.min = data.get("min")
+        histogram.max = data.get("max")
+        histogram.zero_count = data.get("zero_count", 0)
+        histogram.buckets = {int(index): count for index, count in data.get("buckets", {}).items()}
+        return histogram
+
+
+def latency_key(event: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+    """
+    Histogramme auquel appartient la durée d'un événement
+
+    Returns:
+        (catégorie, nom) : ("agents", agent), ("tools", outil), ("models",
+        modèle) ou ("nodes", nœud du graphe) ; None si l'événement n'a pas
+        de durée
+    """
+    if event.get("duration_ms") is None:
+        return None
+    event_type = event.get("event_type")
+    data = event.get("data") or {}
+    if event_type == "tool_call":
+        name = event.get("agent_name", "unknown")
+        # Sous-processus lancés par l'outil: histogramme distinct de l'appel complet
+        return "tools", f"{name}/subprocess" if data.get("span") == "subprocess" else name
+    if event_type == "llm_call":
+        return "models", data.get("model") or event.get("agent_name", "unknown")
+    if event_type == "node_end":
+        return "nodes", data.get("span") or event.get("agent_name", "unknown")
+    return "agents", event.get("agent_name", "unknown")
+
+
+def merge_histogram_groups(groups: Iterable[Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, LogHistogram]]:
+    """
+    Fusionne des groupes d'histogrammes sérialisés
+    ({"agents": {"Auditor": {...}}, "tools": {...}, "models": {...}}), par
+    exemple ceux de plusieurs fichiers de télémétrie.
+    """
+    merged: Dict[str, Dict[str, LogHistogram]] = {}
+    for group in groups:
+        for category, histograms in (group or {}).items():
+            target = merged.setdefault(category, {})
+            for name, data in histograms.items():
+                histogram = LogHistogram.from_dict(data)
+                if name in target:
+                    target[name].merge(histogram)
+                else:
+                    target[name] = histogram
+    return merged
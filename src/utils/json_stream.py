@@ -0,0 +1,229 @@
+"""
+Lecture incrémentale d'un document JSON {"...": ..., "events": [...]}
+Les champs de tête (metadata, metrics...) sont décodés entièrement ; les
+éléments des listes demandées (events, logs) sont décodés un par un avec
+JSONDecoder.scan_once sur un tampon glissant. La mémoire utilisée dépend de
+la taille du plus gros élément, pas de celle du fichier.
+
+Les erreurs de syntaxe sont des json.JSONDecodeError au texte identique à
+celui de json.load (message, ligne, colonne et position dans le fichier).
+Avec offsets=True, la position en octets de chaque élément est suivie
+(span) pour le relire plus tard sans reparcourir le document.
+"""
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+# Taille des lectures (caractères) ; doublée tant qu'un élément ne tient pas dans le tampon
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# Une erreur (ou une fin de valeur) aussi près de la fin du tampon peut venir
+# d'un élément coupé : "-Infinity", exposant d'un nombre...
+_TRUNCATION_MARGIN = 10
+
+
+class JsonStreamError(json.JSONDecodeError):
+    """JSONDecodeError dont la position est celle du fichier (le document n'est pas en mémoire)"""
+
+    def __init__(self, msg: str, pos: int, lineno: int, colno: int):
+        ValueError.__init__(self, f"{msg}: line {lineno} column {colno} (char {pos})")
+        self.msg = msg
+        self.doc = None
+        self.pos = pos
+        self.lineno = lineno
+        self.colno = colno
+
+    def __reduce__(self):
+        return self.__class__, (self.msg, self.pos, self.lineno, self.colno)
+
+
+class JsonDocumentReader:
+    """
+    Parcourt un document JSON en ne gardant en mémoire qu'un élément à la fois
+
+    Itérer produit (clé, index, élément) pour chaque élément des listes
+    stream_keys ; les autres champs sont dans self.head (complet à la fin
+    de l'itération). streamed contient les clés effectivement parcourues
+    élément par élément (une clé de stream_keys dont la valeur n'est pas une
+    liste est décodée dans head). Un document dont la racine n'est pas un
+    objet est décodé entièrement dans head.
+
+    Avec offsets=True, self.span vaut (début, fin) en octets dans le fichier
+    de l'élément qui vient d'être produit.
+
+    Raises:
+        json.JSONDecodeError: Document invalide (même message que json.load)
+    """
+
+    def __init__(self, path: Path, stream_keys: Iterable[str] = ("events",), chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 offsets: bool = False):
+        self.path = Path(path)
+        self.stream_keys = frozenset(stream_keys)
+        self.chunk_size = chunk_size
+        self.offsets = offsets
+        self.head: Any = {}
+        self.streamed = set()
+        self.span: Optional[Tuple[int, int]] = None
+        self._scan_once = json.JSONDecoder().scan_once
+
+    def __iter__(self) -> Iterator[Tuple[str, int, Any]]:
+        self.head = {}
+        self.streamed = set()
+        with open(self.path, "r", encoding="utf-8") as f:
+            self._file = f
+            self._buffer = ""
+            self._pos = 0
+            self._base = 0        # Position dans le fichier de self._buffer[0]
+            self._lines = 0       # Sauts de ligne avant self._buffer
+            self._last_newline = -1
+            self._eof = False
+            self._extra_bytes = 0  # Octets UTF-8 au-delà d'un par caractère, avant self._pos
+            try:
+                yield from self._document()
+            finally:
+                self._file = None
+                self._buffer = ""
+
+    # ------------------------------------------------------------------ tampon
+
+    def _fill(self, size: int = 0) -> bool:
+        """Lit la suite du fichier (False en fin de fichier, tampon inchangé)"""
+        if self._eof:
+            return False
+        chunk = self._file.read(max(size, self.chunk_size))
+        if not chunk:
+            self._eof = True
+            return False
+        consumed = self._buffer[:self._pos]
+        newlines = consumed.count("\n")
+        if newlines:
+            self._lines += newlines
+            self._last_newline = self._base + consumed.rfind("\n")
+        self._base += self._pos
+        self._buffer = self._buffer[self._pos:] + chunk
+        self._pos = 0
+        return True
+
+    def _error(self, msg: str, pos: int) -> JsonStreamError:
+        """Erreur à la position pos du tampon, exprimée dans le fichier"""
+        absolute = self._base + pos
+        lineno = self._lines + self._buffer.count("\n", 0, pos) + 1
+        newline = self._buffer.rfind("\n", 0, pos)
+        newline = self._base + newline if newline >= 0 else self._last_newline
+        return JsonStreamError(msg, absolute, lineno, absolute - newline)
+
+    def _skip_whitespace(self):
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer) or not self._fill():
+                return
+
+    def _next_char(self) -> str:
+        """Caractère suivant après les blancs ('' en fin de fichier), sans le consommer"""
+        self._skip_whitespace()
+        return self._buffer[self._pos:self._pos + 1]
+
+    def _value(self) -> Any:
+        """Décode la valeur JSON à la position courante"""
+        while True:
+            buffer, pos = self._buffer, self._pos
+            try:
+                value, end = self._scan_once(buffer, pos)
+            except StopIteration as e:
+                # Le scanner C remonte aussi l'index d'un littéral incomplet imbriqué
+                if e.value >= len(buffer) - _TRUNCATION_MARGIN and self._fill(len(buffer)):
+                    continue
+                raise self._error("Expecting value", e.value)
+            except json.JSONDecodeError as e:
+                truncated = e.pos >= len(buffer) - _TRUNCATION_MARGIN or e.msg.startswith("Unterminated string")
+                if truncated and self._fill(len(buffer)):
+                    continue
+                raise self._error(e.msg, e.pos)
+            # Un nombre ou un littéral en fin de tampon peut continuer dans la lecture suivante
+            if end >= len(buffer) - _TRUNCATION_MARGIN and self._fill(len(buffer)):
+                continue
+            if self.offsets:
+                # Les caractères non ASCII ne peuvent apparaître que dans les valeurs
+                text = buffer[pos:end]
+                if not text.isascii():
+                    self._extra_bytes += len(text.encode("utf-8")) - len(text)
+            self._pos = end
+            return value
+
+    # --------------------------------------------------------------- document
+
+    def _document(self) -> Iterator[Tuple[str, int, Any]]:
+        self._skip_whitespace()
+        if self._buffer[self._pos:self._pos + 1] != "{":
+            self.head = self._value()
+        else:
+            self._pos += 1
+            yield from self._object_members()
+        if self._next_char():
+            raise self._error("Extra data", self._pos)
+
+    def _object_members(self) -> Iterator[Tuple[str, int, Any]]:
+        char = self._next_char()
+        if char == "}":
+            self._pos += 1
+            return
+        while True:
+            if char != '"':
+                raise self._error("Expecting property name enclosed in double quotes", self._pos)
+            key = self._value()
+            if self._next_char() != ":":
+                raise self._error("Expecting ':' delimiter", self._pos)
+            self._pos += 1
+            if key in self.stream_keys and self._next_char() == "[":
+                self._pos += 1
+                self.streamed.add(key)
+                self.head.pop(key, None)
+                yield from self._array_items(key)
+            else:
+                self._skip_whitespace()
+                self.head[key] = self._value()
+
+            char = self._next_char()
+            self._pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise self._error("Expecting ',' delimiter", self._pos - 1)
+            char = self._next_char()
+
+    def _array_items(self, key: str) -> Iterator[Tuple[str, int, Any]]:
+        if self._next_char() == "]":
+            self._pos += 1
+            return
+        index = 0
+        while True:
+            self._skip_whitespace()
+            start = self._base + self._pos + self._extra_bytes
+            item = self._value()
+            if self.offsets:
+                self.span = (start, self._base + self._pos + self._extra_bytes)
+            yield key, index, item
+            index += 1
+            char = self._next_char()
+            self._pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise self._error("Expecting ',' delimiter", self._pos - 1)
+
+
+def iter_document_items(path: Path, key: str = "events") -> Iterator[Any]:
+    """Éléments de la liste key d'un document JSON, un par un"""
+    for _, _, item in JsonDocumentReader(path, (key,)):
+        yield item
+
+
+def read_document_head(path: Path, stream_keys: Iterable[str] = ("events", "logs")) -> Dict[str, Any]:
+    """Champs d'un document JSON hors listes stream_keys (parcourues sans être gardées)"""
+    reader = JsonDocumentReader(path, stream_keys)
+    for _ in reader:
+        pass
+    return reader.head
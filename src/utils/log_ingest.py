@@ -0,0 +1,161 @@
+"""
+Lecture unifiée des logs du logger et de la télémétrie
+Le logger écrit des entrées {"log_id", "action", "status", "details"...}
+dans un document {"logs": [...]} ; la télémétrie des événements
+{"event_id", "event_type", "success", "data"...} dans {"events": [...]}.
+
+RecordStream lit l'un ou l'autre format, qu'il s'agisse d'un document JSON
+(lu en streaming), d'un journal JSONL (segments tournés compris) ou d'un
+segment compressé (.gz), et produit les entrées une à une, ramenées au
+format des événements de télémétrie (normalize_record). Analyse, validation
+et ingestion sont ainsi un seul passage sur n'importe quel fichier de
+session, sans charger le document en mémoire.
+"""
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    from .json_stream import JsonDocumentReader
+    from .log_writer import iter_journal_records, iter_jsonl_records, read_jsonl_header
+except (ImportError, ValueError):
+    import sys
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from utils.json_stream import JsonDocumentReader
+    from utils.log_writer import iter_journal_records, iter_jsonl_records, read_jsonl_header
+
+# Nature d'une entrée: entrée du logger imposé ou événement de télémétrie
+KIND_LOGS = "logs"
+KIND_EVENTS = "events"
+
+
+def record_kind(record: Dict[str, Any]) -> str:
+    """Nature d'une entrée brute (KIND_LOGS ou KIND_EVENTS)"""
+    return KIND_EVENTS if "event_id" in record else KIND_LOGS
+
+
+def normalize_record(record: Dict[str, Any], kind: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Entrée au format des événements de télémétrie
+
+    Un événement est retourné tel quel. Une entrée du logger devient
+    log_id -> event_id, action -> event_type, status == "SUCCESS" -> success,
+    details -> data ; model_used est conservé, l'itération vaut 0 et
+    l'entrée n'a ni durée ni message d'erreur.
+    """
+    if (kind or record_kind(record)) == KIND_EVENTS:
+        return record
+    return {
+        "event_id": record.get("log_id"),
+        "timestamp": record.get("timestamp", ""),
+        "event_type": record.get("action", ""),
+        "agent_name": record.get("agent_name", ""),
+        "iteration": 0,
+        "data": record.get("details") or {},
+        "duration_ms": None,
+        "success": record.get("status") == "SUCCESS",
+        "error_message": None,
+        "model_used": record.get("model_used")
+    }
+
+
+def session_head(head: Dict[str, Any], total: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Champs de tête au format télémétrie ({"metadata": ..., "metrics": ...})
+
+    Args:
+        head: Tête d'un document de télémétrie (retournée telle quelle), d'un
+            document du logger (session_id, total_logs...) ou en-tête d'un
+            journal JSONL
+        total: Nombre d'entrées lues, à défaut de compteur dans la tête
+    """
+    if "metadata" in head:
+        return head
+    metadata = {key: value for key, value in head.items() if key != "total_logs"}
+    metadata["total_events"] = head.get("total_logs", total)
+    metadata.setdefault("current_iteration", 0)
+    return {"metadata": metadata}
+
+
+class RecordStream:
+    """
+    Entrées d'un fichier de session, quel que soit son format
+
+    Itérer produit les entrées (normalisées par défaut) ; self.kind est la
+    nature des entrées (connue dès la première, ou en fin de parcours pour
+    un document vide) et self.head la tête du document ou l'en-tête du
+    journal (champs écrits avant les entrées dès la première, tête complète
+    en fin de parcours).
+
+    Args:
+        path: Document JSON, journal JSONL (segments tournés compris) ou
+            segment compressé (.gz)
+        start: Premier timestamp retenu (ISO, inclus)
+        end: Dernier timestamp retenu (inclus)
+        normalize: False: entrées telles qu'écrites
+
+    Raises:
+        json.JSONDecodeError: Document JSON invalide
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        normalize: bool = True
+    ):
+        self.path = Path(path)
+        self.start = start
+        self.end = end
+        self.normalize = normalize
+        self.kind: Optional[str] = None
+        self.head: Dict[str, Any] = {}
+
+    def _in_range(self, record: Dict[str, Any]) -> bool:
+        timestamp = record.get("timestamp") or ""
+        return (self.start is None or timestamp >= self.start) and (self.end is None or timestamp <= self.end)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        self.kind = None
+        if self.path.suffix in (".jsonl", ".gz"):
+            yield from self._journal_records()
+        else:
+            yield from self._document_records()
+
+    def _journal_records(self) -> Iterator[Dict[str, Any]]:
+        self.head = read_jsonl_header(self.path) or {}
+        if self.path.suffix == ".jsonl":
+            records = iter_journal_records(self.path, self.start, self.end)
+        else:
+            records = (record for record in iter_jsonl_records(self.path) if self._in_range(record))
+        for record in records:
+            kind = record_kind(record)
+            if self.kind is None:
+                self.kind = kind
+            yield normalize_record(record, kind) if self.normalize else record
+
+    def _document_records(self) -> Iterator[Dict[str, Any]]:
+        reader = JsonDocumentReader(self.path, (KIND_EVENTS, KIND_LOGS))
+        filtered = self.start is not None or self.end is not None
+        for key, _, item in reader:
+            self.kind = key
+            self.head = reader.head
+            if filtered and not self._in_range(item):
+                continue
+            yield normalize_record(item, key) if self.normalize else item
+        self.head = reader.head
+        if self.kind is None:
+            if "metadata" in self.head or KIND_EVENTS in reader.streamed:
+                self.kind = KIND_EVENTS
+            elif KIND_LOGS in reader.streamed:
+                self.kind = KIND_LOGS
+
+
+def iter_records(
+    path: Path,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    normalize: bool = True
+) -> Iterator[Dict[str, Any]]:
+    """Entrées d'un fichier de session (voir RecordStream)"""
+    return iter(RecordStream(path, start, end, normalize))
@@ -0,0 +1,209 @@
+"""
+Fusion des shards de logs produits par plusieurs processus ou sessions
+Chaque session écrit son propre journal (experiment_data.<session_id>.jsonl,
+telemetry_data.<session_id>.jsonl) : aucun fichier n'est partagé entre
+processus. La fusion est un k-way merge par timestamp, déterministe (à
+timestamp égal, l'ordre des shards par session_id puis l'ordre du journal
+départagent), réalisé en streaming.
+"""
+import glob
+import hashlib
+import heapq
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+try:
+    from .json_stream import read_document_head
+    from .log_ingest import KIND_EVENTS, KIND_LOGS, RecordStream, record_kind
+    from .log_writer import iter_journal_records, read_jsonl_header, write_json_document
+    from .histogram import LogHistogram, latency_key
+except (ImportError, ValueError):
+    import sys
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from utils.json_stream import read_document_head
+    from utils.log_ingest import KIND_EVENTS, KIND_LOGS, RecordStream, record_kind
+    from utils.log_writer import iter_journal_records, read_jsonl_header, write_json_document
+    from utils.histogram import LogHistogram, latency_key
+
+# Fichiers annexes écrits à côté des logs (index, agrégats, checkpoint, segments) : jamais des shards
+SIDECAR_SUFFIXES = (".index.json", ".rollups.json", ".checkpoint.json", ".segments.json")
+
+
+class MergeError(Exception):
+    """Shards incompatibles ou illisibles"""
+    pass
+
+
+def expand_shard_paths(inputs: Iterable[str], pattern: str = "experiment_data.*.jsonl") -> List[Path]:
+    """
+    Résout une liste de fichiers, répertoires et motifs glob en chemins de shards
+
+    Args:
+        inputs: Fichiers, répertoires (parcourus avec pattern) ou motifs glob
+        pattern: Motif utilisé dans les répertoires
+
+    Returns:
+        Chemins uniques, triés (fichiers annexes SIDECAR_SUFFIXES exclus)
+    """
+    paths = set()
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            paths.update(path.glob(pattern))
+        elif path.exists():
+            paths.add(path)
+        else:
+            paths.update(Path(match) for match in glob.glob(item))
+    return sorted(p for p in paths if p.is_file() and not p.name.endswith(SIDECAR_SUFFIXES))
+
+
+def _shard_records(path: Path) -> Tuple[Dict[str, Any], Iterator[Dict[str, Any]]]:
+    """Retourne (en-tête, itérateur d'entrées) d'un shard JSONL, d'un segment .gz ou d'un document JSON"""
+    if path.suffix in (".jsonl", ".gz"):
+        return read_jsonl_header(path) or {}, iter(RecordStream(path, normalize=False))
+
+    # Document JSON finalisé: on préfère son journal s'il existe
+    journal = path.with_suffix(".jsonl")
+    if journal.exists():
+        return read_jsonl_header(journal) or {}, iter_journal_records(journal)
+
+    # Document lu en streaming: la tête d'abord, les entrées à la fusion
+    head = read_document_head(path)
+    metadata = head.get("metadata", head)
+    header = {"session_id": metadata.get("session_id"), "start_time": metadata.get("start_time")}
+    return header, iter(RecordStream(path, normalize=False))
+
+
+def _open_shards(paths: List[Path]) -> List[Tuple[Dict[str, Any], Path]]:
+    """Lit les en-têtes et ordonne les shards par session_id puis chemin"""
+    shards = []
+    for path in paths:
+        try:
+            header, _ = _shard_records(path)
+        except (OSError, json.JSONDecodeError) as e:
+            raise MergeError(f"Shard illisible {path}: {e}")
+        shards.append((header, path))
+    shards.sort(key=lambda item: (str(item[0].get("session_id") or ""), str(item[1])))
+    return shards
+
+
+def _merged_stream(shards: List[Tuple[Dict[str, Any], Path]]) -> Iterator[Dict[str, Any]]:
+    """k-way merge des entrées de tous les shards, par timestamp"""
+    streams = [_shard_records(path)[1] for _, path in shards]
+    return heapq.merge(*streams, key=lambda record: record.get("timestamp") or "")
+
+
+def merge_shards(paths: List[Path], output_file: Path) -> Dict[str, Any]:
+    """
+    Fusionne des shards de même nature en un seul document JSON
+
+    Le document produit a le format habituel : {"session_id", "start_time",
+    "last_update", "total_logs", "logs"} pour le logger, ou
+    {"metadata", "metrics", "events"} pour la télémétrie (conforme au schéma
+    de DataValidator). Deux passes en streaming : une pour les compteurs,
+    une pour l'écriture ; la mémoire ne dépend pas du nombre d'entrées.
+
+    Args:
+        paths: Shards à fusionner
+        output_file: Document de sortie
+
+    Returns:
+        Résumé de la fusion (nature, sessions, nombre d'entrées)
+
+    Raises:
+        MergeError: Aucun shard, shards illisibles ou de natures différentes
+    """
+    if not paths:
+        raise MergeError("Aucun shard à fusionner")
+
+    shards = _open_shards(paths)
+    session_ids = [str(header.get("session_id") or path.stem) for header, path in shards]
+    start_times = [header["start_time"] for header, _ in shards if header.get("start_time")]
+
+    # Passe 1: nature, compteurs et bornes temporelles
+    kind = None
+    total = 0
+    successful = 0
+    last_timestamp = None
+    max_iteration = 0
+    agents: Dict[str, Dict[str, int]] = {}
+    event_types: Dict[str, int] = {}
+    histograms: Dict[str, Dict[str, LogHistogram]] = {}
+
+    for record in _merged_stream(shards):
+        entry_kind = record_kind(record)
+        if kind is None:
+            kind = entry_kind
+        elif entry_kind != kind:
+            raise MergeError("Les shards mélangent des logs et des événements de télémétrie")
+
+        total += 1
+        last_timestamp = record.get("timestamp") or last_timestamp
+        if kind == KIND_EVENTS:
+            success = bool(record.get("success"))
+            successful += success
+            max_iteration = max(max_iteration, record.get("iteration") or 0)
+            agent = agents.setdefault(record.get("agent_name", "unknown"), {"total": 0, "successful": 0})
+            agent["total"] += 1
+            agent["successful"] += success
+            event_type = record.get("event_type", "unknown")
+            event_types[event_type] = event_types.get(event_type, 0) + 1
+            key = latency_key(record)
+            if key is not None:
+                category, name = key
+                histograms.setdefault(category, {}).setdefault(name, LogHistogram()).record(record["duration_ms"])
+
+    kind = kind or KIND_LOGS
+    merged_id = "merged-" + hashlib.sha256("\n".join(session_ids).encode("utf-8")).hexdigest()[:16]
+    start_time = min(start_times) if start_times else (last_timestamp or "")
+    last_update = last_timestamp or start_time
+
+    # Passe 2: écriture
+    if kind == KIND_LOGS:
+        head = {
+            "session_id": merged_id,
+            "start_time": start_time,
+            "last_update": last_update,
+            "total_logs": total,
+            "merged_sessions": session_ids
+        }
+    else:
+        head = {
+            "metadata": {
+                "session_id": merged_id,
+                "start_time": start_time,
+                "last_update": last_update,
+                "total_events": total,
+                "current_iteration": max_iteration,
+                "merged_sessions": session_ids
+            },
+            "metrics": {
+                "session_id": merged_id,
+                "start_time": start_time,
+                "end_time": last_update,
+                "total_iterations": max_iteration,
+                "total_events": total,
+                "successful_events": successful,
+                "failed_events": total - successful,
+                "success_rate": successful / total if total else 0,
+                "agents_statistics": agents,
+                "event_types_distribution": event_types,
+                "latency_histograms": {
+                    category: {name: histogram.to_dict() for name, histogram in group.items()}
+                    for category, group in histograms.items()
+                }
+            }
+        }
+
+    output_file = Path(output_file)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    write_json_document(output_file, head, kind, _merged_stream(shards))
+
+    return {
+        "kind": kind,
+        "output_file": str(output_file),
+        "shards": len(shards),
+        "sessions": session_ids,
+        "total_entries": total
+    }
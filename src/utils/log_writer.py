@@ -0,0 +1,468 @@
+"""
+Journal JSONL append-only pour le logger et la télémétrie
+Chaque entrée est écrite une seule fois, sur une ligne compacte. Le document
+JSON historique (experiment_data.json, telemetry_data.json) est reconstruit
+en streaming à partir du journal lors de la finalisation.
+
+Format du journal:
+    {"$header": {...}}      métadonnées de session (première ligne)
+    {...}                   une ligne par entrée
+    {"$footer": {...}}      compteurs finaux (écrit à la finalisation)
+
+Rotation: quand le journal actif dépasse max_bytes (ou max_age secondes), il
+est fermé, compressé en <stem>.NNNNN.jsonl.gz et un nouveau journal actif est
+ouvert avec le même en-tête. L'index <stem>.segments.json décrit chaque
+segment (fichier, premier et dernier timestamp, nombre d'entrées) ;
+iter_journal_records() ne lit que les segments utiles à une plage de temps.
+"""
+import atexit
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+HEADER_KEY = "$header"
+FOOTER_KEY = "$footer"
+
+# Paramètres par défaut de l'écriture en arrière-plan
+DEFAULT_QUEUE_SIZE = 10000
+DEFAULT_BATCH_SIZE = 256
+DEFAULT_FLUSH_INTERVAL = 0.5  # secondes
+
+# Taille maximale du journal actif avant rotation
+DEFAULT_SEGMENT_BYTES = 64 * 1024 * 1024
+
+
+def dumps_compact(obj: Any) -> str:
+    """Sérialisation compacte (sans indentation ni espaces)"""
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def segment_index_path(path: Path) -> Path:
+    """Index des segments d'un journal (experiment_data.jsonl -> experiment_data.segments.json)"""
+    path = Path(path)
+    return path.with_name(f"{path.stem}.segments.json")
+
+
+def load_segment_index(path: Path) -> Dict[str, Any]:
+    """Retourne l'index des segments d'un journal ({"segments": []} si absent)"""
+    index_path = segment_index_path(path)
+    if not index_path.exists():
+        return {"segments": []}
+    with open(index_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_segment_index(path: Path, index: Dict[str, Any]):
+    index_path = segment_index_path(path)
+    tmp_path = index_path.with_name(index_path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, index_path)
+
+
+class JsonlLogWriter:
+    """
+    Écrivain append-only d'un journal JSONL
+    Avec max_bytes ou max_age, le journal actif est tourné en segments
+    compressés (voir rotate()).
+    """
+
+    def __init__(self, path: Path, max_bytes: Optional[int] = None, max_age: Optional[float] = None):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._file = None
+        self._header: Dict[str, Any] = {}
+        self._reset_segment_stats()
+
+    def _reset_segment_stats(self):
+        self._segment_entries = 0
+        self._segment_bytes = 0
+        self._segment_first: Optional[str] = None
+        self._segment_last: Optional[str] = None
+        self._segment_opened = time.monotonic()
+
+    def _track(self, record: Dict[str, Any], size: int):
+        self._segment_entries += 1
+        self._segment_bytes += size
+        timestamp = record.get("timestamp")
+        if timestamp:
+            if self._segment_first is None:
+                self._segment_first = timestamp
+            self._segment_last = timestamp
+
+    def open(self, header: Dict[str, Any], truncate: bool = True):
+        """
+        Ouvre le journal et écrit la ligne d'en-tête
+
+        Args:
+            header: Métadonnées de session
+            truncate: Repartir d'un journal vide, segments compris (sinon
+                ajout en fin de fichier)
+        """
+        self.close()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._header = header
+        self._reset_segment_stats()
+        if truncate:
+            self._remove_segments()
+        elif (self.max_bytes or self.max_age) and self.path.exists():
+            for record in iter_jsonl_records(self.path):
+                self._track(record, len(dumps_compact(record).encode("utf-8")) + 1)
+        self._file = open(self.path, "w" if truncate else "a", encoding="utf-8")
+        self._file.write(dumps_compact({HEADER_KEY: header}) + "\n")
+        self._file.flush()
+
+    def append(self, record: Dict[str, Any]):
+        """Ajoute une entrée en fin de journal"""
+        self.append_many([record])
+
+    def append_many(self, records: Iterable[Dict[str, Any]]):
+        """Ajoute plusieurs entrées en une seule écriture (tourne le journal si besoin)"""
+        if self._file is None:
+            # Journal fermé par une finalisation précédente: on reprend à la fin
+            self._file = open(self.path, "a", encoding="utf-8")
+        lines = []
+        for record in records:
+            line = dumps_compact(record) + "\n"
+            self._track(record, len(line.encode("utf-8")))
+            lines.append(line)
+            if self._should_rotate():
+                self._file.write("".join(lines))
+                lines = []
+                self.rotate()
+        if lines:
+            self._file.write("".join(lines))
+        self._file.flush()
+
+    def _should_rotate(self) -> bool:
+        if self._segment_entries == 0:
+            return False
+        if self.max_bytes and self._segment_bytes >= self.max_bytes:
+            return True
+        return bool(self.max_age) and time.monotonic() - self._segment_opened >= self.max_age
+
+    def rotate(self):
+        """
+        Ferme le journal actif, le compresse en segment <stem>.NNNNN.jsonl.gz,
+        l'ajoute à l'index puis rouvre un journal actif vide (même en-tête)
+        Le journal actif n'est vidé qu'une fois le segment indexé.
+        """
+        if self._segment_entries == 0:
+            return
+        self.close()
+
+        index = load_segment_index(self.path)
+        number = max((segment["number"] for segment in index["segments"]), default=0) + 1
+        segment_path = self.path.with_name(f"{self.path.stem}.{number:05d}.jsonl.gz")
+        tmp_path = segment_path.with_name(segment_path.name + ".tmp")
+        with open(self.path, "rb") as src, gzip.open(tmp_path, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.replace(tmp_path, segment_path)
+
+        index["segments"].append({
+            "number": number,
+            "file": segment_path.name,
+            "first_timestamp": self._segment_first,
+            "last_timestamp": self._segment_last,
+            "entries": self._segment_entries,
+            "bytes": segment_path.stat().st_size
+        })
+        _write_segment_index(self.path, index)
+
+        self._reset_segment_stats()
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._file.write(dumps_compact({HEADER_KEY: self._header}) + "\n")
+        self._file.flush()
+
+    def _remove_segments(self):
+        index = load_segment_index(self.path)
+        for segment in index["segments"]:
+            segment_path = self.path.with_name(segment["file"])
+            if segment_path.exists():
+                segment_path.unlink()
+        index_path = segment_index_path(self.path)
+        if index_path.exists():
+            index_path.unlink()
+
+    def flush(self):
+        """Force l'écriture du tampon"""
+        if self._file is not None:
+            self._file.flush()
+
+    def write_footer(self, footer: Dict[str, Any]):
+        """Écrit la ligne de pied et ferme le journal"""
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(dumps_compact({FOOTER_KEY: footer}) + "\n")
+        self.close()
+
+    def close(self):
+        """Ferme le journal (sans pied)"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class BackgroundLogWriter:
+    """
+    Écriture d'un journal JSONL dans un thread dédié
+    
+    append() dépose l'entrée dans une file bornée et rend la main : la
+    sérialisation et les écritures disque se font dans le thread d'écriture,
+    par lots d'au plus batch_size entrées ou toutes les flush_interval
+    secondes. Quand la file est pleine, append() bloque jusqu'à ce que le
+    thread ait libéré de la place (contre-pression).
+    
+    Même interface que JsonlLogWriter. flush() attend que toutes les entrées
+    déposées soient écrites ; les journaux encore ouverts sont vidés à la
+    sortie de l'interpréteur.
+    """
+    
+    _STOP = object()
+    _FLUSH = object()
+    
+    def __init__(
+        self,
+        writer: JsonlLogWriter,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval: float = DEFAULT_FLUSH_INTERVAL
+    ):
+        self._writer = writer
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+        _open_writers.add(self)
+    
+    @property
+    def path(self) -> Path:
+        return self._writer.path
+    
+    def queue_depth(self) -> int:
+        """Nombre d'entrées en attente d'écriture"""
+        return self._queue.qsize()
+    
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name=f"log-writer:{self.path.name}", daemon=True
+                )
+                self._thread.start()
+    
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch = []
+            taken = 0
+            stop = False
+            deadline = time.monotonic() + self.flush_interval
+            
+            # Accumule un lot: jusqu'à batch_size entrées, flush_interval ou demande de flush
+            while True:
+                taken += 1
+                if item is self._STOP:
+                    stop = True
+                    break
+                if item is self._FLUSH:
+                    break
+                batch.append(item)
+                remaining = deadline - time.monotonic()
+                if len(batch) >= self.batch_size or remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            
+            try:
+                if batch:
+                    self._writer.append_many(batch)
+            except Exception as e:
+                print(f"⚠️  Erreur d'écriture du journal {self.path}: {e}")
+            finally:
+                for _ in range(taken):
+                    self._queue.task_done()
+            if stop:
+                return
+    
+    def open(self, header: Dict[str, Any], truncate: bool = True):
+        """Ouvre le journal (après écriture des entrées en attente)"""
+        self.flush()
+        self._writer.open(header, truncate)
+    
+    def append(self, record: Dict[str, Any]):
+        """Dépose une entrée (bloque si la file est pleine)"""
+        self._ensure_thread()
+        self._queue.put(record)
+    
+    def append_many(self, records: Iterable[Dict[str, Any]]):
+        for record in records:
+            self.append(record)
+    
+    def flush(self):
+        """Attend l'écriture de toutes les entrées déposées"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(self._FLUSH)
+            self._queue.join()
+        self._writer.flush()
+    
+    def _stop_thread(self):
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(self._STOP)
+            thread.join()
+        self._thread = None
+    
+    def write_footer(self, footer: Dict[str, Any]):
+        """
+        Écrit la ligne de pied après les entrées en attente et ferme le journal
+        Le thread d'écriture s'arrête ; il redémarre si d'autres entrées arrivent.
+        """
+        self._stop_thread()
+        self._writer.write_footer(footer)
+    
+    def close(self):
+        """Vide la file, arrête le thread d'écriture et ferme le journal"""
+        self._stop_thread()
+        self._writer.close()
+
+
+# Journaux en arrière-plan à vider à la sortie de l'interpréteur
+_open_writers: "weakref.WeakSet[BackgroundLogWriter]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_open_writers():
+    for writer in list(_open_writers):
+        try:
+            writer.flush()
+        except Exception:
+            pass
+
+
+def _iter_lines(f) -> Iterator[Dict[str, Any]]:
+    for line in f:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if HEADER_KEY in record or FOOTER_KEY in record:
+            continue
+        yield record
+
+
+def iter_jsonl_records(path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Parcourt les entrées d'un journal JSONL (sans en-tête ni pied)
+    Une dernière ligne tronquée (écriture interrompue) est ignorée.
+    Les fichiers .gz (segments tournés) sont décompressés à la lecture.
+    """
+    path = Path(path)
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        yield from _iter_lines(f)
+
+
+def iter_journal_records(
+    path: Path,
+    start: Optional[str] = None,
+    end: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Parcourt toutes les entrées d'un journal : segments tournés puis journal actif
+
+    Avec start / end (timestamps ISO, bornes incluses), seuls les segments
+    dont la plage recoupe [start, end] sont ouverts, et seules les entrées
+    de la plage sont retournées.
+
+    Args:
+        path: Journal actif (experiment_data.jsonl)
+        start: Premier timestamp retenu
+        end: Dernier timestamp retenu
+    """
+    path = Path(path)
+
+    def in_range(record: Dict[str, Any]) -> bool:
+        timestamp = record.get("timestamp") or ""
+        return (start is None or timestamp >= start) and (end is None or timestamp <= end)
+
+    sources = []
+    for segment in load_segment_index(path)["segments"]:
+        if start is not None and (segment.get("last_timestamp") or "") < start:
+            continue
+        if end is not None and (segment.get("first_timestamp") or "") > end:
+            continue
+        sources.append(path.with_name(segment["file"]))
+    if path.exists():
+        sources.append(path)
+
+    for source in sources:
+        for record in iter_jsonl_records(source):
+            if (start is None and end is None) or in_range(record):
+                yield record
+
+
+def read_jsonl_header(path: Path) -> Optional[Dict[str, Any]]:
+    """Retourne l'en-tête d'un journal JSONL ou d'un segment .gz (None si absent)"""
+    path = Path(path)
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        first_line = f.readline()
+    try:
+        record = json.loads(first_line)
+    except json.JSONDecodeError:
+        return None
+    return record.get(HEADER_KEY)
+
+
+def write_json_document(
+    path: Path,
+    head: Dict[str, Any],
+    collection_key: str,
+    records: Iterable[Dict[str, Any]]
+):
+    """
+    Écrit un document JSON {**head, collection_key: [records...]} en streaming
+    Le rendu est identique à json.dump(..., indent=2, ensure_ascii=False) et
+    le fichier est remplacé de manière atomique.
+
+    Args:
+        path: Fichier de sortie
+        head: Champs placés avant la collection
+        collection_key: Nom de la liste d'entrées ("logs", "events")
+        records: Entrées (itérable consommé une seule fois)
+    """
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write("{\n")
+        for key, value in head.items():
+            rendered = json.dumps(value, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+            f.write(f"  {json.dumps(key)}: {rendered},\n")
+        f.write(f"  {json.dumps(collection_key)}: [")
+
+        first = True
+        for record in records:
+            rendered = json.dumps(record, indent=2, ensure_ascii=False).replace("\n", "\n    ")
+            f.write(("\n    " if first else ",\n    ") + rendered)
+            first = False
+
+        f.write("]\n}" if first else "\n  ]\n}")
+
+    os.replace(tmp_path, path)
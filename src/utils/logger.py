@@ -2,14 +2,35 @@
 Logger Protocol - Système de logging OBLIGATOIRE selon la fiche technique
 Ce fichier est IMPOSÉ et ne doit pas être modifié dans sa structure
 """
-import json
 import uuid
+import weakref
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import threading
 
+try:
+    from .log_writer import (
+        JsonlLogWriter, BackgroundLogWriter, iter_journal_records, write_json_document,
+        DEFAULT_SEGMENT_BYTES
+    )
+    from .blob_store import BlobStore, DEFAULT_BLOB_MIN_SIZE
+    from .rollups import Rollups, save_rollups
+except ImportError:
+    # Fallback quand le module est chargé hors du package (scripts de test)
+    import sys
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from utils.log_writer import (
+        JsonlLogWriter, BackgroundLogWriter, iter_journal_records, write_json_document,
+        DEFAULT_SEGMENT_BYTES
+    )
+    from utils.blob_store import BlobStore, DEFAULT_BLOB_MIN_SIZE
+    from utils.rollups import Rollups, save_rollups
+
 
 class ActionType(Enum):
     """
@@ -24,43 +45,102 @@ class ActionType(Enum):
 
 class ExperimentLogger:
     """
-    Logger centralisé pour le protocole de logging imposé
-    Thread-safe, Singleton pattern
+    Logger d'une session de refactoring
+    Thread-safe. Une instance par session : chaque instance possède ses propres
+    entrées et son propre fichier de sortie. L'instance par défaut
+    (_logger_instance) sert la façade log_experiment().
+    
+    Avec max_in_memory, seules les dernières entrées restent en mémoire
+    (self.logs) ; les plus anciennes ne sont plus que dans le journal sur
+    disque. Les compteurs de get_stats() et les agrégats par agent et par
+    action (self.rollups, écrits dans experiment_data.rollups.json) sont
+    tenus à jour à l'insertion.
     """
     
-    _instance = None
-    _lock = threading.Lock()
-    
-    def __new__(cls):
-        if cls._instance is None:
-            with cls._lock:
-                if cls._instance is None:
-                    cls._instance = super().__new__(cls)
-        return cls._instance
-    
-    def __init__(self):
-        if not hasattr(self, '_initialized'):
-            self.logs: list = []
-            self.log_file: Optional[Path] = None
-            self.session_id = str(uuid.uuid4())
-            self.start_time = datetime.now().isoformat()
-            self._initialized = True
-    
-    def initialize(self, log_dir: Path = None):
+    def __init__(self, session_id: Optional[str] = None, max_in_memory: Optional[int] = None):
+        self._lock = threading.Lock()
+        self.logs = deque(maxlen=max_in_memory) if max_in_memory else []
+        self._total = 0
+        self._status_counts: Dict[str, int] = {}
+        self.rollups = Rollups()
+        self.log_file: Optional[Path] = None
+        self._writer: Optional[BackgroundLogWriter] = None
+        self.blob_store: Optional[BlobStore] = None
+        self.session_id = session_id or str(uuid.uuid4())
+        self.start_time = datetime.now().isoformat()
+        _live_loggers.add(self)
+    
+    def set_memory_window(self, max_in_memory: Optional[int]):
+        """
+        Limite le nombre d'entrées gardées en mémoire (None: toutes)
+        Les entrées retirées restent dans le journal sur disque.
+        """
+        with self._lock:
+            if max_in_memory:
+                self.logs = deque(self.logs, maxlen=max_in_memory)
+            else:
+                self.logs = list(self.logs)
+    
+    def initialize(
+        self,
+        log_dir: Path = None,
+        file_name: str = "experiment_data.json",
+        blob_min_size: Optional[int] = DEFAULT_BLOB_MIN_SIZE,
+        max_segment_bytes: Optional[int] = DEFAULT_SEGMENT_BYTES,
+        max_segment_age: Optional[float] = None,
+        **writer_options
+    ):
         """
         Initialise le système de logging
         
+        Les entrées sont ajoutées au fil de l'eau dans un journal JSONL
+        (experiment_data.jsonl) par un thread d'écriture dédié ; le document
+        experiment_data.json est reconstruit à partir du journal par flush()
+        et finalize().
+        
         Args:
             log_dir: Répertoire des logs (défaut: logs/)
+            file_name: Nom du fichier de sortie (défaut: experiment_data.json)
+            blob_min_size: Taille à partir de laquelle input_prompt,
+                output_response et test_output sont stockés une seule fois
+                dans log_dir/blobs/ (None: jamais)
+            max_segment_bytes: Taille du journal actif au-delà de laquelle il
+                est tourné en segment compressé (None: jamais)
+            max_segment_age: Durée (secondes) au-delà de laquelle le journal
+                actif est tourné (None: jamais)
+            writer_options: Réglages du thread d'écriture (queue_size,
+                batch_size, flush_interval), voir BackgroundLogWriter
         """
         if log_dir is None:
             log_dir = Path("logs")
         
         log_dir.mkdir(parents=True, exist_ok=True)
-        self.log_file = log_dir / "experiment_data.json"
         
-        # Créer le fichier initial
-        self._save_to_disk()
+        with self._lock:
+            self.log_file = log_dir / file_name
+            self.blob_store = BlobStore(log_dir / "blobs", blob_min_size) if blob_min_size else None
+            
+            previous = self._writer
+            self._writer = BackgroundLogWriter(
+                JsonlLogWriter(self.log_file.with_suffix(".jsonl"), max_segment_bytes, max_segment_age),
+                **writer_options
+            )
+            header = {"session_id": self.session_id, "start_time": self.start_time}
+            
+            # Les entrées déjà enregistrées suivent le logger dans son nouveau fichier
+            if previous is None:
+                self._writer.open(header)
+                self._writer.append_many(self.logs)
+            else:
+                previous.close()
+                if previous.path == self._writer.path:
+                    self._writer.open(header, truncate=False)
+                else:
+                    self._writer.open(header)
+                    self._writer.append_many(iter_journal_records(previous.path))
+            
+            # Créer le fichier initial
+            self._save_to_disk()
     
     def log_entry(
         self,
@@ -96,6 +176,11 @@ class ExperimentLogger:
                 "Votre programme s'arrête pour respecter le protocole de logging."
             )
         
+        # Les contenus volumineux (prompts, code, sorties pytest) ne sont stockés qu'une fois
+        blob_store = self.blob_store
+        if blob_store is not None:
+            details = blob_store.externalize(details)
+        
         with self._lock:
             entry_id = str(uuid.uuid4())
             
@@ -110,58 +195,129 @@ class ExperimentLogger:
             }
             
             self.logs.append(log_entry)
+            self._total += 1
+            self._status_counts[status] = self._status_counts.get(status, 0) + 1
+            self.rollups.add(action.value, agent_name, status == "SUCCESS", iteration=0, timestamp=log_entry["timestamp"])
             
-            # Sauvegarde incrémentale toutes les 3 entrées
-            if len(self.logs) % 3 == 0:
-                self._save_to_disk()
+            # Ajout incrémental: une ligne par entrée, l'historique n'est jamais réécrit.
+            # L'entrée est seulement déposée dans la file du thread d'écriture.
+            if self._writer is not None:
+                self._writer.append(log_entry)
             
             return entry_id
     
     def _save_to_disk(self):
-        """Sauvegarde les logs sur disque"""
+        """Reconstruit experiment_data.json à partir du journal JSONL"""
         if not self.log_file:
             return
         
-        data = {
+        head = {
             "session_id": self.session_id,
             "start_time": self.start_time,
             "last_update": datetime.now().isoformat(),
-            "total_logs": len(self.logs),
-            "logs": self.logs
+            "total_logs": self._total
         }
-        
-        with open(self.log_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        self._writer.flush()
+        write_json_document(self.log_file, head, "logs", iter_journal_records(self._writer.path))
+        save_rollups(self.log_file, head, self.rollups)
+    
+    def flush(self):
+        """Sauvegarde immédiatement les entrées sur disque"""
+        with self._lock:
+            self._save_to_disk()
     
-    def finalize(self):
-        """Finalise et sauvegarde les logs"""
-        self._save_to_disk()
-        print(f"✅ Logs sauvegardés dans: {self.log_file}")
-        print(f"📊 Total d'entrées: {len(self.logs)}")
+    def finalize(self, verbose: bool = True):
+        """Finalise et sauvegarde les logs (pied du journal + experiment_data.json)"""
+        with self._lock:
+            self._save_to_disk()
+            if self._writer is not None:
+                self._writer.write_footer({
+                    "last_update": datetime.now().isoformat(),
+                    "total_logs": self._total
+                })
+        if verbose:
+            print(f"✅ Logs sauvegardés dans: {self.log_file}")
+            print(f"📊 Total d'entrées: {self._total}")
+    
+    def queue_depth(self) -> int:
+        """Nombre d'entrées en attente d'écriture dans le journal"""
+        writer = self._writer
+        return writer.queue_depth() if writer is not None else 0
     
     def get_stats(self) -> Dict[str, Any]:
-        """Retourne les statistiques des logs"""
-        if not self.logs:
-            return {"total": 0}
-        
-        stats = {
-            "total_logs": len(self.logs),
-            "success_count": sum(1 for log in self.logs if log["status"] == "SUCCESS"),
-            "failure_count": sum(1 for log in self.logs if log["status"] == "FAILURE"),
-            "agents": list(set(log["agent_name"] for log in self.logs)),
-            "actions": {}
-        }
-        
-        for log in self.logs:
-            action = log["action"]
-            stats["actions"][action] = stats["actions"].get(action, 0) + 1
-        
-        return stats
+        """Retourne les statistiques des logs (compteurs tenus à l'insertion)"""
+        with self._lock:
+            if not self._total:
+                return {"total": 0}
+            
+            return {
+                "total_logs": self._total,
+                "success_count": self._status_counts.get("SUCCESS", 0),
+                "failure_count": self._status_counts.get("FAILURE", 0),
+                "agents": list(self.rollups.agents),
+                "actions": self.rollups.event_type_counts()
+            }
+
+
+# Loggers vivants (session par défaut et sessions de cibles), pour les métriques
+_live_loggers: "weakref.WeakSet[ExperimentLogger]" = weakref.WeakSet()
+
 
+def get_live_loggers() -> List[ExperimentLogger]:
+    """Retourne les loggers encore en mémoire (toutes sessions)"""
+    return list(_live_loggers)
 
-# Instance globale (Singleton)
+
+# Instance globale (session par défaut)
 _logger_instance = ExperimentLogger()
 
+# Session active dans le contexte courant (thread, tâche ou noeud du graphe)
+_current_logger: ContextVar[Optional[ExperimentLogger]] = ContextVar("experiment_logger", default=None)
+
+
+def get_current_logger() -> ExperimentLogger:
+    """Retourne le logger de la session active (la session par défaut sinon)"""
+    return _current_logger.get() or _logger_instance
+
+
+@contextmanager
+def use_logger(logger: Optional[ExperimentLogger]):
+    """
+    Active un logger de session pour le bloc courant
+    Tous les appels à log_experiment() du bloc écrivent dans ce logger.
+    Avec None, la session active reste inchangée.
+    """
+    if logger is None:
+        yield get_current_logger()
+        return
+    token = _current_logger.set(logger)
+    try:
+        yield logger
+    finally:
+        _current_logger.reset(token)
+
+
+def create_session_logger(
+    log_dir: Path = None,
+    session_id: Optional[str] = None,
+    max_in_memory: Optional[int] = None
+) -> ExperimentLogger:
+    """
+    Crée un logger de session avec son propre fichier
+    (logs/experiment_data.<session_id>.json par défaut)
+    
+    Args:
+        log_dir: Répertoire des logs (défaut: logs/)
+        session_id: Identifiant de session (généré si absent)
+        max_in_memory: Nombre maximal d'entrées gardées en mémoire (None: toutes)
+    
+    Returns:
+        Le logger initialisé, à passer dans l'état du graphe ou à use_logger()
+    """
+    logger = ExperimentLogger(session_id, max_in_memory)
+    logger.initialize(log_dir, file_name=f"experiment_data.{logger.session_id}.json")
+    return logger
+
 
 def log_experiment(
     agent_name: str,
@@ -200,28 +356,46 @@ def log_experiment(
             status="SUCCESS"
         )
     """
-    return _logger_instance.log_entry(agent_name, model_used, action, details, status)
+    return get_current_logger().log_entry(agent_name, model_used, action, details, status)
 
 
-def initialize_logger(log_dir: Path = None):
+def initialize_logger(
+    log_dir: Path = None,
+    max_in_memory: Optional[int] = None,
+    shard: bool = False,
+    **writer_options
+):
     """
     Initialise le système de logging
     À appeler au début de main.py
     
     Args:
         log_dir: Répertoire des logs (défaut: logs/)
+        max_in_memory: Nombre maximal d'entrées gardées en mémoire
+            (défaut: pas de limite)
+        shard: Écrire dans experiment_data.<session_id>.json plutôt que dans
+            le fichier partagé (processus lancés en parallèle, à fusionner
+            ensuite avec scripts/merge_logs.py)
+        writer_options: Réglages du thread d'écriture (queue_size,
+            batch_size, flush_interval) et de la rotation
+            (max_segment_bytes, max_segment_age)
     """
-    _logger_instance.initialize(log_dir)
+    logger = get_current_logger()
+    if max_in_memory is not None:
+        logger.set_memory_window(max_in_memory)
+    if shard:
+        writer_options["file_name"] = f"experiment_data.{logger.session_id}.json"
+    logger.initialize(log_dir, **writer_options)
 
 
 def finalize_logger():
     """
     Finalise et sauvegarde les logs
-    À appeler à la fin de main.py
+    À appeler à la fin de main.py (vide la file du thread d'écriture)
     """
-    _logger_instance.finalize()
+    get_current_logger().finalize()
 
 
 def get_logger_stats() -> Dict[str, Any]:
     """Retourne les statistiques du logger"""
-    return _logger_instance.get_stats()
\ No newline at end of file
+    return get_current_logger().get_stats()
\ No newline at end of file
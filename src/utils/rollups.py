@@ -0,0 +1,224 @@
+"""
+Agrégats tenus à l'écriture (rollups) et document annexe associé
+Le logger et le tracker de télémétrie mettent à jour ces agrégats à chaque
+entrée : par agent, par type d'événement et par itération (volumes, succès,
+sommes de durées) ainsi que les histogrammes de latence. Ils sont écrits à
+côté du log (telemetry_data.rollups.json) en même temps que lui ;
+MetricsAnalyzer s'en sert au lieu de reparcourir les événements tant que le
+log n'a pas changé depuis.
+"""
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    from .histogram import LogHistogram, latency_key
+except (ImportError, ValueError):
+    import sys
+    sys.path.insert(0, str(Path(__file__).parent.parent))
+    from utils.histogram import LogHistogram, latency_key
+
+ROLLUPS_VERSION = 1
+
+
+def rollups_path(log_file: Path) -> Path:
+    """Document annexe d'un log (telemetry_data.json -> telemetry_data.rollups.json)"""
+    log_file = Path(log_file)
+    return log_file.with_name(f"{log_file.stem}.rollups.json")
+
+
+def _source_signature(log_file: Path) -> Dict[str, int]:
+    stat = Path(log_file).stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+class Rollups:
+    """Agrégats d'une session, mis à jour entrée par entrée (appelant sous verrou)"""
+
+    def __init__(self):
+        self.total = 0
+        self.successful = 0
+        self.agents: Dict[str, Dict[str, Any]] = {}
+        self.event_types: Dict[str, Dict[str, Any]] = {}
+        self.iterations: Dict[int, Dict[str, Any]] = {}
+        self.errors_by_type: Dict[str, int] = {}
+        self.histograms: Dict[str, Dict[str, LogHistogram]] = {}
+
+    def add(
+        self,
+        event_type: str,
+        agent_name: str,
+        success: bool,
+        duration_ms: Optional[float] = None,
+        iteration: Optional[int] = None,
+        timestamp: Optional[str] = None,
+        error_message: Optional[str] = None,
+        data: Optional[Dict[str, Any]] = None
+    ):
+        """Ajoute une entrée (événement de télémétrie ou entrée du logger)"""
+        self.total += 1
+        self.successful += success
+
+        agent = self.agents.get(agent_name)
+        if agent is None:
+            agent = self.agents[agent_name] = {
+                "total": 0, "successful": 0, "duration_ms": 0, "timed": 0, "event_types": {}
+            }
+        agent["total"] += 1
+        agent["successful"] += success
+        agent["event_types"][event_type] = agent["event_types"].get(event_type, 0) + 1
+
+        by_type = self.event_types.get(event_type)
+        if by_type is None:
+            by_type = self.event_types[event_type] = {"total": 0, "successful": 0, "duration_ms": 0, "timed": 0}
+        by_type["total"] += 1
+        by_type["successful"] += success
+
+        if duration_ms is not None:
+            agent["duration_ms"] += duration_ms
+            agent["timed"] += 1
+            by_type["duration_ms"] += duration_ms
+            by_type["timed"] += 1
+        if not success and error_message:
+            self.errors_by_type[event_type] = self.errors_by_type.get(event_type, 0) + 1
+
+        if iteration is not None:
+            stats = self.iterations.get(iteration)
+            if stats is None:
+                stats = self.iterations[iteration] = {
+                    "total": 0, "successful": 0, "agents": {}, "start_time": None, "end_time": None
+                }
+            stats["total"] += 1
+            stats["successful"] += success
+            stats["agents"][agent_name] = None
+            if not stats["start_time"]:
+                stats["start_time"] = timestamp
+            stats["end_time"] = timestamp
+
+        key = latency_key({
+            "event_type": event_type,
+            "agent_name": agent_name,
+            "data": data,
+            "duration_ms": duration_ms
+        })
+        if key is not None:
+            category, name = key
+            histogram = self.histograms.setdefault(category, {}).get(name)
+            if histogram is None:
+                histogram = self.histograms[category][name] = LogHistogram()
+            histogram.record(duration_ms)
+
+    # ------------------------------------------------------------------ vues
+
+    def agent_counts(self) -> Dict[str, Dict[str, int]]:
+        """{agent: {total, successful}} (bloc metrics.agents_statistics)"""
+        return {name: {"total": agent["total"], "successful": agent["successful"]} for name, agent in self.agents.items()}
+
+    def event_type_counts(self) -> Dict[str, int]:
+        """{type: nombre} (bloc metrics.event_types_distribution)"""
+        return {name: stats["total"] for name, stats in self.event_types.items()}
+
+    def agent_performance(self) -> Dict[str, Any]:
+        """Même forme que MetricsAnalyzer.get_agent_performance()"""
+        return {
+            name: {
+                "total_actions": agent["total"],
+                "successful_actions": agent["successful"],
+                "failed_actions": agent["total"] - agent["successful"],
+                "average_duration_ms": agent["duration_ms"] / agent["total"],
+                "total_duration_ms": agent["duration_ms"],
+                "event_types": dict(agent["event_types"]),
+                "success_rate": agent["successful"] / agent["total"]
+            }
+            for name, agent in self.agents.items()
+        }
+
+    def iteration_analysis(self) -> List[Dict[str, Any]]:
+        """Même forme que MetricsAnalyzer.get_iteration_analysis()"""
+        return [
+            {
+                "iteration": iteration,
+                "events_count": stats["total"],
+                "successful_events": stats["successful"],
+                "failed_events": stats["total"] - stats["successful"],
+                "agents_involved": list(stats["agents"]),
+                "start_time": stats["start_time"],
+                "end_time": stats["end_time"],
+                "success_rate": stats["successful"] / stats["total"]
+            }
+            for iteration, stats in sorted(self.iterations.items())
+        ]
+
+    # ------------------------------------------------------------ sérialisation
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "successful": self.successful,
+            "agents": self.agents,
+            "event_types": self.event_types,
+            "iterations": {
+                str(iteration): {**stats, "agents": list(stats["agents"])}
+                for iteration, stats in self.iterations.items()
+            },
+            "errors_by_type": self.errors_by_type,
+            "histograms": {
+                category: {name: histogram.to_dict() for name, histogram in histograms.items()}
+                for category, histograms in self.histograms.items()
+            }
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Rollups":
+        rollups = cls()
+        rollups.total = data["total"]
+        rollups.successful = data["successful"]
+        rollups.agents = data["agents"]
+        rollups.event_types = data["event_types"]
+        rollups.iterations = {
+            int(iteration): {**stats, "agents": dict.fromkeys(stats["agents"])}
+            for iteration, stats in data["iterations"].items()
+        }
+        rollups.errors_by_type = data["errors_by_type"]
+        rollups.histograms = {
+            category: {name: LogHistogram.from_dict(histogram) for name, histogram in histograms.items()}
+            for category, histograms in data["histograms"].items()
+        }
+        return rollups
+
+
+def save_rollups(log_file: Path, head: Dict[str, Any], rollups: Rollups):
+    """
+    Écrit le document annexe du log qui vient d'être écrit : en-tête du log
+    (metadata, metrics...), agrégats et signature du log (taille, date)
+    """
+    path = rollups_path(log_file)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "version": ROLLUPS_VERSION,
+            "source": _source_signature(log_file),
+            "head": head,
+            "rollups": rollups.to_dict()
+        }, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def load_rollups(log_file: Path) -> Optional[Dict[str, Any]]:
+    """
+    Document annexe du log, s'il correspond au log actuel
+
+    Returns:
+        {"head": ..., "rollups": Rollups} ou None (absent, illisible, ou
+        log modifié depuis l'écriture des agrégats)
+    """
+    try:
+        with open(rollups_path(log_file), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        signature = _source_signature(log_file)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if data.get("version") != ROLLUPS_VERSION or data.get("source") != signature:
+        return None
+    return {"head": data["head"], "rollups": Rollups.from_dict(data["rollups"])}
@@ -0,0 +1,85 @@
+"""
+Compteurs d'exécution par cible (appels LLM, tokens, coût, temps passé dans les outils)
+Les compteurs sont portés par une ContextVar : chaque cible traitée dans le
+même processus (thread ou tâche) accumule ses propres valeurs.
+"""
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+
+class RunStats:
+    """Compteurs d'une exécution"""
+
+    def __init__(self):
+        self.llm_calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.cache_read_tokens = 0
+        self.cost_usd = 0.0
+        self.tool_calls = 0
+        self.tool_time_s = 0.0
+        self._lock = threading.Lock()
+
+    def add_llm_call(self):
+        with self._lock:
+            self.llm_calls += 1
+
+    def add_llm_usage(self, usage: dict):
+        with self._lock:
+            self.input_tokens += usage.get("input_tokens", 0)
+            self.output_tokens += usage.get("output_tokens", 0)
+            self.cache_read_tokens += usage.get("cache_read_tokens", 0)
+            self.cost_usd += usage.get("cost_usd", 0.0)
+
+    def add_tool_time(self, seconds: float):
+        with self._lock:
+            self.tool_calls += 1
+            self.tool_time_s += seconds
+
+    def to_dict(self) -> dict:
+        return {
+            "llm_calls": self.llm_calls,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cache_read_tokens": self.cache_read_tokens,
+            "cost_usd": round(self.cost_usd, 6),
+            "tool_calls": self.tool_calls,
+            "tool_time_s": round(self.tool_time_s, 3)
+        }
+
+
+_current_stats: ContextVar[Optional[RunStats]] = ContextVar("run_stats", default=None)
+
+
+@contextmanager
+def collect_run_stats():
+    """Active un nouveau jeu de compteurs pour le bloc courant"""
+    stats = RunStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def record_llm_call():
+    """Compte un appel LLM dans l'exécution courante (sans effet hors collecte)"""
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.add_llm_call()
+
+
+def record_llm_usage(usage: dict):
+    """Ajoute les tokens d'un appel LLM (llm_tool.llm_usage) à l'exécution courante"""
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.add_llm_usage(usage)
+
+
+def record_tool_time(seconds: float):
+    """Ajoute la durée d'un appel d'outil (pylint, pytest) à l'exécution courante"""
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.add_tool_time(seconds)